@@ -0,0 +1,246 @@
+import json
+import logging
+import threading
+import time
+import zlib
+
+import sqlite_db
+from config import ARCHIVE_CONFIG
+from differ import diff_record
+from fingerprint import raw_fingerprint
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+def _create_tables(connection):
+    """创建归档表
+
+    blobs 按原始文档指纹保存压缩后的原始文档，相同的文档只保存一份；contents 按解析结果
+    的指纹保存压缩后的解析结果，多个监控解析同一份文档时各自保存自己的结果；snapshots 为
+    追加写入的索引，记录每个监控目标在什么时间看到了哪份文档和哪份解析结果。
+    """
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS blobs ("
+        "hash TEXT PRIMARY KEY, "
+        "raw BLOB, "
+        "raw_size INTEGER NOT NULL, "
+        "stored_size INTEGER NOT NULL)"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS snapshots ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "monitor TEXT NOT NULL, "
+        "target TEXT NOT NULL, "
+        "captured_at REAL NOT NULL, "
+        "version TEXT, "
+        "hash TEXT NOT NULL, "
+        "content_hash TEXT NOT NULL)"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS contents ("
+        "hash TEXT PRIMARY KEY, "
+        "content BLOB NOT NULL, "
+        "stored_size INTEGER NOT NULL)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS snapshots_time ON snapshots (monitor, target, captured_at)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS snapshots_version ON snapshots (monitor, version)"
+    )
+
+
+# 每个进程持有一个数据库连接
+_db = sqlite_db.Database(ARCHIVE_CONFIG, _create_tables)
+
+
+def is_enabled():
+    """是否启用快照归档"""
+    return ARCHIVE_CONFIG['enabled']
+
+
+def _compress(data):
+    """压缩文本"""
+    return zlib.compress(data.encode('utf-8'), ARCHIVE_CONFIG['compress_level'])
+
+
+def _decompress(data):
+    """解压文本"""
+    return zlib.decompress(data).decode('utf-8') if data is not None else None
+
+
+def _snapshot(row):
+    """把索引行转为字典"""
+    snapshot_id, monitor, target, captured_at, version, hash_, content_hash = row
+    return {
+        'id': snapshot_id,
+        'monitor': monitor,
+        'target': target,
+        'captured_at': captured_at,
+        'version': version,
+        'hash': hash_,
+        'content_hash': content_hash
+    }
+
+
+_SNAPSHOT_COLUMNS = "id, monitor, target, captured_at, version, hash, content_hash"
+
+
+def record(monitor, target, raw, content, version=None, captured_at=None):
+    """归档一次解析结果
+
+    raw 为原始文档，content 为可以 JSON 序列化的解析结果。与该目标上一次归档的
+    文档相同时不写入任何内容；不同目标或前后反复出现的相同文档共用一份原始文档，
+    相同的解析结果共用一份解析结果。返回原始文档指纹，未归档时返回 None。
+    """
+    if not is_enabled() or raw is None:
+        return None
+
+    digest = raw_fingerprint(raw)
+    content_json = json.dumps(content, ensure_ascii=False, separators=(',', ':'))
+    content_hash = raw_fingerprint(content_json)
+    captured_at = time.time() if captured_at is None else captured_at
+    try:
+        with _lock:
+            connection = _db.connection()
+            last = connection.execute(
+                "SELECT hash FROM snapshots WHERE monitor = ? AND target = ? "
+                "ORDER BY captured_at DESC, id DESC LIMIT 1",
+                (monitor, target)
+            ).fetchone()
+            if last and last[0] == digest:
+                return digest
+
+            exists = connection.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if not exists:
+                raw_data = _compress(raw) if ARCHIVE_CONFIG['store_raw'] else None
+                connection.execute(
+                    "INSERT INTO blobs (hash, raw, raw_size, stored_size) VALUES (?, ?, ?, ?)",
+                    (digest, raw_data, len(raw.encode('utf-8')), len(raw_data or b''))
+                )
+            exists = connection.execute("SELECT 1 FROM contents WHERE hash = ?", (content_hash,)).fetchone()
+            if not exists:
+                content_data = _compress(content_json)
+                connection.execute(
+                    "INSERT INTO contents (hash, content, stored_size) VALUES (?, ?, ?)",
+                    (content_hash, content_data, len(content_data))
+                )
+            connection.execute(
+                "INSERT INTO snapshots (monitor, target, captured_at, version, hash, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (monitor, target, captured_at, version, digest, content_hash)
+            )
+            connection.commit()
+    except Exception as e:
+        logger.error("归档快照失败: %s", e)
+        return None
+    return digest
+
+
+def snapshots(monitor, target=None, since=None, until=None, version=None):
+    """按监控类型、目标、时间范围和版本号查询快照索引，按时间从早到晚排列"""
+    conditions = ["monitor = ?"]
+    params = [monitor]
+    if target is not None:
+        conditions.append("target = ?")
+        params.append(target)
+    if since is not None:
+        conditions.append("captured_at >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("captured_at <= ?")
+        params.append(until)
+    if version is not None:
+        conditions.append("version = ?")
+        params.append(version)
+
+    with _lock:
+        rows = _db.connection().execute(
+            f"SELECT {_SNAPSHOT_COLUMNS} FROM snapshots WHERE {' AND '.join(conditions)} "
+            "ORDER BY captured_at, id",
+            params
+        ).fetchall()
+    return [_snapshot(row) for row in rows]
+
+
+def snapshot_at(monitor, target, timestamp):
+    """某一时刻生效的快照（该时刻之前最后一次归档的快照），没有时返回 None"""
+    with _lock:
+        row = _db.connection().execute(
+            f"SELECT {_SNAPSHOT_COLUMNS} FROM snapshots WHERE monitor = ? AND target = ? AND captured_at <= ? "
+            "ORDER BY captured_at DESC, id DESC LIMIT 1",
+            (monitor, target, timestamp)
+        ).fetchone()
+    return _snapshot(row) if row else None
+
+
+def load(snapshot_id, raw=False):
+    """读取一个快照，返回索引字段加上 content（解析结果），raw 为 True 时同时返回原始文档"""
+    with _lock:
+        connection = _db.connection()
+        row = connection.execute(
+            f"SELECT {_SNAPSHOT_COLUMNS} FROM snapshots WHERE id = ?", (snapshot_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"快照不存在: {snapshot_id}")
+        snapshot = _snapshot(row)
+        content = connection.execute(
+            "SELECT content FROM contents WHERE hash = ?", (snapshot['content_hash'],)
+        ).fetchone()[0]
+        if raw:
+            snapshot['raw'] = _decompress(connection.execute(
+                "SELECT raw FROM blobs WHERE hash = ?", (snapshot['hash'],)
+            ).fetchone()[0])
+
+    snapshot['content'] = json.loads(_decompress(content))
+    return snapshot
+
+
+def diff(old_id, new_id):
+    """比较两个快照的解析结果，返回 differ.diff_record 的结果"""
+    return diff_record(load(old_id)['content'], load(new_id)['content'])
+
+
+def changes(monitor, target, extract, since=None, until=None):
+    """按时间顺序找出 extract(解析结果) 的值发生变化的快照
+
+    例如查询华为版本说明中某个接口行的修改时间：
+        archive.changes('huawei_version', object_id, lambda versions: [
+            item for result in versions.values() for item in result['updates']
+            if item.startswith('【router')
+        ])
+    返回 [(快照, 旧值, 新值)]，第一个快照的旧值为 None。
+    """
+    result = []
+    previous = None
+    values = {}  # {解析结果指纹: 提取的值}，前后反复出现的解析结果只解压一次
+    for index, snapshot in enumerate(snapshots(monitor, target, since, until)):
+        if snapshot['content_hash'] not in values:
+            values[snapshot['content_hash']] = extract(load(snapshot['id'])['content'])
+        value = values[snapshot['content_hash']]
+        if index == 0 or value != previous:
+            result.append((snapshot, previous, value))
+        previous = value
+    return result
+
+
+def stats():
+    """归档占用统计：快照数、文档数、解析结果数、原始大小和存储大小（字节）"""
+    with _lock:
+        connection = _db.connection()
+        snapshot_count = connection.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        blob_count, raw_size, blob_size = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+        ).fetchone()
+        content_count, content_size = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM contents"
+        ).fetchone()
+    return {
+        'snapshots': snapshot_count,
+        'blobs': blob_count,
+        'contents': content_count,
+        'raw_size': raw_size,
+        'stored_size': blob_size + content_size
+    }
@@ -0,0 +1,152 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+
+import http_client
+import instrument
+import memory
+import notifier
+import profiler
+from scheduler import TickScheduler, spread_phase
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMonitorEngine:
+    """在单个进程的事件循环中以协程方式运行多个监控
+
+    每个监控需要提供 restore_state / fetch_html / startup / process / report_error / shutdown 方法。
+    页面请求通过 http_client 的异步接口复用连接池（提供 fetch_html_async 的监控
+    使用自己的异步获取方式，如华为文档的批量请求），解析和通知在线程池中执行，
+    不会阻塞其他监控的调度。所有监控的检查时间由同一个定时器按绝对截止时间安排。
+    """
+
+    def __init__(self, retry_interval=60):
+        self.retry_interval = retry_interval
+        self.monitors = []  # [(name, monitor, interval)]
+
+    def add_monitor(self, name, monitor, interval):
+        """添加一个监控"""
+        self.monitors.append((name, monitor, interval))
+
+    async def _in_thread(self, func, *args, **kwargs):
+        """在默认线程池中执行阻塞函数
+
+        函数在调用方的上下文中执行，memory.cycle() 的文档树登记、耗时统计和日志的当前目标
+        都能传到线程中。
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, functools.partial(context.run, func, *args, **kwargs))
+
+    async def _fetch(self, monitor, conditional=False):
+        """获取监控页面的原始内容"""
+        if hasattr(monitor, 'fetch_html_async'):
+            return await monitor.fetch_html_async(conditional=conditional)
+        return await http_client.run_async(monitor.fetch_html, conditional=conditional)
+
+    async def _start_monitor(self, name, monitor):
+        """获取初始内容并发送启动通知，失败时等待后重试
+
+        监控能从状态存储恢复时直接继续轮询，不再重复获取和通知。
+        """
+        if await self._in_thread(monitor.restore_state):
+            logger.info("%s 已从状态存储恢复", name)
+            return
+
+        while True:
+            try:
+                with instrument.check(name), memory.cycle(name):
+                    html_content = await self._fetch(monitor)
+                    await self._in_thread(monitor.startup, html_content)
+                logger.info("%s 启动成功", name)
+                return
+            except Exception as e:
+                logger.error("%s 启动失败: %s", name, e)
+                logger.info("%s秒后重试...", self.retry_interval)
+                await asyncio.sleep(self.retry_interval)
+
+    async def _start_and_schedule(self, index, name, monitor, interval):
+        """启动监控并加入定时器，各监控的轮询相位在一个间隔内均匀错开"""
+        await self._start_monitor(name, monitor)
+        schedule = getattr(monitor, 'schedule', None)
+        delay = schedule.next_interval() if schedule else interval
+        self.timer.add(name, delay, spread_phase(index, len(self.monitors), interval))
+        self.wakeup.set()
+
+    async def _check(self, name, monitor, interval):
+        """执行一次检查，完成后按下一次的间隔重新加入定时器
+
+        监控提供 schedule（AdaptiveSchedule）时按其计算的间隔轮询，否则使用固定间隔。
+        """
+        schedule = getattr(monitor, 'schedule', None)
+        try:
+            logger.info("[%s] 开始新一轮检查...", name)
+            with instrument.check(name), memory.cycle(name):
+                html_content = await self._fetch(monitor, conditional=True)
+                changed = await self._in_thread(monitor.process, html_content)
+            profiler.cycle_done()
+            if schedule:
+                await self._in_thread(schedule.record, changed)
+                delay = schedule.next_interval()
+            else:
+                delay = interval
+        except Exception as e:
+            await self._in_thread(monitor.report_error, e)
+            if schedule:
+                schedule.record_error()
+                delay = schedule.next_interval()
+            else:
+                delay = self.retry_interval
+            logger.info("[%s] %.0f秒后重试...", name, delay)
+
+        self.timer.reschedule(name, delay)
+        self.wakeup.set()
+
+    async def _dispatch(self, checks):
+        """等待到最近的截止时间，触发所有到期的检查"""
+        entries = {name: (monitor, interval) for name, monitor, interval in self.monitors}
+        while True:
+            deadline = self.timer.next_deadline()
+            timeout = None if deadline is None else max(0, deadline - time.time())
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            for name in self.timer.pop_due():
+                monitor, interval = entries[name]
+                task = asyncio.ensure_future(self._check(name, monitor, interval))
+                checks.add(task)
+                task.add_done_callback(checks.discard)
+
+    async def _run_all(self):
+        """启动所有监控，由定时器统一调度检查"""
+        self.timer = TickScheduler()
+        self.wakeup = asyncio.Event()
+        checks = set()
+        tasks = [asyncio.ensure_future(self._dispatch(checks))] + [
+            asyncio.ensure_future(self._start_and_schedule(index, name, monitor, interval))
+            for index, (name, monitor, interval) in enumerate(self.monitors)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks + list(checks):
+                task.cancel()
+
+    def run(self):
+        """运行事件循环，直到收到退出信号"""
+        logger.info("以 asyncio 模式启动 %s 个监控...", len(self.monitors))
+        try:
+            asyncio.run(self._run_all())
+        except KeyboardInterrupt:
+            logger.info("收到退出信号，正在停止监控...")
+            for name, monitor, interval in self.monitors:
+                monitor.shutdown()
+            notifier.flush()
+        finally:
+            http_client.close()
@@ -0,0 +1,222 @@
+"""解析器离线基准测试
+
+用法:
+    python benchmarks/bench_parsers.py record            # 录制真实接口响应到 fixtures/
+    python benchmarks/bench_parsers.py run               # 使用录制的页面（缺失时使用合成页面）测试
+    python benchmarks/bench_parsers.py run --scales 1,10,100 --iterations 20
+    python benchmarks/bench_parsers.py run --stages      # 同时输出各项目的分阶段耗时
+
+测试项目：
+    honor.debugger   HonorMonitor.parse_debugger_info
+    honor.engine     HonorMonitor.parse_engine_info
+    huawei.loader    WebMonitor.parse_html（加载器部分提取）
+    huawei.version   VersionMonitor.parse_html（版本说明表格解析）
+
+每项输出吞吐量、p50 / p99 耗时和峰值内存。更新日志类页面会按 --scales
+复制最新版本的内容块放大，观察页面增长后的耗时变化。
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic  # noqa: E402
+import http_client  # noqa: E402
+import huawei_portal  # noqa: E402
+import instrument  # noqa: E402
+import metrics  # noqa: E402
+from config import INSTRUMENT_CONFIG  # noqa: E402
+from config import MONITOR_CONFIG  # noqa: E402
+from honorMonitor import HonorMonitor  # noqa: E402
+from monitor_registry import create_monitor, get_monitor_type  # noqa: E402
+from parsing import get_backend, make_soup  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+HONOR_FIXTURE = 'honor_101380.json'
+HUAWEI_LOADER_FIXTURE = 'huawei_loader.json'
+HUAWEI_VERSION_FIXTURE = 'huawei_version.json'
+
+
+def record():
+    """录制荣耀和华为接口的原始响应"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+
+    monitor = HonorMonitor('', '')
+    response = http_client.get(
+        monitor.api_url,
+        params={"platformNo": "10001", "lang": "cn"},
+        headers={
+            'Accept': 'application/json, text/plain, */*',
+            'Referer': 'https://developer.honor.com/cn/doc/guides/101380',
+            'terminal-lang': 'cn'
+        }
+    )
+    response.raise_for_status()
+    _write_fixture(HONOR_FIXTURE, response.content)
+
+    for fixture, key in ((HUAWEI_LOADER_FIXTURE, 'huawei_loader'), (HUAWEI_VERSION_FIXTURE, 'huawei_version')):
+        catalog_name, object_id = huawei_portal.parse_document_url(MONITOR_CONFIG[key]['url'])
+        response = http_client.post(
+            huawei_portal.DOCUMENT_API_URL,
+            json={"objectId": object_id, "version": "", "catalogName": catalog_name, "language": "cn"},
+            headers=huawei_portal.HEADERS
+        )
+        response.raise_for_status()
+        _write_fixture(fixture, response.content)
+
+
+def _write_fixture(name, content):
+    """保存录制的响应"""
+    path = os.path.join(FIXTURES_DIR, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    print(f"已录制 {name} ({len(content)} 字节)")
+
+
+def load_pages():
+    """读取录制的页面，缺失时使用合成页面
+
+    返回 {'honor': (html, 来源), 'huawei_loader': ..., 'huawei_version': ...}
+    """
+    def read(name, extract, fallback):
+        path = os.path.join(FIXTURES_DIR, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return extract(json.loads(f.read())), 'fixture'
+        return fallback(), 'synthetic'
+
+    return {
+        'honor': read(
+            HONOR_FIXTURE,
+            lambda data: data['data']['documentInfo']['text'],
+            synthetic.honor_page
+        ),
+        'huawei_loader': read(
+            HUAWEI_LOADER_FIXTURE,
+            lambda data: data['value']['content']['content'],
+            synthetic.huawei_loader_page
+        ),
+        'huawei_version': read(
+            HUAWEI_VERSION_FIXTURE,
+            lambda data: data['value']['content']['content'],
+            synthetic.huawei_version_page
+        )
+    }
+
+
+def build_cases(pages, scales):
+    """生成测试项目 [(名称, 放大倍数, html 字节数, 待测函数)]"""
+    honor = HonorMonitor('', '')
+    loader = create_monitor(MONITOR_CONFIG['huawei_loader'])
+    version = create_monitor(MONITOR_CONFIG['huawei_version'])
+    parse_loader = get_monitor_type('huawei_loader').step(loader, 'parser')
+    parse_version = get_monitor_type('huawei_version').step(version, 'parser')
+
+    cases = []
+    for scale in scales:
+        honor_html = synthetic.enlarge_honor_page(pages['honor'][0], scale)
+        version_html = synthetic.enlarge_huawei_version_page(pages['huawei_version'][0], scale)
+        size = len(honor_html.encode('utf-8'))
+
+        cases.append(('honor.debugger', scale, size,
+                      lambda html=honor_html: honor.parse_debugger_info(make_soup(html))))
+        cases.append(('honor.engine', scale, size,
+                      lambda html=honor_html: honor.parse_engine_info(make_soup(html))))
+        cases.append(('huawei.version', scale, len(version_html.encode('utf-8')),
+                      lambda html=version_html: parse_version(html)))
+
+    # 加载器页面不是更新日志，不做放大
+    loader_html = pages['huawei_loader'][0]
+    cases.append(('huawei.loader', 1, len(loader_html.encode('utf-8')),
+                  lambda html=loader_html: parse_loader(html)))
+    return cases
+
+
+def measure(func, iterations):
+    """测量耗时分布和峰值内存"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # 预热
+        func()
+
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - start)
+
+        # 峰值内存单独测量，避免 tracemalloc 影响耗时
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    durations.sort()
+    return {
+        'p50': statistics.median(durations),
+        'p99': durations[min(len(durations) - 1, int(len(durations) * 0.99))],
+        'mean': statistics.mean(durations),
+        'peak': peak
+    }
+
+
+def run(scales, iterations, case_filter=None, stages=False):
+    """运行基准测试并输出结果表格，stages 为 True 时再输出各项目的分阶段耗时"""
+    if stages:
+        INSTRUMENT_CONFIG['export'] = False
+        instrument.enable()
+    pages = load_pages()
+    print(f"解析器: {get_backend()}")
+    for name, (html, source) in pages.items():
+        print(f"页面 {name}: {source}, {len(html.encode('utf-8'))} 字节")
+    print()
+
+    header = f"{'项目':<16}{'放大':>6}{'大小(KB)':>10}{'次/秒':>10}{'MB/秒':>9}{'p50(ms)':>10}{'p99(ms)':>10}{'峰值内存(MB)':>14}"
+    print(header)
+    print('-' * len(header))
+
+    for name, scale, size, func in build_cases(pages, scales):
+        if case_filter and case_filter not in name:
+            continue
+        metrics.bind_target(f"{name}@{scale}x")
+        result = measure(func, iterations)
+        print(
+            f"{name:<16}{scale:>5}x{size / 1024:>10.1f}"
+            f"{1 / result['mean']:>10.1f}{size / result['mean'] / 1024 / 1024:>9.2f}"
+            f"{result['p50'] * 1000:>10.2f}{result['p99'] * 1000:>10.2f}"
+            f"{result['peak'] / 1024 / 1024:>14.2f}"
+        )
+
+    if stages:
+        print()
+        print(instrument.format_summary())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析器离线基准测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('record', help="录制真实接口响应")
+
+    run_parser = subparsers.add_parser('run', help="运行基准测试")
+    run_parser.add_argument('--scales', default='1,10,100', help="更新日志放大倍数，逗号分隔")
+    run_parser.add_argument('--iterations', type=int, default=20, help="每个项目的测量次数")
+    run_parser.add_argument('--filter', default=None, help="只运行名称包含该字符串的项目")
+    run_parser.add_argument('--stages', action='store_true', help="输出各项目的分阶段耗时")
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record()
+    else:
+        scales = [int(scale) for scale in args.scales.split(',') if scale]
+        run(scales, args.iterations, args.filter, args.stages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""冷启动基准测试
+
+用法:
+    python benchmarks/bench_startup.py                 # 每个监控类型测量 5 次取中位数
+    python benchmarks/bench_startup.py --runs 10 --eager
+
+每次测量启动一个新的 Python 进程，依次模拟管理器和监控子进程的启动：
+    导入       import monitor_all（管理器进程需要导入的全部模块）
+    首次获取   创建监控（按需导入监控模块）并获取到第一份文档
+    首次通知   解析文档并发出启动通知（webhook 请求发出）
+时间均从进程启动时开始计算。网络请求使用录制的页面（缺失时使用合成页面）在本地应答，
+状态、归档和发件箱写入临时目录，不影响正式数据。--eager 时额外测量在导入管理器前
+预先导入所有监控模块的情况，对比按需导入节省的时间。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MONITOR_TYPES = ('honor', 'huawei_loader', 'huawei_version')
+EAGER_MODULES = ('honorMonitor', 'huaweiJZQ', 'huaweiSM', 'async_engine')
+HEAVY_MODULES = ('requests', 'bs4', 'lxml', 'asyncio')
+
+
+def _fake_response(body):
+    """构造本地应答的响应"""
+    import requests
+
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = body
+    response._content_consumed = True
+    response.encoding = 'utf-8'
+    return response
+
+
+def child(monitor_type, workdir, eager):
+    """在新进程中执行一次启动，输出各阶段的时间戳"""
+    begin = time.time()
+    sys.path.insert(0, ROOT)
+    if eager:
+        for module in EAGER_MODULES:
+            __import__(module)
+
+    import monitor_all  # noqa: F401
+    imported = time.time()
+    supervisor_modules = [module for module in HEAVY_MODULES if module in sys.modules]
+
+    import config
+    import http_client
+    import notifier
+    from monitor_registry import create_monitor, expand_targets
+
+    config.STATE_CONFIG['path'] = os.path.join(workdir, 'state.db')
+    config.ARCHIVE_CONFIG['path'] = os.path.join(workdir, 'archive.db')
+    config.NOTIFY_CONFIG['path'] = os.path.join(workdir, 'outbox.db')
+    config.LOG_CONFIG['file'] = ''
+
+    with open(os.path.join(workdir, f'{monitor_type}.json'), 'rb') as f:
+        document = f.read()
+    timestamps = {}
+
+    def request(method, url, **kwargs):
+        if 'feishu' in url:
+            timestamps.setdefault('notified', time.time())
+            return _fake_response(b'{"code":0}')
+        return _fake_response(document)
+
+    http_client.request = request
+    notifier.start()
+
+    name = monitor_type
+    monitor = create_monitor(expand_targets(config.MONITOR_CONFIG)[name], name)
+    html = monitor.fetch_html()
+    fetched = time.time()
+    monitor.startup(html)
+    notifier.flush(timeout=30)
+
+    print(json.dumps({
+        'begin': begin,
+        'imported': imported,
+        'fetched': fetched,
+        'notified': timestamps.get('notified'),
+        'supervisor_modules': supervisor_modules
+    }))
+
+
+def _write_documents(workdir):
+    """把录制（或合成）的页面包装成接口响应，供子进程读取"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from bench_parsers import load_pages
+
+    pages = load_pages()
+    honor_html, _ = pages['honor']
+    envelopes = {
+        'honor': {'code': '200', 'data': {'documentInfo': {'text': honor_html}}},
+        'huawei_loader': {'code': 0, 'value': {'content': {'content': pages['huawei_loader'][0]}}},
+        'huawei_version': {'code': 0, 'value': {'content': {'content': pages['huawei_version'][0]}}}
+    }
+    for name, envelope in envelopes.items():
+        with open(os.path.join(workdir, f'{name}.json'), 'w', encoding='utf-8') as f:
+            json.dump(envelope, f, ensure_ascii=False)
+
+
+def measure(monitor_type, workdir, eager):
+    """启动一个新进程测量一次，返回 (进程启动, 导入, 首次获取, 首次通知) 的毫秒数和管理器加载的模块"""
+    rundir = tempfile.mkdtemp(dir=workdir)
+    with open(os.path.join(workdir, f'{monitor_type}.json'), 'rb') as src, \
+            open(os.path.join(rundir, f'{monitor_type}.json'), 'wb') as dst:
+        dst.write(src.read())
+
+    command = [sys.executable, os.path.abspath(__file__), '_child', monitor_type, rundir]
+    if eager:
+        command.append('--eager')
+    start = time.time()
+    output = subprocess.run(command, cwd=rundir, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    def since_start(key):
+        return (result[key] - start) * 1000 if result[key] else float('nan')
+
+    return (
+        since_start('begin'),
+        (result['imported'] - result['begin']) * 1000,
+        since_start('fetched'),
+        since_start('notified')
+    ), result['supervisor_modules']
+
+
+def run(runs, eager):
+    """运行基准测试并输出结果表格"""
+    header = f"{'监控':<16}{'导入方式':<10}{'进程启动(ms)':>14}{'导入(ms)':>10}{'首次获取(ms)':>14}{'首次通知(ms)':>14}"
+    print(header)
+    print('-' * len(header))
+
+    supervisor_modules = set()
+    with tempfile.TemporaryDirectory() as workdir:
+        _write_documents(workdir)
+        for monitor_type in MONITOR_TYPES:
+            for mode in (('lazy', False),) + ((('eager', True),) if eager else ()):
+                samples = []
+                for _ in range(runs):
+                    sample, modules = measure(monitor_type, workdir, mode[1])
+                    samples.append(sample)
+                    if not mode[1]:
+                        supervisor_modules.update(modules)
+                medians = [statistics.median(values) for values in zip(*samples)]
+                print(
+                    f"{monitor_type:<16}{mode[0]:<10}{medians[0]:>14.1f}{medians[1]:>10.1f}"
+                    f"{medians[2]:>14.1f}{medians[3]:>14.1f}"
+                )
+
+    print()
+    print(f"管理器导入的第三方模块: {', '.join(sorted(supervisor_modules)) or '无'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动基准测试")
+    parser.add_argument('--runs', type=int, default=5, help="每个监控类型的测量次数")
+    parser.add_argument('--eager', action='store_true', help="同时测量预先导入所有监控模块的情况")
+
+    if len(sys.argv) > 1 and sys.argv[1] == '_child':
+        child(sys.argv[2], sys.argv[3], '--eager' in sys.argv[4:])
+        return
+
+    args = parser.parse_args()
+    run(args.runs, args.eager)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""合成页面与页面放大
+
+没有录制的真实页面时，按真实页面的结构生成荣耀快应用文档和华为文档；
+有录制页面时，通过复制最新版本的内容块把更新日志放大到指定的版本数量，
+用于观察页面持续增长后的解析耗时变化。
+"""
+import re
+
+# 荣耀引擎更新日志中的版本链接
+HONOR_VERSION_LINK = re.compile(r'<a[^>]*>\s*(V\d+\.\d+\.\d+\.\d+)\s*</a>')
+
+# 华为版本说明中的版本标题（带发布日期，不包括文档标题）
+HUAWEI_VERSION_TITLE = re.compile(r'<h[1-4][^>]*>(?:(?!</h[1-4]>).)*?版本更新说明（', re.S)
+
+
+def honor_page(releases=20, debugger_rows=5):
+    """生成荣耀快应用文档页面（调试器下载表格 + 引擎版本更新日志）"""
+    parts = [
+        '<h1 id="h1-1717124946965">快应用调试器下载</h1>',
+        '<table><tr><th>快应用引擎版本号</th><th>荣耀引擎版本号</th><th>快应用联盟平台版本号</th>'
+        '<th>下载地址</th><th>调试器版本号</th><th>功能</th></tr>'
+    ]
+    for i in range(debugger_rows):
+        v = debugger_rows - i
+        parts.append(
+            f'<tr><td>1.{v}.0</td><td>9.0.{v}.100</td><td>11{v}0</td>'
+            f'<td><a href="https://example.com/debugger_{v}.apk">下载</a></td>'
+            f'<td>V14.{v}.0.300</td><td><p>新增：调试器功能{v}</p>\n<p>优化：调试器体验{v}</p></td></tr>'
+        )
+    parts.append('</table>')
+
+    parts.append('<div><h1 id="h1-1717124999999">快应用引擎版本更新日志</h1>')
+    for i in range(releases):
+        v = releases - i
+        parts.append(f'<p><a href="https://example.com/engine_V15.{v}.0.301.apk">V15.{v}.0.301</a></p>')
+        parts.append(f'<p>上线时间 2024-{v % 12 + 1:02d}-10</p>')
+        parts.append(
+            f'<table><tr><td>荣耀快应用引擎平台</td><td>15.{v}.0</td></tr>'
+            f'<tr><td>快应用联盟平台</td><td>11{v}0</td></tr></table>'
+        )
+        parts.append('<p>功能</p><ul>')
+        for j in range(6):
+            parts.append(f'<li><p>● 新增：引擎能力{v}-{j}<span>，支持组件{j}</span></p></li>')
+        parts.append(f'<li><p>● 优化：渲染性能{v}</p></li><li><p>● 废弃：旧接口{v}</p></li></ul>')
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+def huawei_loader_page(builds=8):
+    """生成华为快应用加载器下载页面"""
+    parts = ['<h2>快应用加载器下载</h2><div id="section9347192715112"><table><tr><th>文件</th><th>说明</th></tr>']
+    for i in range(builds):
+        v = 300 + i
+        parts.append(
+            f'<tr><td><a href="https://example.com/HwQuickApp_Loader_Phone_V14.4.1.{v}.apk">'
+            f'HwQuickApp_Loader_Phone_V14.4.1.{v}.apk</a></td><td>（支持{1100 + i}规范）手机加载器</td></tr>'
+        )
+        parts.append(
+            f'<tr><td><a href="https://example.com/HwQuickApp_Loader_Tablet_V14.4.1.{v}.apk">'
+            f'HwQuickApp_Loader_Tablet_V14.4.1.{v}.apk</a></td><td>支持{1100 + i}规范</td></tr>'
+        )
+    parts.append('</table></div>')
+    return ''.join(parts)
+
+
+def huawei_version_page(releases=20, rows=4):
+    """生成华为快应用版本说明页面"""
+    parts = ['<h1>快应用版本更新说明</h1>']
+    for i in range(releases):
+        v = releases - i
+        parts.append(f'<h2>{v}.0.0版本更新说明（2024-{v % 12 + 1:02d}-01）</h2>')
+        for kind in ('组件', '接口'):
+            parts.append(f'<h4>{kind}</h4><table><tr><th>名称</th><th>描述</th></tr>')
+            for r in range(rows):
+                parts.append(
+                    f'<tr><td>{kind}{v}-{r}</td><td><p>新增{kind}能力{v}-{r}。调整了行为{r}。详情请参见文档。</p>'
+                    f'<p><a href="https://developer.huawei.com/consumer/cn/doc/quickApp-References/{kind}-{v}-{r}">'
+                    f'{kind}{v}-{r}</a></p></td></tr>'
+                )
+            parts.append('</table>')
+    return ''.join(parts)
+
+
+def _enlarge(html, markers, factor, rename):
+    """复制最新版本的内容块，使页面包含约 factor 倍的版本
+
+    markers 为各版本内容块的起始位置，复制的块插入在最新版本之后，
+    rename(block, index) 为复制出的块生成不同的版本号，保证最新版本的解析结果不变。
+    """
+    if factor <= 1 or len(markers) < 2:
+        return html
+    start, end = markers[0], markers[1]
+    block = html[start:end]
+    copies = len(markers) * (factor - 1)
+    extra = ''.join(rename(block, index) for index in range(copies))
+    return html[:end] + extra + html[end:]
+
+
+def enlarge_honor_page(html, factor):
+    """放大荣耀引擎版本更新日志"""
+    markers = []
+    for match in HONOR_VERSION_LINK.finditer(html):
+        paragraph = html.rfind('<p', 0, match.start())
+        markers.append(paragraph if paragraph != -1 else match.start())
+    markers = sorted(set(markers))
+
+    def rename(block, index):
+        return HONOR_VERSION_LINK.sub(
+            lambda m: m.group(0).replace(m.group(1), f'V0.{index // 1000}.{index % 1000}.1'),
+            block
+        )
+
+    return _enlarge(html, markers, factor, rename)
+
+
+def enlarge_huawei_version_page(html, factor):
+    """放大华为版本说明"""
+    markers = [match.start() for match in HUAWEI_VERSION_TITLE.finditer(html)]
+
+    def rename(block, index):
+        return block.replace('版本更新说明', f'(副本{index})版本更新说明', 1)
+
+    return _enlarge(html, markers, factor, rename)
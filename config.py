@@ -1,7 +1,21 @@
 # 监控配置
+# type 为 monitor_registry 中注册的监控类型，省略时使用配置名。
+# 同一类型需要监控多个页面时可以配置 targets 列表，每个目标至少包含 id，
+# 其余字段覆盖外层配置，例如：
+#     'huawei_docs': {
+#         'type': 'huawei_version',
+#         'name': '华为快应用文档监控',
+#         'webhook': "your_webhook_url",
+#         'check_interval': 300,
+#         'targets': [
+#             {'id': 'version-updates', 'url': "https://developer.huawei.com/consumer/cn/doc/quickApp-Guides/quickapp-version-updates-0000001079803874"},
+#             {'id': 'other-doc', 'url': "https://developer.huawei.com/consumer/cn/doc/<catalogName>/<objectId>"}
+#         ]
+#     }
 MONITOR_CONFIG = {
     # 荣耀快应用监控配置
     'honor': {
+        'type': 'honor',
         'name': '荣耀快应用监控',
         'debugger_webhook': "https://open.feishu.cn/open-apis/bot/v2/hook/3359b367-baf6-44c4-8536-3ebd7aedc03e",
         'engine_webhook': "https://open.feishu.cn/open-apis/bot/v2/hook/5fe61b9f-a14e-468e-aeb7-72b473f2e6df",
@@ -10,6 +24,7 @@ MONITOR_CONFIG = {
     
     # 华为快应用加载器监控配置
     'huawei_loader': {
+        'type': 'huawei_loader',
         'name': '华为快应用加载器监控',
         'url': "https://developer.huawei.com/consumer/cn/doc/Tools-Library/quickapp-ide-download-0000001101172926",
         'webhook': "https://open.feishu.cn/open-apis/bot/v2/hook/b5d78e2d-502d-42c7-81d2-48eebf43224e",
@@ -18,6 +33,7 @@ MONITOR_CONFIG = {
     
     # 华为快应用版本说明监控配置
     'huawei_version': {
+        'type': 'huawei_version',
         'name': '华为快应用版本监控',
         'url': "https://developer.huawei.com/consumer/cn/doc/quickApp-Guides/quickapp-version-updates-0000001079803874",
         'webhook': "https://open.feishu.cn/open-apis/bot/v2/hook/1a11a0f0-b246-423c-909f-5ebbbbf4e2f4",
@@ -27,6 +43,7 @@ MONITOR_CONFIG = {
 
 # 进程管理配置
 PROCESS_CONFIG = {
+    'mode': 'process',            # 运行模式：process 每个监控一个进程；asyncio 所有监控在一个进程的事件循环中运行
     'health_check_interval': 60,  # 1分钟检查一次进程健康
     'restart_on_crash': True,     # 进程崩溃时自动重启
     'max_restarts': 3,            # 最大重启次数
@@ -40,4 +57,116 @@ STATUS_MONITOR_CONFIG = {
     'shutdown_notify': True,  # 是否发送停止通知
     'error_notify': True,    # 是否发送错误通知
     'heartbeat_notify': True  # 是否发送心跳通知
-} 
\ No newline at end of file
+}
+
+# HTTP 连接池配置
+HTTP_CONFIG = {
+    'pool_connections': 10,   # 每个进程缓存的主机连接池数量
+    'pool_maxsize': 10,       # 每个主机连接池的最大连接数
+    'pool_block': False,      # 连接池耗尽时是否阻塞等待
+    'max_retries': 0,         # 连接层重试次数（业务重试由各监控自行处理）
+    'connect_timeout': 10,    # 建立连接超时时间（秒）
+    'read_timeout': 30,       # 读取响应超时时间（秒）
+    # 按主机单独配置连接池，未配置的主机使用上面的默认值
+    'hosts': {
+        'https://developer.honor.com': {'pool_maxsize': 4},
+        'https://svc-drcn.developer.huawei.com': {'pool_maxsize': 8},
+        'https://open.feishu.cn': {'pool_maxsize': 4}
+    }
+}
+
+# 状态持久化配置
+STATE_CONFIG = {
+    'enabled': True,            # 是否持久化监控状态，重启后从上次的状态继续监控
+    'path': 'data/state.db'     # SQLite 数据库路径
+}
+
+# 快照归档配置
+ARCHIVE_CONFIG = {
+    'enabled': True,            # 是否归档每次变化后的原始文档和解析结果
+    'path': 'data/archive.db',  # SQLite 数据库路径
+    'compress_level': 9,        # zlib 压缩级别
+    'store_raw': True           # 是否保存原始文档，关闭后只保存解析结果
+}
+
+# 日志配置
+LOG_CONFIG = {
+    'level': 'INFO',                # 日志级别，DEBUG 时输出请求、页面内容和解析过程的详细信息
+    'levels': {},                   # 单个模块的日志级别，如 {'honorMonitor': 'DEBUG'}
+    'console': True,                # 是否输出到控制台
+    'file': 'logs/monitor.log',     # 日志文件路径，为空时不写文件
+    'max_bytes': 10 * 1024 * 1024,  # 单个日志文件的大小上限（字节），超过后滚动
+    'backup_count': 5,              # 保留的历史日志文件数
+    'format': '%(asctime)s %(levelname)s %(processName)s %(name)s [%(target)s] %(message)s'
+}
+
+# 指标接口配置
+METRICS_CONFIG = {
+    'enabled': True,            # 是否在管理器中提供指标接口
+    'host': '127.0.0.1',        # 监听地址，默认只允许本机抓取
+    'port': 9108,               # 监听端口，访问 http://host:port/metrics
+    'queue_size': 10000         # 子进程发送指标的队列长度，队列满时丢弃
+}
+
+# 采样分析配置，向监控进程或管理器发送 SIGUSR1（kill -USR1 <pid>）开始采样
+PROFILE_CONFIG = {
+    'cycles': 5,                # 采样持续的检查次数，asyncio 模式下为所有目标的检查次数之和
+    'interval': 0.005,          # 采样间隔（秒）
+    'max_seconds': 3600,        # 最长采样时间（秒），检查间隔较长时提前结束
+    'path': 'logs/profiles'     # 输出目录，每次采样写入一个 collapsed stack 文件
+}
+
+# 内存回收与泄漏排查配置
+MEMORY_CONFIG = {
+    'decompose': True,          # 每次检查结束后拆除本次创建的文档树，解除 bs4 节点间的循环引用
+    'gc_generation': 2,         # 每次检查结束后主动回收的代数（0-2），None 不主动回收
+    'freeze': True,             # 第一次检查完成后冻结已有对象，之后的回收不再扫描启动时创建的对象
+    'tracemalloc': False,       # 是否追踪内存分配，排查内存增长时开启（有额外的内存和耗时开销）
+    'frames': 1,                # 每次分配记录的调用栈深度，大于 1 时按调用栈汇总
+    'report_interval': 3600,    # 与开始追踪时的快照对比并写入日志的间隔（秒）
+    'top': 10                   # 报告中列出的增长最多的分配位置数量
+}
+
+# 分阶段耗时统计配置
+INSTRUMENT_CONFIG = {
+    'enabled': False,           # 是否统计请求、解码、解析、哈希、比较、渲染、发送等各阶段的耗时
+    'export': True,             # 是否同时输出到指标接口（quickapp_stage_seconds）
+    'report_interval': 3600     # 每隔多少秒把各目标的分阶段汇总表写入日志，0 表示不输出
+}
+
+# HTML 解析配置
+PARSER_CONFIG = {
+    'backend': 'lxml'           # 解析器：lxml（更快，未安装时自动回退）或 html.parser
+}
+
+# 华为文档门户配置
+HUAWEI_PORTAL_CONFIG = {
+    'batch_window': 1.0,      # asyncio 模式下合并请求的时间窗口（秒）
+    'max_concurrency': 4      # 同一批次中并发请求的文档数
+}
+
+# 通知发送配置
+NOTIFY_CONFIG = {
+    'enabled': True,            # 是否通过发件箱异步发送，关闭时在监控循环中同步发送
+    'path': 'data/outbox.db',   # 发件箱 SQLite 数据库路径，未发送的通知重启后继续发送
+    'max_concurrency': 4,       # 同时发送的通知数（同一个 webhook 按顺序发送）
+    'timeout': 10,              # 单次发送超时时间（秒）
+    'max_attempts': 8,          # 最大发送次数，超过后标记为失败
+    'backoff_base': 5,          # 重试退避基数（秒），每次失败后翻倍
+    'backoff_max': 600,         # 最大重试间隔（秒）
+    'lease': 60,                # 领取通知后的租约时间（秒），进程异常退出后由其他进程接手
+    'poll_interval': 1,         # 发送线程空闲时检查发件箱的间隔（秒）
+    'flush_timeout': 10         # 退出前等待通知发送的最长时间（秒）
+}
+
+# 轮询调度配置
+SCHEDULE_CONFIG = {
+    'adaptive': True,         # 是否根据历史更新时间调整轮询间隔，关闭时固定使用 check_interval
+    'min_interval': 60,       # 最短轮询间隔（秒）
+    'max_interval': 1800,     # 最长轮询间隔（秒），也是出错重试的最长间隔
+    'min_changes': 3,         # 至少记录到几次更新后才开始调整
+    'history_size': 50,       # 参与统计的最近更新次数
+    'window_hours': 2,        # 统计当前时间前后几个小时内的历史更新
+    'jitter': 0.1,            # 触发时间随机抖动幅度（间隔的比例）
+    'spread': True            # 是否将各监控目标的轮询时间均匀错开
+}
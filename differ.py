@@ -0,0 +1,89 @@
+class Delta:
+    """两次解析结果之间的差异
+
+    added / removed 为 {键: 值}，modified 为 {键: (旧值, 新值)}，
+    顺序与新结果（removed 为旧结果）中的顺序一致。
+    """
+
+    __slots__ = ('added', 'removed', 'modified')
+
+    def __init__(self, added=None, removed=None, modified=None):
+        self.added = added or {}
+        self.removed = removed or {}
+        self.modified = modified or {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+
+    def __repr__(self):
+        return f"Delta(added={self.added!r}, removed={self.removed!r}, modified={self.modified!r})"
+
+
+def diff_maps(old, new):
+    """按键比较两个字典，各遍历一次得到新增、删除和修改的项"""
+    old = old or {}
+    new = new or {}
+    added = {}
+    modified = {}
+    for key, value in new.items():
+        if key not in old:
+            added[key] = value
+        elif old[key] != value:
+            modified[key] = (old[key], value)
+    removed = {key: value for key, value in old.items() if key not in new}
+    return Delta(added, removed, modified)
+
+
+def keyed(items, key=None):
+    """把列表转为 {键: 元素}，key 为 None 时以元素本身为键，重复的键保留最后一个"""
+    if key is None:
+        return {item: item for item in items or []}
+    return {key(item): item for item in items or []}
+
+
+def diff_lists(old, new, key=None):
+    """按 key 比较两个列表，只关心元素的增删改，不关心顺序"""
+    return diff_maps(keyed(old, key), keyed(new, key))
+
+
+def diff_record(old, new):
+    """逐字段比较两条解析记录
+
+    返回 {字段: 差异}，只包含有变化的字段：列表字段按元素比较、字典字段按键比较，
+    差异为 Delta，只有顺序变化或重复元素的字段不算变化；其余字段的差异为 (旧值, 新值)。
+    """
+    old = old or {}
+    new = new or {}
+    changes = {}
+    for field in list(new) + [field for field in old if field not in new]:
+        old_value = old.get(field)
+        new_value = new.get(field)
+        if old_value == new_value:
+            continue
+        if isinstance(new_value, list) and isinstance(old_value, list):
+            delta = diff_lists(old_value, new_value)
+        elif isinstance(new_value, dict) and isinstance(old_value, dict):
+            delta = diff_maps(old_value, new_value)
+        else:
+            changes[field] = (old_value, new_value)
+            continue
+        if delta:
+            changes[field] = delta
+    return changes
+
+
+def describe_record_changes(changes):
+    """把 diff_record 的结果渲染为通知中的变化列表（markdown 行）"""
+    lines = []
+    for field, change in changes.items():
+        if not isinstance(change, Delta):
+            old_value, new_value = change
+            lines.append(f"✏️ {field}：`{old_value}` → `{new_value}`")
+            continue
+        for key, value in change.added.items():
+            lines.append(f"➕ {field}：{value}" if key == value else f"➕ {field}：{key} `{value}`")
+        for key, (old_value, new_value) in change.modified.items():
+            lines.append(f"✏️ {field}：{key} `{old_value}` → `{new_value}`")
+        for key, value in change.removed.items():
+            lines.append(f"➖ {field}：{value}" if key == value else f"➖ {field}：{key}")
+    return lines
@@ -0,0 +1,50 @@
+import hashlib
+
+import instrument
+
+
+def raw_fingerprint(content):
+    """计算原始文档内容的指纹
+
+    在解析 HTML 之前对接口返回的原始文本做哈希，指纹不变时可以跳过整页解析。
+    """
+    if content is None:
+        return None
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.md5(content).hexdigest()
+
+
+def _combine(leaves):
+    """合并一组叶子指纹"""
+    return hashlib.md5(''.join(leaves).encode('ascii')).hexdigest()
+
+
+class SectionTree:
+    """文档的分段指纹树
+
+    按 boundary 正则匹配到的位置把原始 HTML 切分为段落（每个标题、每个版本块），
+    叶子为各段落的 md5，根为全部叶子合并后的 md5。两次轮询的根相同说明文档没有变化；
+    根不同时比较叶子或连续几个段落的合并指纹，只重新解析发生变化的段落。
+    """
+
+    @instrument.timed('section_tree')
+    def __init__(self, html, boundary):
+        starts = [0] + [match.start() for match in boundary.finditer(html) if match.start() > 0]
+        self.html = html
+        self.spans = list(zip(starts, starts[1:] + [len(html)]))
+        self.leaves = [raw_fingerprint(html[start:end]) for start, end in self.spans]
+        self.root = _combine(self.leaves)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def section(self, start, end=None):
+        """第 start 到 end（不含）个段落的原始 HTML"""
+        end = start + 1 if end is None else end
+        return self.html[self.spans[start][0]:self.spans[end - 1][1]]
+
+    def digest(self, start, end=None):
+        """第 start 到 end（不含）个段落的合并指纹"""
+        end = start + 1 if end is None else end
+        return _combine(self.leaves[start:end])
@@ -1,11 +1,41 @@
-import requests
-import time
-import hashlib
 from datetime import datetime
-from bs4 import BeautifulSoup
+import html
 import json
+import logging
 import re
 
+import http_client
+import json_envelope
+import instrument
+import memory
+import profiler
+from parsing import make_soup, TextIndex
+import state_store
+import archive
+import notifier
+import metrics
+import log_setup
+from scheduler import AdaptiveSchedule
+from fingerprint import raw_fingerprint, SectionTree
+from process_runner import run_monitor
+from differ import diff_record, describe_record_changes
+from records import DebuggerInfo, EngineRelease
+from version import parse as parse_version
+
+logger = logging.getLogger(__name__)
+
+# 引擎更新日志中的版本链接
+VERSION_LINK = re.compile(r'<a[^>]*>\s*V\d+\.\d+\.\d+\.\d+\s*</a>')
+
+# 文档按一级标题和版本链接切分段落
+SECTION_BOUNDARY = re.compile(r'<h1[\s>]|' + VERSION_LINK.pattern)
+
+# 一级标题段落开头的标题标签：属性和标题内容
+H1_TAG = re.compile(r'<h1([^>]*)>(.*?)</h1\s*>', re.S)
+H1_ID = re.compile(r'\bid\s*=\s*["\']?([^"\'\s>]*)')
+
+SECTION_LABELS = {'debugger': '调试器', 'engine': '引擎更新日志'}
+
 class HonorMonitor:
     def __init__(self, debugger_webhook_url, engine_webhook_url, check_interval=300):
         self.api_url = "https://developer.honor.com/document/portal/tree/101380"
@@ -16,11 +46,19 @@ class HonorMonitor:
         self.last_engine_hash = None
         self.last_debugger_content = None
         self.last_engine_content = None
+        self.last_raw_hash = None
+        # 上次成功获取的页面内容，服务端返回 304 时复用
+        self.last_document = None
+        self.section_digests = {}  # {'debugger': 指纹, 'engine': 指纹}，段落未变化时跳过解析
+        self.schedule = AdaptiveSchedule('honor', self.api_url, check_interval)
 
-    def get_page_content(self):
-        """获取页面内容"""
+    def fetch_html(self, conditional=False):
+        """获取页面内容
+
+        conditional 为 True 时发送条件请求，服务端返回 304 时返回上次获取的内容。
+        """
         try:
-            print("正在获取页面内容...")
+            logger.info("正在获取页面内容...")
             params = {
                 "platformNo": "10001",
                 "lang": "cn"
@@ -42,51 +80,119 @@ class HonorMonitor:
                 'Sec-Fetch-Site': 'same-origin'
             }
             
-            print("发送请求...")
-            print(f"URL: {self.api_url}")
-            print(f"参数: {params}")
-            print(f"请求头: {headers}")
+            logger.debug("发送请求: URL=%s 参数=%s 请求头=%s", self.api_url, params, headers)
             
-            response = requests.get(self.api_url, params=params, headers=headers)
-            response.raise_for_status()
+            # 流式读取响应，只从 JSON 中取出需要的字段，不构建整个 JSON 对象
+            with metrics.timer('fetch_seconds', metrics.current_target()), instrument.stage('fetch'):
+                if conditional and self.last_document is not None:
+                    response = http_client.conditional_request(
+                        'GET', self.api_url, params=params, headers=headers, stream=True
+                    )
+                else:
+                    response = http_client.get(self.api_url, params=params, headers=headers, stream=True)
+                if http_client.is_not_modified(response):
+                    logger.info("页面未修改 (304)")
+                    response.close()
+                    return self.last_document
+                response.raise_for_status()
+                body = http_client.read_body(response)
             
-            print("\n=== 响应状态码 ===")
-            print(f"Status Code: {response.status_code}")
-            print("===================")
+            logger.debug("响应状态码: %s", response.status_code)
             
             if response.status_code == 200:
-                json_data = response.json()
-                if json_data.get('code') == '200':
+                with instrument.stage('json_decode'):
+                    code = json_envelope.load(body, ('code',))
+                if code == '200':
                     # 从 JSON 中提取 HTML 内容
-                    html_content = json_data.get('data', {}).get('documentInfo', {}).get('text', '')
+                    with instrument.stage('extract'):
+                        html_content = json_envelope.pop_string(body, ('data', 'documentInfo', 'text'), '')
                     
-                    print("\n=== HTML 内容（前1000字符）===")
-                    print(html_content[:1000])
-                    print("===================\n")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("HTML 内容（前1000字符）:\n%s", html_content[:1000])
                     
+                    self.last_document = html_content
                     return html_content
                 else:
-                    raise ValueError(f"API返回错误代码: {json_data.get('code')}")
+                    raise ValueError(f"API返回错误代码: {code}")
             else:
                 raise ValueError(f"HTTP状态码错误: {response.status_code}")
             
         except Exception as e:
-            print(f"获取页面内容失败: {str(e)}")
-            print(f"错误类型: {type(e)}")
-            if hasattr(e, 'response'):
-                print(f"响应状态码: {e.response.status_code}")
-                print(f"响应内容: {e.response.text[:500]}")
+            logger.error("获取页面内容失败: %s (%s)", e, type(e).__name__)
+            if getattr(e, 'response', None) is not None:
+                logger.debug("响应状态码: %s 响应内容: %s", e.response.status_code, e.response.text[:500])
             raise
 
+    @instrument.timed()
+    def split_sections(self, html_content):
+        """定位调试器和最新引擎版本所在的段落，返回 {名称: (指纹, html)}，无法定位时使用整个文档"""
+        tree = SectionTree(html_content, SECTION_BOUNDARY)
+        # 每个段落的类型：一级标题 'h1'、版本链接 'a'，文档开头的段落可能两者都不是
+        kinds = [html_content[start + 1:start + 3].rstrip('> \t\r\n') for start, end in tree.spans]
+        whole = (tree.root, html_content)
+        sections = {'debugger': whole, 'engine': whole}
+        
+        def find_h1(heading_id=None, text=None):
+            # 只匹配段落开头的一级标题本身（与整页解析一致：调试器按 id，引擎按标题文本），
+            # 目录或正文中引用这些标题的链接和文字不算
+            for index, kind in enumerate(kinds):
+                if kind != 'h1':
+                    continue
+                match = H1_TAG.match(html_content, tree.spans[index][0], tree.spans[index][1])
+                if not match:
+                    continue
+                if heading_id is not None:
+                    id_match = H1_ID.search(match.group(1))
+                    if id_match and heading_id in id_match.group(1):
+                        return index
+                elif text in html.unescape(re.sub(r'<[^>]+>', '', match.group(2))):
+                    return index
+            return None
+        
+        def next_h1(index):
+            return next((i for i in range(index + 1, len(tree)) if kinds[i] == 'h1'), len(tree))
+        
+        start = find_h1(heading_id='h1-1717124946965')
+        if start is not None:
+            end = next_h1(start)
+            sections['debugger'] = (tree.digest(start, end), tree.section(start, end))
+        
+        start = find_h1(text='快应用引擎版本更新日志')
+        if start is not None and 'a' not in kinds[:start]:
+            links = [i for i in range(start + 1, len(tree)) if kinds[i] == 'a']
+            end = min([next_h1(start)] + links[1:2])
+            markers = ''.join(VERSION_LINK.match(tree.section(i)).group(0) for i in links[1:])
+            sections['engine'] = (
+                raw_fingerprint(tree.digest(start, end) + markers),
+                tree.section(start, end) + markers
+            )
+        
+        return sections
+
+    def parse_section(self, sections, name, parser, html_content):
+        """解析 split_sections 定位的段落，返回 (解析结果, 段落指纹)
+
+        段落解析失败时退回整页解析，此时指纹为整个文档的指纹，下次文档变化时重新解析。
+        """
+        digest, section_html = sections[name]
+        if section_html is html_content:
+            return parser(make_soup(html_content)), digest
+        try:
+            result = parser(make_soup(section_html))
+            if result is not None:
+                return result, digest
+        except Exception as e:
+            logger.warning("%s段落解析失败（%s），改为解析整个文档", SECTION_LABELS[name], e)
+        return parser(make_soup(html_content)), raw_fingerprint(html_content)
+
+    @instrument.timed()
     def parse_debugger_info(self, soup):
         """解析调试器信息"""
         try:
             # 添加调试输出
-            print("\n=== HTML 结构 ===")
-            print("找到的所有 h1 标签:")
-            for h1 in soup.find_all('h1'):
-                print(f"ID: {h1.get('id', 'No ID')}, 文本: {h1.text}")
-            print("=================\n")
+            if logger.isEnabledFor(logging.DEBUG):
+                for h1 in soup.find_all('h1'):
+                    logger.debug("h1 标签: ID=%s 文本=%s", h1.get('id', 'No ID'), h1.text)
             
             # 修改 ID 的匹配方式，去掉引号
             debugger_section = soup.find('h1', id=lambda x: x and 'h1-1717124946965' in x)
@@ -103,21 +209,21 @@ class HonorMonitor:
             for row in rows:
                 cols = row.find_all('td')
                 if len(cols) >= 6:
-                    debugger_info = {
-                        "快应用引擎版本号": cols[0].get_text().strip(),
-                        "荣耀引擎版本号": cols[1].get_text().strip(),
-                        "快应用联盟平台版本号": cols[2].get_text().strip(),
-                        "下载地址": cols[3].find('a')['href'] if cols[3].find('a') else "",
-                        "调试器版本号": cols[4].get_text().strip(),
-                        "功能": [item.strip() for item in cols[5].get_text().split('\n') if item.strip()]
-                    }
+                    debugger_info = DebuggerInfo(
+                        engine_version=cols[0].get_text().strip(),
+                        honor_engine_version=cols[1].get_text().strip(),
+                        alliance_version=cols[2].get_text().strip(),
+                        download_url=cols[3].find('a')['href'] if cols[3].find('a') else "",
+                        version=cols[4].get_text().strip(),
+                        features=[item.strip() for item in cols[5].get_text().split('\n') if item.strip()]
+                    )
                     
                     if not latest_debugger:
                         latest_debugger = debugger_info
 
             return latest_debugger
         except Exception as e:
-            print(f"解析调试器信息失败: {str(e)}")
+            logger.error("解析调试器信息失败: %s", e)
             raise
 
     def parse_feature_text(self, text):
@@ -151,10 +257,11 @@ class HonorMonitor:
         
         return features
 
+    @instrument.timed()
     def parse_engine_info(self, soup):
         """解析引擎版本更新日志"""
         try:
-            print("\n=== 开始解析引擎版本信息 ===")
+            logger.debug("开始解析引擎版本信息")
             
             # 查找最新版本链接
             version_links = soup.find_all('a', string=re.compile(r'V\d+\.\d+\.\d+\.\d+'))
@@ -165,8 +272,7 @@ class HonorMonitor:
             version_link = version_links[0]
             version_number = version_link.get_text(strip=True)
             download_url = version_link.get('href', '')  # 获取下载链接
-            print(f"\n找到最新版本: {version_number}")
-            print(f"下载链接: {download_url}")
+            logger.debug("找到最新版本: %s 下载链接: %s", version_number, download_url)
             
             # 获取上线时间
             release_date = ""
@@ -177,16 +283,14 @@ class HonorMonitor:
                     date_text = next_p.get_text(strip=True)
                     if date_text.startswith('20') or '上线时间' in date_text:
                         release_date = date_text.replace('上线时间', '').strip()
-                        print(f"上线时间: {release_date}")
+                        logger.debug("上线时间: %s", release_date)
             
             # 获取引擎版本信息
-            print("\n查找版本表格...")
             engine_versions = {}
             # 查找最新版本下的第一个表格
             current_element = version_link
             while current_element:
                 if current_element.name == 'table':
-                    print("找到版本表格")
                     rows = current_element.find_all('tr')
                     for row in rows:
                         cols = row.find_all('td')
@@ -194,12 +298,11 @@ class HonorMonitor:
                             key = cols[0].get_text(strip=True)
                             value = cols[1].get_text(strip=True)
                             engine_versions[key] = value
-                            print(f"表格内容: {key} = {value}")
+                            logger.debug("表格内容: %s = %s", key, value)
                     break
                 current_element = current_element.find_next()
             
             # 获取功能更新列表
-            print("\n=== 查找功能更新 ===")
             features = []  # 使用列表替代集合，保持原始顺序
             
             # 找到版本更新日志的容器
@@ -207,84 +310,81 @@ class HonorMonitor:
             for h1 in soup.find_all('h1'):
                 if '快应用引擎版本更新日志' in h1.get_text():
                     version_container = h1.find_parent()
-                    print("找到版本更新日志容器")
                     break
             
             if not version_container:
                 raise ValueError("未找到版本更新日志容器")
             
+            # 建立容器的文本索引：一次遍历得到每个元素的文本区间，
+            # 版本号的出现位置也只查找一次，之后每个元素的判断都是 O(log n)
+            text_index = TextIndex(version_container)
+            current_version_marks = text_index.find_all([version_number])
+            next_version_marks = text_index.find_all({v.get_text() for v in version_links[1:]})
+            
             # 在容器中查找当前版本的内容
             current_version_content = None
-            next_version_content = None
             in_feature_list = False
+            seen_features = set()
             
-            # 遍历所有内容
-            for element in version_container.descendants:
-                if not hasattr(element, 'get_text'):
+            # 按 descendants 顺序遍历所有内容
+            for element, text in text_index:
+                if not len(text):
                     continue
                 
-                text = element.get_text(strip=True)
-                if not text:
+                # 找到当前版本
+                if not current_version_content:
+                    if current_version_marks.within(text):
+                        current_version_content = element
+                        logger.debug("找到当前版本内容: %.100s", text)
                     continue
                 
-                print(f"检查元素: {text[:100]}...")
+                # 检查是否是下一个版本
+                if next_version_marks.within(text):
+                    logger.debug("找到下一个版本: %.100s", text)
+                    break
                 
-                # 找到当前版本
-                if version_number in text and not current_version_content:
-                    current_version_content = element
-                    print(f"找到当前版本内容: {text}")
+                # 检查是否进入功能列表区域
+                if text.equals("功能") or text.startswith("功能："):
+                    in_feature_list = True
+                    logger.debug("进入功能列表区域")
                     continue
                 
-                # 如果已找到当前版本，开始收集功能
-                if current_version_content and not next_version_content:
-                    # 检查是否是下一个版本
-                    if any(v.get_text() in text for v in version_links[1:]):
-                        next_version_content = element
-                        print(f"找到下一个版本: {text}")
-                        break
-                    
-                    # 检查是否进入功能列表区域
-                    if text == "功能" or text.startswith("功能："):
-                        in_feature_list = True
-                        print("进入功能列表区域")
-                        continue
-                    
-                    # 如果在功能列表区域内，收集功能
-                    if in_feature_list:
-                        # 检查是否是功能描述
-                        if any(text.startswith(prefix) for prefix in ['●', '新增', '优化', '废弃']):
-                            # 清理文本
-                            clean_text = text.replace('●', '').strip()
-                            
-                            # 解析功能文本
-                            parsed_features = self.parse_feature_text(clean_text)
-                            
-                            # 添加非重复的功能，保持原始顺序
-                            for feature in parsed_features:
-                                if not self.is_duplicate_feature(feature, features):
-                                    features.append(feature)
-                                    print(f"找到功能: {feature}")
-            
-            print(f"\n共找到 {len(features)} 个功能更新")
-            
-            result = {
-                "版本号": version_number,
-                "上线时间": release_date,
-                "下载地址": download_url,  # 添加下载链接
-                "引擎版本": engine_versions,
-                "功能": features  # 直接使用列表，不进行排序
-            }
+                # 如果在功能列表区域内，收集功能
+                if in_feature_list:
+                    # 检查是否是功能描述
+                    if any(text.startswith(prefix) for prefix in ['●', '新增', '优化', '废弃']):
+                        # 清理文本
+                        clean_text = str(text).replace('●', '').strip()
+                        
+                        # 解析功能文本
+                        parsed_features = self.parse_feature_text(clean_text)
+                        
+                        # 添加非重复的功能，保持原始顺序
+                        for feature in parsed_features:
+                            if feature in seen_features:
+                                logger.debug("跳过重复功能: %s", feature)
+                                continue
+                            seen_features.add(feature)
+                            features.append(feature)
+                            logger.debug("找到功能: %s", feature)
+            
+            logger.info("共找到 %d 个功能更新", len(features))
+            
+            result = EngineRelease(
+                version=version_number,
+                release_date=release_date,
+                download_url=download_url,  # 添加下载链接
+                engine_versions=engine_versions,
+                features=features  # 保持原始顺序，不进行排序
+            )
             
-            print("\n=== 解析结果 ===")
-            print(json.dumps(result, ensure_ascii=False, indent=2))
-            print("===================\n")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("解析结果:\n%s", json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
             
             return result
             
         except Exception as e:
-            print(f"\n解析引擎版本信息失败: {str(e)}")
-            print(f"错误类型: {type(e)}")
-            print("===================\n")
+            logger.error("解析引擎版本信息失败: %s (%s)", e, type(e).__name__)
             raise
 
     def clean_feature_text(self, text):
@@ -298,7 +398,7 @@ class HonorMonitor:
             
             # 确保以功能类型开头
             if not any(text.startswith(prefix) for prefix in ['新增：', '优化：', '废弃：']):
-                print(f"文本不以功能类型开头: {text}")
+                logger.debug("文本不以功能类型开头: %s", text)
                 return None
             
             # 移除重复的功能类型标记
@@ -307,16 +407,17 @@ class HonorMonitor:
             # 移除多余的空格，但保留换行
             text = re.sub(r'[ \t]+', ' ', text)
             
-            print(f"清理后的文本: {text}")
+            logger.debug("清理后的文本: %s", text)
             return text
             
         except Exception as e:
-            print(f"清理文本失败: {str(e)}")
+            logger.warning("清理文本失败: %s", e)
             return None
 
+    @instrument.timed('hash')
     def calculate_hash(self, content):
         """计算内容的哈希值"""
-        return hashlib.md5(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+        return content.digest
 
     def send_notification(self, title, content, is_debugger=True):
         """发送飞书通知"""
@@ -356,16 +457,12 @@ class HonorMonitor:
                 }
             }
 
-            response = requests.post(
-                webhook_url,
-                json=message,
-                headers={'Content-Type': 'application/json'}
-            )
-            response.raise_for_status()
-            print(f"通知发送成功: {title}")
+            notifier.enqueue(webhook_url, message)
+            logger.info("通知已加入发送队列: %s", title)
         except Exception as e:
-            print(f"发送通知失败: {str(e)}")
+            logger.error("发送通知失败: %s", e)
 
+    @instrument.timed('render')
     def format_debugger_message(self, debugger_info, is_startup=False):
         """格式化调试器通知消息"""
         prefix = "🔔 监控服务已启动" if is_startup else "🚨 检测到调试器更新"
@@ -374,16 +471,17 @@ class HonorMonitor:
             f"{prefix}\n\n"
             "|  类型  |  内容  |\n"
             "|:------:|:------|\n"
-            f"|  版本号  | `{debugger_info['调试器版本号']}` |\n"
-            f"|  引擎版本  | `{debugger_info['快应用引擎版本号']}` |\n"
-            f"|  荣耀版本  | `{debugger_info['荣耀引擎版本号']}` |\n"
-            f"|  联盟版本  | `{debugger_info['快应用联盟平台版本号']}` |\n\n"
+            f"|  版本号  | `{debugger_info.version}` |\n"
+            f"|  引擎版本  | `{debugger_info.engine_version}` |\n"
+            f"|  荣耀版本  | `{debugger_info.honor_engine_version}` |\n"
+            f"|  联盟版本  | `{debugger_info.alliance_version}` |\n\n"
             "📋 更新内容\n" +
-            "\n".join([f"• {item}" for item in debugger_info['功能']]) +
-            f"\n\n📥 [下载地址]({debugger_info['下载地址']})" +
+            "\n".join([f"• {item}" for item in debugger_info.features]) +
+            f"\n\n📥 [下载地址]({debugger_info.download_url})" +
             (f"\n\n⏱️ 监控间隔：`{self.check_interval}秒`" if is_startup else "")
         )
 
+    @instrument.timed('render')
     def format_engine_message(self, engine_info, is_startup=False):
         """格式化引擎版本通知消息"""
         prefix = "🔔 监控服务已启动" if is_startup else "🚨 检测到引擎版本更新"
@@ -392,13 +490,13 @@ class HonorMonitor:
             f"{prefix}\n\n"
             "|  类型  |  内容  |\n"
             "|:------:|:------|\n"
-            f"|  版本号  | `{engine_info['版本号']}` |\n"
-            f"|  上线时间  | `{engine_info['上线时间']}` |\n"
-            f"|  荣耀版本  | `{engine_info['引擎版本'].get('荣耀快应用引擎平台', '')}` |\n"
-            f"|  联盟版本  | `{engine_info['引擎版本'].get('快应用联盟平台', '')}` |\n\n"
+            f"|  版本号  | `{engine_info.version}` |\n"
+            f"|  上线时间  | `{engine_info.release_date}` |\n"
+            f"|  荣耀版本  | `{engine_info.engine_version('荣耀快应用引擎平台')}` |\n"
+            f"|  联盟版本  | `{engine_info.engine_version('快应用联盟平台')}` |\n\n"
             "📋 更新内容\n" +
-            "\n".join([f"• {item}" for item in engine_info['功能']]) +
-            f"\n\n📥 [下载地址]({engine_info.get('下载地址', '暂无')})" +
+            "\n".join([f"• {item}" for item in engine_info.features]) +
+            f"\n\n📥 [下载地址]({engine_info.download_url or '暂无'})" +
             (f"\n\n⏱️ 监控间隔：`{self.check_interval}秒`" if is_startup else "")
         )
 
@@ -409,176 +507,211 @@ class HonorMonitor:
             0: 版本相同
             -1: old_version 更新
         """
-        try:
-            # 移除版本号中的 'V' 前缀
-            new_ver = new_version.replace('V', '').strip()
-            old_ver = old_version.replace('V', '').strip()
-            
-            # 将版本号分割为数字列表
-            new_parts = [int(x) for x in new_ver.split('.')]
-            old_parts = [int(x) for x in old_ver.split('.')]
-            
-            # 比较每个部分
-            for new, old in zip(new_parts, old_parts):
-                if new > old:
-                    return 1
-                elif new < old:
-                    return -1
-            
-            # 如果前面都相同，比较长度
-            if len(new_parts) > len(old_parts):
-                return 1
-            elif len(new_parts) < len(old_parts):
-                return -1
-            
-            return 0
-        except Exception as e:
-            print(f"版本比较出错: {str(e)}")
-            return 0
+        return parse_version(new_version).compare(parse_version(old_version))
 
-    def is_content_updated(self, new_content, old_content, content_type="debugger"):
-        """检查内容是否有更新
+    @instrument.timed('diff')
+    def diff_content(self, new_content, old_content, content_type="debugger"):
+        """比较两次解析结果
         content_type: "debugger" 或 "engine"
+        返回 (变化类型, 字段差异)，变化类型为:
+            'new': 版本号升高，或没有上一次的结果
+            'retracted': 版本号降低，上一次的最新版本被撤回
+            'modified': 版本号相同但内容有修改，字段差异为 differ.diff_record 的结果
+            None: 没有变化
         """
         try:
             if not old_content:
-                return True
-                
-            if content_type == "debugger":
-                # 比较调试器版本号
-                version_compare = self.compare_versions(
-                    new_content['调试器版本号'],
-                    old_content['调试器版本号']
-                )
-                if version_compare > 0:
-                    print(f"检测到调试器版本更新: {old_content['调试器版本号']} -> {new_content['调试器版本号']}")
-                    return True
-                    
-                # 比较引擎版本号
-                engine_compare = self.compare_versions(
-                    new_content['快应用引擎版本号'],
-                    old_content['快应用引擎版本号']
-                )
-                if engine_compare > 0:
-                    print(f"检测到引擎版本更新: {old_content['快应用引擎版本号']} -> {new_content['快应用引擎版本号']}")
-                    return True
-                    
-            elif content_type == "engine":
-                # 比较引擎版本号
-                version_compare = self.compare_versions(
-                    new_content['版本号'],
-                    old_content['版本号']
-                )
-                if version_compare > 0:
-                    print(f"检测到引擎版本更新: {old_content['版本号']} -> {new_content['版本号']}")
-                    return True
-                    
-                # 比较功能列表
-                new_features = set(new_content['功能'])
-                old_features = set(old_content['功能'])
-                if new_features != old_features:
-                    print("检测到功能更新")
-                    print("新增功能:", new_features - old_features)
-                    return True
+                return 'new', None
             
-            return False
+            # 内容相同时哈希一致，不需要逐字段比较
+            if new_content == old_content:
+                return None, None
+            
+            # 按记录的版本字段依次比较（调试器为调试器版本号和引擎版本号），
+            # 版本在解析时已经计算，无法解析的版本号不参与比较
+            for field, new_key, old_key in zip(new_content.VERSION_FIELDS, new_content.key, old_content.key):
+                if not (new_key.valid and old_key.valid) or new_key == old_key:
+                    continue
+                label = new_content.label(field)
+                old_version, new_version = getattr(old_content, field), getattr(new_content, field)
+                if new_key > old_key:
+                    logger.info("检测到%s更新: %s -> %s", label, old_version, new_version)
+                    return 'new', None
+                logger.warning("检测到%s回退: %s -> %s", label, old_version, new_version)
+                return 'retracted', None
+            
+            # 版本相同时逐字段比较，功能列表按条目比较
+            changes = diff_record(old_content.to_dict(), new_content.to_dict())
+            if changes:
+                logger.info("检测到内容修改: %s", ', '.join(changes))
+                return 'modified', changes
+            return None, None
             
         except Exception as e:
-            print(f"内容比较出错: {str(e)}")
-            return False
+            logger.error("内容比较出错: %s", e)
+            return None, None
 
-    def monitor(self):
-        """开始监控"""
-        print(f"开始监控荣耀快应用更新...")
+    @instrument.timed('render')
+    def format_delta_message(self, change, new_content, old_content, changes, content_type="debugger"):
+        """格式化版本回退或内容修改的通知消息，只包含变化的部分"""
+        name = "调试器" if content_type == "debugger" else "引擎版本"
+        version = new_content.version
+        old_version = old_content.version
         
-        try:
-            # 获取初始内容并发送启动通知
-            html_content = self.get_page_content()
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            debugger_info = self.parse_debugger_info(soup)
-            engine_info = self.parse_engine_info(soup)
-            
-            self.last_debugger_content = debugger_info
-            self.last_engine_content = engine_info
-            
-            # 发送启动通知
-            self.send_notification(
-                "荣耀快应用调试器监控",
-                self.format_debugger_message(debugger_info, is_startup=True),
-                is_debugger=True
-            )
-            self.send_notification(
-                "荣耀快应用引擎版本监控",
-                self.format_engine_message(engine_info, is_startup=True),
-                is_debugger=False
-            )
-            
-            while True:
-                try:
-                    print("\n开始新一轮检查...")
-                    html_content = self.get_page_content()
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    
-                    # 检查调试器更新
-                    debugger_info = self.parse_debugger_info(soup)
-                    if self.is_content_updated(debugger_info, self.last_debugger_content, "debugger"):
-                        self.send_notification(
-                            "荣耀快应用调试器更新",
-                            self.format_debugger_message(debugger_info),
-                            is_debugger=True
-                        )
-                        self.last_debugger_content = debugger_info
-                    
-                    # 检查引擎版本更新
-                    engine_info = self.parse_engine_info(soup)
-                    if self.is_content_updated(engine_info, self.last_engine_content, "engine"):
-                        self.send_notification(
-                            "荣耀快应用引擎版本更新",
-                            self.format_engine_message(engine_info),
-                            is_debugger=False
-                        )
-                        self.last_engine_content = engine_info
-                    
-                    print(f"检查完成，等待 {self.check_interval} 秒后进行下一次检查...")
-                    time.sleep(self.check_interval)
-                    
-                except KeyboardInterrupt:
-                    raise
-                except Exception as e:
-                    print(f"检查过程中出错: {str(e)}")
-                    print("60秒后重试...")
-                    time.sleep(60)
-                    
-        except KeyboardInterrupt:
-            print("\n收到退出信号，正在停止监控...")
-            self.send_notification(
-                "荣耀快应用调试器监控服务",
-                "🔔 监控服务已停止运行",
-                is_debugger=True
-            )
-            self.send_notification(
-                "荣耀快应用引擎监控服务",
-                "🔔 监控服务已停止运行",
-                is_debugger=False
+        if change == 'retracted':
+            return (
+                f"⚠️ 检测到{name}回退，版本 `{old_version}` 可能已被撤回\n\n"
+                "|  类型  |  内容  |\n"
+                "|:------:|:------|\n"
+                f"|  当前版本  | `{version}` |\n"
+                f"|  原版本  | `{old_version}` |"
             )
+        
+        return (
+            f"📝 检测到{name}说明修改\n\n"
+            "|  类型  |  内容  |\n"
+            "|:------:|:------|\n"
+            f"|  版本号  | `{version}` |\n\n"
+            "📋 变化内容\n" +
+            "\n".join(describe_record_changes(changes))
+        )
+
+    def restore_state(self):
+        """从状态存储恢复上次的调试器和引擎版本信息，没有记录时返回 False"""
+        state = state_store.load('honor', self.api_url)
+        if not state or not state['content']:
+            return False
+        
+        self.last_debugger_content = DebuggerInfo.load(state['content']['debugger'])
+        self.last_engine_content = EngineRelease.load(state['content']['engine'])
+        self.last_raw_hash = state['fingerprint']
+        logger.info("已恢复监控状态，调试器版本: %s，引擎版本: %s",
+                    self.last_debugger_content.version, self.last_engine_content.version)
+        return True
+
+    def save_state(self):
+        """保存当前的调试器和引擎版本信息"""
+        state_store.save('honor', self.api_url, self.last_raw_hash, {
+            'debugger': self.last_debugger_content.dump(),
+            'engine': self.last_engine_content.dump()
+        })
+
+    def archive_snapshot(self, html_content):
+        """归档本次的原始文档和解析结果"""
+        archive.record(
+            'honor', self.api_url, html_content,
+            {
+                'debugger': self.last_debugger_content.to_dict() if self.last_debugger_content else None,
+                'engine': self.last_engine_content.to_dict() if self.last_engine_content else None
+            },
+            version=self.last_engine_content.version if self.last_engine_content else None
+        )
 
-    def is_duplicate_feature(self, new_text, existing_features):
-        """检查是否是重复的功能"""
-        # 检查完全相同
-        if new_text in existing_features:
-            print(f"跳过重复功能: {new_text}")
-            return True
+    def startup(self, html_content):
+        """解析初始内容并发送启动通知"""
+        sections = self.split_sections(html_content)
+        
+        debugger_info, debugger_digest = self.parse_section(sections, 'debugger', self.parse_debugger_info, html_content)
+        engine_info, engine_digest = self.parse_section(sections, 'engine', self.parse_engine_info, html_content)
         
-        # 检查包含关系（只检查完全包含的情况）
-        for feature in existing_features:
-            if new_text == feature:  # 完全相同
-                print(f"跳过重复功能: {new_text}")
-                return True
+        self.last_debugger_content = debugger_info
+        self.last_engine_content = engine_info
+        self.section_digests = {'debugger': debugger_digest, 'engine': engine_digest}
+        self.last_raw_hash = raw_fingerprint(html_content)
+        self.save_state()
+        self.archive_snapshot(html_content)
         
-        return False
+        # 发送启动通知
+        self.send_notification(
+            "荣耀快应用调试器监控",
+            self.format_debugger_message(debugger_info, is_startup=True),
+            is_debugger=True
+        )
+        self.send_notification(
+            "荣耀快应用引擎版本监控",
+            self.format_engine_message(engine_info, is_startup=True),
+            is_debugger=False
+        )
+
+    def process(self, html_content):
+        """处理一次轮询获取到的内容，返回是否检测到更新"""
+        # 原始内容未变化时跳过解析
+        with instrument.stage('hash'):
+            raw_hash = raw_fingerprint(html_content)
+        if html_content is None or raw_hash == self.last_raw_hash:
+            logger.info("页面内容未变化，跳过解析")
+            return False
+        
+        # 只解析指纹发生变化的段落
+        sections = self.split_sections(html_content)
+        changed = False
+        
+        # 检查调试器更新
+        digest = sections['debugger'][0]
+        if digest == self.section_digests.get('debugger'):
+            logger.debug("调试器段落未变化，跳过解析")
+        else:
+            debugger_info, digest = self.parse_section(sections, 'debugger', self.parse_debugger_info, html_content)
+            change, changes = self.diff_content(debugger_info, self.last_debugger_content, "debugger")
+            if change:
+                # 新版本发送完整内容，回退和修改只发送变化的部分
+                if change == 'new':
+                    message = self.format_debugger_message(debugger_info)
+                else:
+                    message = self.format_delta_message(
+                        change, debugger_info, self.last_debugger_content, changes, "debugger"
+                    )
+                self.send_notification("荣耀快应用调试器更新", message, is_debugger=True)
+                self.last_debugger_content = debugger_info
+                changed = True
+            self.section_digests['debugger'] = digest
+        
+        # 检查引擎版本更新
+        digest = sections['engine'][0]
+        if digest == self.section_digests.get('engine'):
+            logger.debug("引擎最新版本段落未变化，跳过解析")
+        else:
+            engine_info, digest = self.parse_section(sections, 'engine', self.parse_engine_info, html_content)
+            change, changes = self.diff_content(engine_info, self.last_engine_content, "engine")
+            if change:
+                if change == 'new':
+                    message = self.format_engine_message(engine_info)
+                else:
+                    message = self.format_delta_message(
+                        change, engine_info, self.last_engine_content, changes, "engine"
+                    )
+                self.send_notification("荣耀快应用引擎版本更新", message, is_debugger=False)
+                self.last_engine_content = engine_info
+                changed = True
+            self.section_digests['engine'] = digest
+        
+        self.last_raw_hash = raw_hash
+        self.save_state()
+        self.archive_snapshot(html_content)
+        return changed
+
+    def report_error(self, error):
+        """记录检查过程中的错误"""
+        logger.error("检查过程中出错: %s", error)
+
+    def shutdown(self):
+        """发送停止通知"""
+        self.send_notification(
+            "荣耀快应用调试器监控服务",
+            "🔔 监控服务已停止运行",
+            is_debugger=True
+        )
+        self.send_notification(
+            "荣耀快应用引擎监控服务",
+            "🔔 监控服务已停止运行",
+            is_debugger=False
+        )
+
 
 if __name__ == "__main__":
+    log_setup.configure()
+    profiler.install()
+    
     # 飞书机器人 webhook 地址
     debugger_webhook_url = "https://open.feishu.cn/open-apis/bot/v2/hook/3359b367-baf6-44c4-8536-3ebd7aedc03e"  # 调试器机器人
     engine_webhook_url = "https://open.feishu.cn/open-apis/bot/v2/hook/5fe61b9f-a14e-468e-aeb7-72b473f2e6df"  # 引擎机器人
@@ -587,4 +720,4 @@ if __name__ == "__main__":
     monitor = HonorMonitor(debugger_webhook_url, engine_webhook_url, check_interval=10)
     
     # 开始监控
-    monitor.monitor() 
\ No newline at end of file
+    run_monitor('honor', monitor, monitor.check_interval) 
\ No newline at end of file
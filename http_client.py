@@ -0,0 +1,148 @@
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from config import HTTP_CONFIG
+from process_local import ProcessLocal
+
+# 条件请求的校验信息 {cache_key: {'etag': ..., 'last_modified': ...}}
+_validators = {}
+
+
+def _create_adapter(options):
+    """按配置创建带连接池的适配器"""
+    return HTTPAdapter(
+        pool_connections=options.get('pool_connections', HTTP_CONFIG['pool_connections']),
+        pool_maxsize=options.get('pool_maxsize', HTTP_CONFIG['pool_maxsize']),
+        pool_block=options.get('pool_block', HTTP_CONFIG['pool_block']),
+        max_retries=options.get('max_retries', HTTP_CONFIG['max_retries'])
+    )
+
+
+def _create_session():
+    """创建共享 Session 并挂载各主机的连接池"""
+    session = requests.Session()
+    default_adapter = _create_adapter({})
+    session.mount('https://', default_adapter)
+    session.mount('http://', default_adapter)
+
+    # 单独配置的主机使用独立的连接池
+    for host, options in HTTP_CONFIG.get('hosts', {}).items():
+        session.mount(host, _create_adapter(options))
+
+    return session
+
+
+# 每个进程持有一个共享 Session，按主机复用 keep-alive 连接
+_session = ProcessLocal(_create_session)
+
+
+def get_session():
+    """获取当前进程的共享 Session"""
+    return _session.get()
+
+
+def default_timeout():
+    """默认的 (连接超时, 读取超时)"""
+    return (HTTP_CONFIG['connect_timeout'], HTTP_CONFIG['read_timeout'])
+
+
+def request(method, url, **kwargs):
+    """通过共享连接池发送请求"""
+    kwargs.setdefault('timeout', default_timeout())
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    """发送 GET 请求"""
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    """发送 POST 请求"""
+    return request('POST', url, **kwargs)
+
+
+def conditional_request(method, url, cache_key=None, **kwargs):
+    """发送条件请求
+
+    携带上次响应的 ETag / Last-Modified，服务端返回 304 时说明内容未变化，
+    调用方复用上次获取的内容即可。cache_key 用于区分同一 URL 下的不同文档（如 POST 请求体），
+    默认使用 URL。
+    """
+    cache_key = cache_key or url
+    validator = _validators.get(cache_key)
+    if validator:
+        headers = dict(kwargs.pop('headers', None) or {})
+        if validator.get('etag'):
+            headers['If-None-Match'] = validator['etag']
+        if validator.get('last_modified'):
+            headers['If-Modified-Since'] = validator['last_modified']
+        kwargs['headers'] = headers
+
+    response = request(method, url, **kwargs)
+
+    if response.status_code == 200:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            _validators[cache_key] = {'etag': etag, 'last_modified': last_modified}
+        else:
+            _validators.pop(cache_key, None)
+
+    return response
+
+
+def read_body(response, chunk_size=65536):
+    """流式读取响应内容到一个 bytearray
+
+    请求需要以 stream=True 发送。内容只保存这一份，不会在响应对象上另外缓存
+    content / text，配合 json_envelope 从中取出需要的字段。读取完毕后连接归还连接池。
+    响应大小按读取到的字节数记录到当前监控目标的 response_bytes。
+    """
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size):
+        body += chunk
+    metrics.observe('response_bytes', metrics.current_target(), len(body))
+    return body
+
+
+def is_not_modified(response):
+    """响应是否为 304 未修改"""
+    return response.status_code == 304
+
+
+def _create_executor():
+    """创建请求线程池"""
+    return ThreadPoolExecutor(max_workers=HTTP_CONFIG['pool_maxsize'], thread_name_prefix='http')
+
+
+# 异步模式下执行请求的线程池，大小与连接池一致，避免并发请求超出连接池
+_executor = ProcessLocal(_create_executor)
+
+
+async def run_async(func, *args, **kwargs):
+    """在请求线程池中执行阻塞的请求函数，供 asyncio 调度器使用
+
+    请求函数在调用方的上下文中执行，日志和耗时统计能标注当前监控目标。
+    """
+    import asyncio  # 只有 asyncio 模式用到，进程模式下不导入
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor.get(), functools.partial(context.run, func, *args, **kwargs))
+
+
+
+def close():
+    """关闭当前进程的连接池和请求线程池"""
+    session = _session.pop()
+    if session is not None:
+        session.close()
+    executor = _executor.pop()
+    if executor is not None:
+        executor.shutdown(wait=False)
@@ -1,174 +1,231 @@
-import requests
 import time
-import hashlib
+import logging
+import re
 from datetime import datetime
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+
+from parsing import make_soup
+import huawei_portal
+import state_store
+import archive
+import notifier
+import metrics
+import instrument
+import memory
+import profiler
+import log_setup
+from scheduler import AdaptiveSchedule
+from fingerprint import raw_fingerprint, SectionTree
+from process_runner import run_monitor
+from differ import diff_maps
+from records import VersionNote
+from version import VersionIndex
+
+# 版本说明只需要标题和表格，其余内容不参与构建文档树
+VERSION_SECTIONS = SoupStrainer(['h1', 'h2', 'h3', 'h4', 'table'])
+
+# 文档按版本标题切分为版本块
+VERSION_TITLE = re.compile(r'<h[1-4][^>]*>(?:(?!</h[1-4]>).)*?版本更新说明', re.S)
+
+# 更新列表中组件表格和接口表格的分类标记
+UPDATE_CATEGORIES = ('【组件更新】', '【接口更新】')
+
+logger = logging.getLogger(__name__)
 
 class VersionMonitor:
-    def __init__(self, url, webhook_url, check_interval=300):
+    def __init__(self, url, webhook_url, check_interval=300, object_id=None, catalog_name=None):
         self.url = url
+        # 未指定文档 ID 时从页面地址中解析
+        if not object_id or not catalog_name:
+            catalog_name, object_id = huawei_portal.parse_document_url(url)
+        self.object_id = object_id
+        self.catalog_name = catalog_name
         self.webhook_url = webhook_url
         self.check_interval = check_interval
         self.last_hash = None
         self.last_content = None
+        self.last_raw_hash = None
+        self.section_results = {}  # {段落指纹: 解析结果}，未变化的版本块不再重新解析
+        self.version_digests = None  # {版本号: 解析结果哈希}，用于发现历史版本的修改和撤回
+        self.version_index = VersionIndex()  # 按版本号排序的 {Version: 解析结果}，随每次解析增量更新
+        self.schedule = AdaptiveSchedule('huawei_version', self.object_id, check_interval)
         
-    def get_page_content(self):
-        """获取网页特定内容"""
+    def fetch_html(self, conditional=False):
+        """获取文档原始 HTML
+
+        conditional 为 True 时发送条件请求，服务端返回 304 时返回上次获取的内容。
+        请求失败时抛出异常，由监控循环按错误退避重试。
+        """
         try:
-            print("正在获取网页内容...")
-            api_url = "https://svc-drcn.developer.huawei.com/community/servlet/consumer/cn/documentPortal/getDocumentById"
+            logger.info("正在获取网页内容...")
+            return huawei_portal.fetch_document(self.object_id, self.catalog_name, conditional)
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                'Accept': 'application/json, text/plain, */*',
-                'Accept-Language': 'zh-CN,zh;q=0.9',
-                'Content-Type': 'application/json',
-                'Origin': 'https://developer.huawei.com',
-                'Referer': 'https://developer.huawei.com/'
-            }
-            
-            data = {
-                "objectId": "quickapp-version-updates-0000001079803874",
-                "version": "",
-                "catalogName": "quickApp-Guides",
-                "language": "cn"
-            }
-            
-            print("发送POST请求...")
-            response = requests.post(api_url, json=data, headers=headers)
-            print(f"响应状态码: {response.status_code}")
+        except Exception as e:
+            logger.error("获取网页内容失败: %s (%s)", e, type(e).__name__)
+            raise
+    
+    async def fetch_html_async(self, conditional=False):
+        """asyncio 模式下获取文档原始 HTML，与其他华为监控合并批量请求"""
+        try:
+            logger.info("正在获取网页内容...")
+            return await huawei_portal.fetch_document_async(self.object_id, self.catalog_name, conditional)
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data['code'] == 0 and 'value' in data and 'content' in data['value']:
-                    html_content = data['value']['content']['content']
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    
-                    # 查找所有版本更新信息的标题
-                    version_titles = soup.find_all(['h1', 'h2', 'h3', 'h4'])
-                    latest_version = None
-                    latest_date = None
-                    
-                    # 遍历所有标题，找出最新的版本信息
-                    for title in version_titles:
-                        title_text = title.text.strip()
-                        if '版本更新说明' in title_text and '（' in title_text:
-                            version_number = title_text.split('版本更新说明')[0].strip()
-                            version_date = title_text[title_text.find('（')+1:title_text.find('）')]
-                            
-                            # 找到第一个版本信息就退出，因为最新的版本会在最上面
-                            latest_version = version_number
-                            latest_date = version_date
-                            
-                            # 获取所有更新内容
-                            updates = []
-                            
-                            # 1. 查找并解析组件部分
-                            component_title = title.find_next(lambda tag: tag.name in ['h4'] and '组件' in tag.text)
-                            if component_title:
-                                component_table = component_title.find_next('table')
-                                if component_table:
-                                    updates.append("【组件更新】")
-                                    # 解析组件表格
-                                    rows = component_table.find_all('tr')[1:]
-                                    for row in rows:
-                                        cols = row.find_all('td')
-                                        if len(cols) >= 2:
-                                            component = cols[0].text.strip()
-                                            description_cell = cols[1]  # 获取整个单元格
-                                            
-                                            # 分割描述文本，但保留HTML结构
-                                            descriptions = []
-                                            for text in description_cell.stripped_strings:
-                                                if text.strip():
-                                                    descriptions.append(text.strip())
-                                            
-                                            update_info = [f"【{component}】"]
-                                            
-                                            # 先添加更新内容
-                                            main_content = descriptions[0] if descriptions else ""  # 第一段是主要内容
-                                            for desc in main_content.split('。'):
-                                                if desc.strip() and '详情请参见' not in desc:
-                                                    update_info.append(f"• {desc.strip()}")
-                                            
-                                            # 再添加参考文档链接
-                                            doc_link = description_cell.find('a')
-                                            if doc_link:
-                                                link_text = doc_link.text.strip()
-                                                link_url = "https://developer.huawei.com/consumer/cn/doc/" + doc_link.get('href', '').replace('https://developer.huawei.com/consumer/cn/doc/', '')
-                                                update_info.append(f"\n参考文档：{link_text} {link_url}")
-                                            
-                                            updates.append("\n".join(update_info))
-                            
-                            # 2. 查找并解析接口部分
-                            interface_title = title.find_next(lambda tag: tag.name in ['h4'] and '接口' in tag.text)
-                            if interface_title:
-                                interface_table = interface_title.find_next('table')
-                                if interface_table:
-                                    updates.append("\n【接口更新】")
-                                    # 解析接口表格
-                                    rows = interface_table.find_all('tr')[1:]
-                                    for row in rows:
-                                        cols = row.find_all('td')
-                                        if len(cols) >= 2:
-                                            interface = cols[0].text.strip()
-                                            description_cell = cols[1]  # 获取整个单元格
-                                            
-                                            # 分割描述文本，但保留HTML结构
-                                            descriptions = []
-                                            for text in description_cell.stripped_strings:
-                                                if text.strip():
-                                                    descriptions.append(text.strip())
-                                            
-                                            update_info = [f"【{interface}】"]
-                                            
-                                            # 先添加更新内容
-                                            main_content = descriptions[0] if descriptions else ""  # 第一段是主要内容
-                                            for desc in main_content.split('。'):
-                                                if desc.strip() and '详情请参见' not in desc:
-                                                    update_info.append(f"• {desc.strip()}")
-                                            
-                                            # 再添加参考文档链接
-                                            doc_link = description_cell.find('a')
-                                            if doc_link:
-                                                link_text = doc_link.text.strip()
-                                                link_url = "https://developer.huawei.com/consumer/cn/doc/" + doc_link.get('href', '').replace('https://developer.huawei.com/consumer/cn/doc/', '')
-                                                update_info.append(f"\n参考文档：{link_text} {link_url}")
-                                            
-                                            updates.append("\n".join(update_info))
-                            
-                            result = {
-                                'version': latest_version,
-                                'updates': updates,
-                                'date': latest_date
-                            }
-                            print(f"解析结果: {result}")
-                            return result
-                            break
-                    else:
-                        print("未找到版本标题")
-                else:
-                    print("API响应格式不正确")
+        except Exception as e:
+            logger.error("获取网页内容失败: %s (%s)", e, type(e).__name__)
+            raise
+    
+    def parse_html(self, html_content):
+        """从文档 HTML 中解析最新的版本更新说明"""
+        return self.parse_sections(SectionTree(html_content, VERSION_TITLE))[0]
+    
+    def parse_sections(self, tree, cache=None, all_versions=False):
+        """按版本块解析，返回 (最新版本的解析结果, 本次用到的段落解析结果)
+
+        cache 为上一次返回的 {段落指纹: 解析结果}，指纹相同的版本块直接复用，
+        只有新增或修改过的版本块需要重新解析。all_versions 为 False 时找到最新版本
+        即停止，为 True 时解析全部版本块。
+        """
+        cache = cache or {}
+        results = {}
+        for index in range(len(tree)):
+            leaf = tree.leaves[index]
+            if leaf in cache:
+                result = cache[leaf]
+            else:
+                result = self._parse_version_section(tree.section(index))
+            results[leaf] = result
+            if result and not all_versions:
+                return result, results
+        
+        for result in results.values():
+            if result:
+                return result, results
+        logger.warning("未找到目标内容")
+        return None, results
+    
+    @instrument.timed()
+    def _parse_version_section(self, html_content):
+        """解析单个版本块的更新说明，不是版本块时返回 None"""
+        try:
+            soup = make_soup(html_content, parse_only=VERSION_SECTIONS)
+
+            # 查找所有版本更新信息的标题
+            version_titles = soup.find_all(['h1', 'h2', 'h3', 'h4'])
+            latest_version = None
+            latest_date = None
+
+            # 遍历所有标题，找出最新的版本信息
+            for title in version_titles:
+                title_text = title.text.strip()
+                if '版本更新说明' in title_text and '（' in title_text:
+                    version_number = title_text.split('版本更新说明')[0].strip()
+                    version_date = title_text[title_text.find('（')+1:title_text.find('）')]
+
+                    # 找到第一个版本信息就退出，因为最新的版本会在最上面
+                    latest_version = version_number
+                    latest_date = version_date
+
+                    # 获取所有更新内容
+                    updates = []
+
+                    # 1. 查找并解析组件部分
+                    component_title = title.find_next(lambda tag: tag.name in ['h4'] and '组件' in tag.text)
+                    if component_title:
+                        component_table = component_title.find_next('table')
+                        if component_table:
+                            updates.append("【组件更新】")
+                            # 解析组件表格
+                            rows = component_table.find_all('tr')[1:]
+                            for row in rows:
+                                cols = row.find_all('td')
+                                if len(cols) >= 2:
+                                    component = cols[0].text.strip()
+                                    description_cell = cols[1]  # 获取整个单元格
+
+                                    # 分割描述文本，但保留HTML结构
+                                    descriptions = []
+                                    for text in description_cell.stripped_strings:
+                                        if text.strip():
+                                            descriptions.append(text.strip())
+
+                                    update_info = [f"【{component}】"]
+
+                                    # 先添加更新内容
+                                    main_content = descriptions[0] if descriptions else ""  # 第一段是主要内容
+                                    for desc in main_content.split('。'):
+                                        if desc.strip() and '详情请参见' not in desc:
+                                            update_info.append(f"• {desc.strip()}")
+
+                                    # 再添加参考文档链接
+                                    doc_link = description_cell.find('a')
+                                    if doc_link:
+                                        link_text = doc_link.text.strip()
+                                        link_url = "https://developer.huawei.com/consumer/cn/doc/" + doc_link.get('href', '').replace('https://developer.huawei.com/consumer/cn/doc/', '')
+                                        update_info.append(f"\n参考文档：{link_text} {link_url}")
+
+                                    updates.append("\n".join(update_info))
+
+                    # 2. 查找并解析接口部分
+                    interface_title = title.find_next(lambda tag: tag.name in ['h4'] and '接口' in tag.text)
+                    if interface_title:
+                        interface_table = interface_title.find_next('table')
+                        if interface_table:
+                            updates.append("\n【接口更新】")
+                            # 解析接口表格
+                            rows = interface_table.find_all('tr')[1:]
+                            for row in rows:
+                                cols = row.find_all('td')
+                                if len(cols) >= 2:
+                                    interface = cols[0].text.strip()
+                                    description_cell = cols[1]  # 获取整个单元格
+
+                                    # 分割描述文本，但保留HTML结构
+                                    descriptions = []
+                                    for text in description_cell.stripped_strings:
+                                        if text.strip():
+                                            descriptions.append(text.strip())
+
+                                    update_info = [f"【{interface}】"]
+
+                                    # 先添加更新内容
+                                    main_content = descriptions[0] if descriptions else ""  # 第一段是主要内容
+                                    for desc in main_content.split('。'):
+                                        if desc.strip() and '详情请参见' not in desc:
+                                            update_info.append(f"• {desc.strip()}")
+
+                                    # 再添加参考文档链接
+                                    doc_link = description_cell.find('a')
+                                    if doc_link:
+                                        link_text = doc_link.text.strip()
+                                        link_url = "https://developer.huawei.com/consumer/cn/doc/" + doc_link.get('href', '').replace('https://developer.huawei.com/consumer/cn/doc/', '')
+                                        update_info.append(f"\n参考文档：{link_text} {link_url}")
+
+                                    updates.append("\n".join(update_info))
+
+                    result = VersionNote(version=latest_version, updates=updates, date=latest_date)
+                    logger.debug("解析结果: %s", result)
+                    return result
             
-            print("未找到目标内容")
             return None
             
         except Exception as e:
-            print(f"发生错误: {str(e)}")
-            print(f"错误类型: {type(e)}")
+            logger.error("解析版本说明失败: %s (%s)", e, type(e).__name__)
             return None
     
+    def get_page_content(self):
+        """获取网页特定内容"""
+        html_content = self.fetch_html()
+        if html_content is None:
+            return None
+        return self.parse_html(html_content)
+    
+    @instrument.timed('hash')
     def calculate_hash(self, content):
         """计算内容的哈希值"""
-        return hashlib.md5(str(content).encode('utf-8')).hexdigest()
+        return content.digest
     
     def send_notification(self, message, msg_type="text"):
         """发送飞书通知"""
-        headers = {
-            'Content-Type': 'application/json'
-        }
-        
         if msg_type == "post":
             data = {
                 "msg_type": "interactive",
@@ -212,87 +269,228 @@ class VersionMonitor:
             }
         
         try:
-            response = requests.post(self.webhook_url, json=data, headers=headers)
-            response.raise_for_status()
-            print("通知发送成功")
-        except requests.RequestException as e:
-            print(f"发送通知失败: {e}")
+            notifier.enqueue(self.webhook_url, data)
+        except Exception as e:
+            logger.error("发送通知失败: %s", e)
     
-    def monitor(self):
-        """开始监控"""
-        print(f"开始监控网页: {self.url}")
+    def restore_state(self):
+        """从状态存储恢复上次的版本说明，没有记录时返回 False"""
+        state = state_store.load('huawei_version', self.object_id)
+        if not state or not state['content']:
+            return False
         
-        try:
-            # 获取当前信息并发送启动通知
-            retries = 3  # 添加重试机制
-            for attempt in range(retries):
-                try:
-                    current_content = self.get_page_content()
-                    if current_content:
-                        break
-                except Exception as e:
-                    if attempt == retries - 1:
-                        raise
-                    print(f"获取内容失败，{attempt + 1}/{retries} 次重试...")
-                    time.sleep(5)
+        self.last_content = VersionNote.load(state['content'])
+        self.last_hash = self.calculate_hash(self.last_content)
+        self.last_raw_hash = state['fingerprint']
+        # 旧版本保存的状态没有版本索引，下一次解析后再建立
+        index = state_store.load('huawei_version_index', self.object_id)
+        self.version_digests = index['content'] if index else None
+        logger.info("已恢复监控状态，版本: %s", self.last_content.version)
+        return True
+    
+    def save_state(self):
+        """保存当前的版本说明"""
+        state_store.save('huawei_version', self.object_id, self.last_raw_hash, self.last_content.dump())
+        if self.version_digests is not None:
+            state_store.save('huawei_version_index', self.object_id, None, self.version_digests)
+    
+    def archive_snapshot(self, html_content, versions):
+        """归档本次的原始文档和全部版本的解析结果"""
+        archive.record('huawei_version', self.object_id, html_content,
+                       {version: result.to_dict() for version, result in versions.items()},
+                       version=self.last_content.version)
+    
+    def startup(self, html_content):
+        """解析初始内容并发送启动通知"""
+        current_content = None
+        if html_content:
+            with metrics.timer('parse_seconds', metrics.current_target(), stage='parse_sections'):
+                tree = SectionTree(html_content, VERSION_TITLE)
+                current_content, self.section_results = self.parse_sections(tree, all_versions=True)
+        if not current_content:
+            raise ValueError("未获取到版本说明内容")
+        current_content = self._update_index(self._versions(self.section_results))
+        
+        startup_message = self._format_notification(current_content, is_startup=True)
+        self.send_notification(startup_message, msg_type="post")
+        self.last_hash = self.calculate_hash(current_content)
+        self.last_content = current_content
+        versions = self._versions(self.section_results)
+        self.version_digests = self._version_digests(versions)
+        self.last_raw_hash = raw_fingerprint(html_content)
+        self.save_state()
+        self.archive_snapshot(html_content, versions)
+    
+    def process(self, html_content):
+        """处理一次轮询获取到的内容，返回是否检测到新版本或版本说明的修改"""
+        # 原始内容未变化时跳过解析
+        with instrument.stage('hash'):
+            raw_hash = raw_fingerprint(html_content)
+        if html_content is None or raw_hash == self.last_raw_hash:
+            logger.info("页面内容未变化，跳过解析")
+            return False
+        
+        # 只重新解析指纹发生变化的版本块，上一次的解析结果用于比较修改前的内容
+        previous = self._versions(self.section_results)
+        previous[self.last_content.version] = self.last_content
+        with metrics.timer('parse_seconds', metrics.current_target(), stage='parse_sections'):
+            tree = SectionTree(html_content, VERSION_TITLE)
+            content, self.section_results = self.parse_sections(tree, self.section_results, all_versions=True)
+        changed = False
+        
+        if content:
+            versions = self._versions(self.section_results)
+            content = self._update_index(versions)
             
-            if current_content:
-                startup_message = self._format_notification(current_content, is_startup=True)
-                self.send_notification(startup_message, msg_type="post")
-                self.last_hash = self.calculate_hash(current_content)
-                self.last_content = current_content
+            # 比较版本号，新版本发送最新版本的完整更新说明
+            newer = self.version_index.newer_than(self.last_content.key[0])
+            if newer:
+                message = self._format_notification(content)
+                logger.info("检测到新版本: %s", ', '.join(str(version) for version, _ in newer))
+                self.send_notification(message, msg_type="post")
+                changed = True
+            else:
+                logger.info("未检测到新版本")
             
-            while True:
-                try:
-                    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    content = self.get_page_content()
-                    
-                    if content:
-                        # 比较版本号
-                        if self._is_version_newer(content['version'], self.last_content['version']):
-                            message = self._format_notification(content)
-                            print(f"[{current_time}] 检测到新版本: {content['version']}")
-                            self.send_notification(message, msg_type="post")
-                            self.last_hash = self.calculate_hash(content)
-                            self.last_content = content
-                        else:
-                            print(f"[{current_time}] 未检测到新版本")
-                    
-                    time.sleep(self.check_interval)
-                    
-                except KeyboardInterrupt:
-                    print("\n收到退出信号，正在停止监控...")
-                    shutdown_message = "🔔 版本说明更新监控服务已停止"
-                    self.send_notification(shutdown_message, msg_type="post")
-                    break
-                    
-                except Exception as e:
-                    error_msg = f"监控出错: {str(e)}"
-                    print(error_msg)
-                    self.send_notification(error_msg)
-                    time.sleep(60)  # 出错后等待1分钟再重试
+            # 已有版本的修改和撤回只发送变化的部分
+            changes = self.diff_versions(versions, previous, content)
+            if changes['modified'] or changes['retracted']:
+                logger.info("检测到版本说明修改: %s 撤回: %s",
+                            ', '.join(changes['modified']), ', '.join(changes['retracted']))
+                self.send_notification(self._format_changes(content, changes), msg_type="post")
+                changed = True
             
-        except KeyboardInterrupt:
-            print("\n收到退出信号，正在停止监控...")
-            shutdown_message = "🔔 版本更新监控服务已停止"
-            self.send_notification(shutdown_message, msg_type="post")
+            self.last_hash = self.calculate_hash(content)
+            self.last_content = content
+            self.version_digests = self._version_digests(versions)
+            self.last_raw_hash = raw_hash
+            self.save_state()
+            self.archive_snapshot(html_content, versions)
+        return changed
+    
+    def report_error(self, error):
+        """记录错误并发送错误通知"""
+        error_msg = f"监控出错: {str(error)}"
+        logger.error(error_msg)
+        self.send_notification(error_msg)
+    
+    def shutdown(self):
+        """发送停止通知"""
+        shutdown_message = "🔔 版本说明更新监控服务已停止"
+        self.send_notification(shutdown_message, msg_type="post")
+    
+    def _versions(self, results):
+        """从段落解析结果中取出 {版本号: 解析结果}，按文档顺序排列"""
+        return {result.version: result for result in results.values() if result}
+    
+    def _update_index(self, versions):
+        """用本次的 {版本号: 解析结果} 更新版本索引，返回版本号最大的解析结果
 
-    def _is_version_newer(self, new_version, old_version):
-        """比较版本号"""
-        try:
-            # 移除版本号中的 'V' 前缀
-            new_version = new_version.replace('V', '').strip()
-            old_version = old_version.replace('V', '').strip()
-            
-            # 将版本号分割为数字列表
-            new_parts = [int(x) for x in new_version.split('.')]
-            old_parts = [int(x) for x in old_version.split('.')]
-            
-            return new_parts > old_parts
-        except Exception as e:
-            print(f"版本号比较出错: {str(e)}")
-            return False
+        未重新解析的版本块复用上一次的结果对象，只有新增、修改和消失的版本需要更新索引。
+        """
+        current = {result.key[0]: result for result in versions.values()}
+        for version, result in self.version_index:
+            if version not in current:
+                self.version_index.remove(version)
+        for version, result in current.items():
+            if self.version_index.get(version) is not result:
+                self.version_index.add(version, result)
+        return self.version_index.latest()[1]
+    
+    def _version_digests(self, versions):
+        """各版本解析结果的哈希"""
+        return {version: self.calculate_hash(result) for version, result in versions.items()}
+    
+    def _update_rows(self, updates):
+        """把更新列表转为 {(分类, 名称): 内容}，按表格行比较"""
+        rows = {}
+        category = ''
+        for item in updates:
+            text = item.strip()
+            if text in UPDATE_CATEGORIES:
+                category = text
+                continue
+            rows[(category, text.split('\n', 1)[0])] = item
+        return rows
+    
+    @instrument.timed('diff')
+    def diff_versions(self, versions, previous, latest):
+        """比较本次和上一次解析到的各版本
 
+        versions 为本次的 {版本号: 解析结果}，previous 为内存中上一次的解析结果，
+        latest 为本次的最新版本。返回:
+            {'modified': {版本号: 表格行差异 Delta，缺少修改前的内容时为 None},
+             'retracted': [上一次存在、本次消失的版本号]}
+        新发布的版本由版本号比较单独通知，表格行没有增删改的版本也不在结果中。
+        """
+        modified = {}
+        retracted = []
+        
+        if self.version_digests is not None:
+            index_delta = diff_maps(self.version_digests, self._version_digests(versions))
+            retracted = list(index_delta.removed)
+            for version in index_delta.modified:
+                modified[version] = None
+        elif self.last_content.version not in versions:
+            # 没有版本索引时只能发现最新版本的撤回
+            retracted = [self.last_content.version]
+        
+        # 最新版本始终与保存的内容比较，重启后也能得到表格行差异
+        if latest.version == self.last_content.version and latest != self.last_content:
+            modified[latest.version] = None
+        
+        for version in list(modified):
+            if version in previous:
+                rows = diff_maps(
+                    self._update_rows(previous[version].updates),
+                    self._update_rows(versions[version].updates)
+                )
+                if rows:
+                    modified[version] = rows
+                else:
+                    # 只是表格行顺序变化或去掉了重复行，不算修改
+                    del modified[version]
+        
+        return {'modified': modified, 'retracted': retracted}
+    
+    def _format_row(self, text):
+        """格式化一条表格行"""
+        return (text.strip()
+                    .replace('【', '📌 ')
+                    .replace('】', '')
+                    .replace('\n\n参考文档：', '\n> 📚 ')
+                    .replace('• ', '◦ '))
+    
+    @instrument.timed('render')
+    def _format_changes(self, content, changes):
+        """格式化版本说明修改的通知消息，只包含变化的表格行"""
+        names = {'【组件更新】': '组件', '【接口更新】': '接口'}
+        parts = [
+            "📝 检测到版本说明修改\n"
+            "|  类型  |  内容  |\n"
+            "|:------:|:------|\n"
+            f"|  最新版本  | `{content.version}` |\n"
+            f"|  日期  | `{content.date}` |"
+        ]
+        
+        for version, rows in changes['modified'].items():
+            if rows is None:
+                parts.append(f"✏️ 版本 `{version}` 的更新说明有修改")
+                continue
+            lines = [f"✏️ 版本 `{version}` 的更新说明有修改"]
+            for title, items in (("➕ 新增", rows.added), ("✏️ 修改", {k: v[1] for k, v in rows.modified.items()})):
+                for (category, _), text in items.items():
+                    lines.append(f"{title}{names.get(category, '')}\n{self._format_row(text)}")
+            for (category, name), _ in rows.removed.items():
+                lines.append(f"➖ 删除{names.get(category, '')} {self._format_row(name)}")
+            parts.append("\n\n".join(lines))
+        
+        if changes['retracted']:
+            parts.append("⚠️ 以下版本已从文档中移除: " + ", ".join(f"`{v}`" for v in changes['retracted']))
+        
+        return "\n\n".join(parts) + f"\n---\n🔗 [查看详情]({self.url})"
+    
+    @instrument.timed('render')
     def _format_notification(self, content, is_startup=False):
         """格式化通知消息"""
         if is_startup:
@@ -300,8 +498,8 @@ class VersionMonitor:
                 "🔔 版本更新监控服务已启动\n"
                 "|  类型  |  内容  |\n"
                 "|:------:|:------|\n"
-                f"|  版本  | `{content['version']}` |\n"
-                f"|  日期  | `{content['date']}` |\n"
+                f"|  版本  | `{content.version}` |\n"
+                f"|  日期  | `{content.date}` |\n"
                 "📋 更新内容\n" + 
                 "\n\n".join([
                     content.replace('【组件更新】', '🔧 组件更新')
@@ -310,7 +508,7 @@ class VersionMonitor:
                            .replace('】\n', '】')
                            .replace('\n\n参考文档：', '\n> 📚 ')
                            .replace('• ', '◦ ')
-                    for content in content['updates']
+                    for content in content.updates
                 ]) +
                 f"\n---\n⏱️ 监控间隔：`{self.check_interval}秒`"
             )
@@ -319,8 +517,8 @@ class VersionMonitor:
                 "🚨 检测到版本更新！\n"
                 "|  类型  |  内容  |\n"
                 "|:------:|:------|\n"
-                f"|  版本  | `{content['version']}` |\n"
-                f"|  日期  | `{content['date']}` |\n"
+                f"|  版本  | `{content.version}` |\n"
+                f"|  日期  | `{content.date}` |\n"
                 "📋 更新内容\n" + 
                 "\n\n".join([
                     content.replace('【组件更新】', '🔧 组件更新')
@@ -329,13 +527,16 @@ class VersionMonitor:
                            .replace('】', '')
                            .replace('\n\n参考文档：', '\n> 📚 ')
                            .replace('• ', '◦ ')
-                    for content in content['updates']
+                    for content in content.updates
                 ]) +
                 f"\n---\n🔗 [查看详情]({self.url})"
             )
 
 # 使用示例
 if __name__ == "__main__":
+    log_setup.configure()
+    profiler.install()
+    
     target_url = "https://developer.huawei.com/consumer/cn/doc/quickApp-Guides/quickapp-version-updates-0000001079803874"
     webhook_url = "https://open.feishu.cn/open-apis/bot/v2/hook/1a11a0f0-b246-423c-909f-5ebbbbf4e2f4"
     
@@ -343,5 +544,5 @@ if __name__ == "__main__":
     monitor = VersionMonitor(target_url, webhook_url, 300)
     
     # 开始监控
-    monitor.monitor() 
+    run_monitor('huawei_version', monitor, monitor.check_interval) 
     
\ No newline at end of file
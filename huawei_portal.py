@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+import http_client
+import instrument
+import json_envelope
+import metrics
+from config import HUAWEI_PORTAL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 华为开发者文档门户接口
+DOCUMENT_API_URL = "https://svc-drcn.developer.huawei.com/community/servlet/consumer/cn/documentPortal/getDocumentById"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'zh-CN,zh;q=0.9',
+    'Content-Type': 'application/json',
+    'Origin': 'https://developer.huawei.com',
+    'Referer': 'https://developer.huawei.com/',
+    'sec-ch-ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
+    'sec-ch-ua-platform': '"macOS"',
+    'sec-fetch-dest': 'empty',
+    'sec-fetch-mode': 'cors',
+    'sec-fetch-site': 'same-site'
+}
+
+# 最近一次获取到的文档内容 {objectId: html}，条件请求返回 304 时使用
+_documents = {}
+
+# 当前进程的批量获取器
+_batch_fetcher = None
+
+
+def parse_document_url(url):
+    """从文档页面地址中解析 (catalogName, objectId)
+
+    例如 https://developer.huawei.com/consumer/cn/doc/Tools-Library/quickapp-ide-download-0000001101172926
+    解析为 ('Tools-Library', 'quickapp-ide-download-0000001101172926')。
+    """
+    parts = [part for part in urlparse(url).path.split('/') if part]
+    if 'doc' not in parts or len(parts) < parts.index('doc') + 3:
+        raise ValueError(f"无法从地址中解析文档信息: {url}")
+    index = parts.index('doc')
+    return parts[index + 1], parts[index + 2]
+
+
+def fetch_document(object_id, catalog_name, conditional=False):
+    """获取文档的原始 HTML
+
+    conditional 为 True 时发送条件请求，服务端返回 304 时返回上次获取到的内容；
+    同一文档被多个监控共享时，每个监控都能拿到完整内容自行比对。
+    """
+    data = {
+        "objectId": object_id,
+        "version": "",
+        "catalogName": catalog_name,
+        "language": "cn"
+    }
+
+    logger.debug("发送POST请求: %s/%s", catalog_name, object_id)
+    # 流式读取响应，只从 JSON 中取出文档内容，不构建整个 JSON 对象；
+    # 只统计请求本身的耗时，不包括批量获取的等待时间，共享的文档记录在发起本次请求的目标下
+    with metrics.timer('fetch_seconds', metrics.current_target()), instrument.stage('fetch'):
+        if conditional and object_id in _documents:
+            response = http_client.conditional_request(
+                'POST', DOCUMENT_API_URL, cache_key=object_id, json=data, headers=HEADERS, stream=True
+            )
+        else:
+            response = http_client.post(DOCUMENT_API_URL, json=data, headers=HEADERS, stream=True)
+        if http_client.is_not_modified(response):
+            logger.info("页面未修改 (304)")
+            response.close()
+            return _documents[object_id]
+        body = http_client.read_body(response)
+    logger.debug("响应状态码: %s", response.status_code)
+
+    if response.status_code == 200:
+        with instrument.stage('json_decode'):
+            code = json_envelope.load(body, ('code',))
+
+        if code == 0:
+            with instrument.stage('extract'):
+                html_content = json_envelope.pop_string(body, ('value', 'content', 'content'))
+            if html_content is not None:
+                _documents[object_id] = html_content
+                return html_content
+
+    raise ValueError(f"API请求失败: {response.status_code}")
+
+
+class DocumentBatchFetcher:
+    """批量获取华为文档
+
+    在 batch_window 时间窗口内收到的请求合并为一批：同一文档只请求一次，
+    结果分发给所有等待的监控；不同文档通过共享连接池并发请求，
+    并发数不超过 max_concurrency。
+    """
+
+    def __init__(self, batch_window, max_concurrency):
+        self.batch_window = batch_window
+        self.loop = asyncio.get_running_loop()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.pending = {}  # {(catalogName, objectId): (future, conditional)}
+        self.flush_handle = None
+        self.tasks = set()  # 进行中的请求任务，保留引用直到完成
+
+    async def fetch(self, object_id, catalog_name, conditional=False):
+        """获取文档原始 HTML，语义与 fetch_document 相同"""
+        key = (catalog_name, object_id)
+        if key in self.pending:
+            future, pending_conditional = self.pending[key]
+            # 同一批次中只要有一个监控需要完整内容，就不发送条件请求
+            self.pending[key] = (future, pending_conditional and conditional)
+        else:
+            future = self.loop.create_future()
+            self.pending[key] = (future, conditional)
+            if self.flush_handle is None:
+                self.flush_handle = self.loop.call_later(self.batch_window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        """发出当前批次的所有请求"""
+        batch, self.pending = self.pending, {}
+        self.flush_handle = None
+        if len(batch) > 1:
+            logger.info("批量获取 %s 个华为文档", len(batch))
+        for (catalog_name, object_id), (future, conditional) in batch.items():
+            task = asyncio.ensure_future(self._fetch_one(future, object_id, catalog_name, conditional))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _fetch_one(self, future, object_id, catalog_name, conditional):
+        """请求单个文档并设置结果"""
+        try:
+            async with self.semaphore:
+                result = await http_client.run_async(fetch_document, object_id, catalog_name, conditional)
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+
+
+async def fetch_document_async(object_id, catalog_name, conditional=False):
+    """在 asyncio 模式下获取文档，同一进程内的请求会被合并批量发送"""
+    global _batch_fetcher
+    loop = asyncio.get_running_loop()
+    if _batch_fetcher is None or _batch_fetcher.loop is not loop:
+        _batch_fetcher = DocumentBatchFetcher(
+            HUAWEI_PORTAL_CONFIG['batch_window'],
+            HUAWEI_PORTAL_CONFIG['max_concurrency']
+        )
+    return await _batch_fetcher.fetch(object_id, catalog_name, conditional)
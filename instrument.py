@@ -0,0 +1,182 @@
+import functools
+import logging
+import threading
+import time
+
+import metrics
+from config import INSTRUMENT_CONFIG
+from process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+# 一次检查的总耗时记为该阶段，汇总表中其余阶段按它计算占比
+CHECK_STAGE = 'check'
+
+_enabled = INSTRUMENT_CONFIG['enabled']
+
+
+class _Stats:
+    """当前进程的耗时汇总"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # {(目标, 阶段): [次数, 总耗时, 最大耗时]}
+        self.last_report = time.monotonic()
+
+
+# fork 出的子进程只统计自己的耗时，不继承管理器的汇总结果
+_stats = ProcessLocal(_Stats)
+
+
+class _NullTimer:
+    """未启用时使用的空计时器，所有调用共用一个实例"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    """记录一个阶段的耗时"""
+
+    __slots__ = ('name', 'target', 'start')
+
+    def __init__(self, name, target):
+        self.name = name
+        self.target = target
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        _record(self.name, self.target, time.perf_counter() - self.start)
+        return False
+
+
+class _CheckTimer(_StageTimer):
+    """记录一次检查的总耗时，结束后按间隔把汇总表写入日志"""
+
+    __slots__ = ()
+
+    def __exit__(self, exc_type, exc, traceback):
+        _record(self.name, self.target, time.perf_counter() - self.start)
+        maybe_report()
+        return False
+
+
+def is_enabled():
+    """是否启用分阶段计时"""
+    return _enabled
+
+
+def enable(flag=True):
+    """运行时开启或关闭分阶段计时（如基准测试中）"""
+    global _enabled
+    _enabled = flag
+
+
+def _record(name, target, seconds):
+    """汇总一次耗时，target 为 None 时使用当前监控目标"""
+    target = target or metrics.current_target()
+    key = (target or '-', name)
+    stats = _stats.get()
+    with stats.lock:
+        entry = stats.entries.get(key)
+        if entry is None:
+            stats.entries[key] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+    if INSTRUMENT_CONFIG['export']:
+        metrics.observe('stage_seconds', target, seconds, stage=name)
+
+
+def stage(name, target=None):
+    """记录代码块耗时的上下文管理器
+
+        with instrument.stage('json_decode'):
+            data = response.json()
+
+    未启用时返回共用的空计时器，不读取时钟也不加锁。
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _StageTimer(name, target)
+
+
+def check(target=None):
+    """记录一次完整检查（获取、解析、比较、通知）的耗时，启动时的首次获取和解析也计为一次检查"""
+    if not _enabled:
+        return _NULL_TIMER
+    return _CheckTimer(CHECK_STAGE, target)
+
+
+def timed(name=None):
+    """记录函数耗时的装饰器，name 默认为函数名"""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(stage_name, None, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def summary(target=None):
+    """汇总结果，返回 [(目标, 阶段, 次数, 总耗时, 最大耗时)]，按目标和总耗时从大到小排列"""
+    stats = _stats.get()
+    with stats.lock:
+        rows = [(key[0], key[1], entry[0], entry[1], entry[2])
+                for key, entry in stats.entries.items() if target is None or key[0] == target]
+    return sorted(rows, key=lambda row: (row[0], -row[3]))
+
+
+def format_summary(target=None):
+    """把汇总结果渲染为表格，占比为该阶段总耗时占检查总耗时的比例"""
+    rows = summary(target)
+    checks = {row[0]: row[3] for row in rows if row[1] == CHECK_STAGE}
+    header = f"{'目标':<20}{'阶段':<24}{'次数':>8}{'总耗时(s)':>12}{'平均(ms)':>11}{'最大(ms)':>11}{'占比':>8}"
+    lines = [header, '-' * len(header)]
+    for row_target, name, count, total, maximum in rows:
+        check_total = checks.get(row_target)
+        share = f"{total / check_total:>8.1%}" if check_total else f"{'-':>8}"
+        lines.append(
+            f"{row_target:<20}{name:<24}{count:>8}{total:>12.3f}"
+            f"{total / count * 1000:>11.2f}{maximum * 1000:>11.2f}{share}"
+        )
+    return "\n".join(lines)
+
+
+def maybe_report():
+    """距上次输出超过 report_interval 秒时把汇总表写入日志"""
+    stats = _stats.get()
+    interval = INSTRUMENT_CONFIG['report_interval']
+    now = time.monotonic()
+    if not interval or now - stats.last_report < interval:
+        return
+    stats.last_report = now
+    logger.info("分阶段耗时统计:\n%s", format_summary())
+
+
+def reset():
+    """清空汇总结果"""
+    stats = _stats.get()
+    with stats.lock:
+        stats.entries.clear()
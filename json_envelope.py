@@ -0,0 +1,138 @@
+import codecs
+import json
+import re
+from json.decoder import scanstring
+
+# 接口返回的 JSON 信封中，文档 HTML 通常占了绝大部分内容。这里直接在原始字节上
+# 定位需要的字段，不构建整个 JSON 对象：跳过的字符串由正则在 C 层匹配，不创建副本；
+# 文档字段分段解码，不会同时存在原始字节、整段解码文本和结果字符串三份完整副本。
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+
+# 文档字段按片段解码，每段约 64KB
+_PIECE_SIZE = 64 * 1024
+
+
+def _skip_whitespace(buf, pos):
+    """跳过空白字符"""
+    return _WHITESPACE.match(buf, pos).end()
+
+
+def _string_end(buf, pos):
+    """pos 处字符串（含引号）之后的位置"""
+    match = _STRING.match(buf, pos)
+    if match is None:
+        raise ValueError(f"JSON 字符串格式错误，位置 {pos}")
+    return match.end()
+
+
+def _skip_value(buf, pos):
+    """跳过 pos 处的一个值，返回值之后的位置"""
+    char = buf[pos]
+    if char == 0x22:  # "
+        return _string_end(buf, pos)
+    if char not in (0x7b, 0x5b):  # { [
+        match = _SCALAR.match(buf, pos)
+        if match is None:
+            raise ValueError(f"JSON 格式错误，位置 {pos}")
+        return match.end()
+
+    depth = 0
+    while True:
+        match = _STRUCTURE.search(buf, pos)
+        if match is None:
+            raise ValueError("JSON 不完整")
+        pos = match.start()
+        char = buf[pos]
+        if char == 0x22:
+            pos = _string_end(buf, pos)
+            continue
+        depth += 1 if char in (0x7b, 0x5b) else -1
+        pos += 1
+        if depth == 0:
+            return pos
+
+
+def _find_member(buf, pos, key):
+    """pos 处为对象时返回成员 key 的值的起始位置，不是对象或没有该成员时返回 None"""
+    if buf[pos] != 0x7b:
+        return None
+    pos = _skip_whitespace(buf, pos + 1)
+    if buf[pos] == 0x7d:  # }
+        return None
+    while True:
+        end = _string_end(buf, pos)
+        name = json.loads(bytes(buf[pos:end]))
+        pos = _skip_whitespace(buf, end)
+        if buf[pos] != 0x3a:  # :
+            raise ValueError(f"JSON 格式错误，位置 {pos}")
+        pos = _skip_whitespace(buf, pos + 1)
+        if name == key:
+            return pos
+        pos = _skip_whitespace(buf, _skip_value(buf, pos))
+        if buf[pos] == 0x2c:  # ,
+            pos = _skip_whitespace(buf, pos + 1)
+        elif buf[pos] == 0x7d:
+            return None
+        else:
+            raise ValueError(f"JSON 格式错误，位置 {pos}")
+
+
+def _locate(buf, path):
+    """按键路径定位值的起始位置，路径不存在时返回 None"""
+    pos = _skip_whitespace(buf, 0)
+    for key in path:
+        pos = _find_member(buf, pos, key)
+        if pos is None:
+            return None
+    return pos
+
+
+def find(buf, path):
+    """按键路径定位值，返回值在 buf 中的 (起始, 结束) 位置，路径不存在时返回 None"""
+    pos = _locate(buf, path)
+    if pos is None:
+        return None
+    return pos, _skip_value(buf, pos)
+
+
+def load(buf, path, default=None):
+    """读取一个较小的值（如状态码），路径不存在时返回 default"""
+    span = find(buf, path)
+    if span is None:
+        return default
+    return json.loads(bytes(buf[span[0]:span[1]]))
+
+
+def pop_string(buf, path, default=None):
+    """取出路径上的字符串值，路径不存在时返回 default
+
+    buf 为 bytearray，解码后会被清空以释放原始字节，调用后不能再使用。
+    """
+    pos = _locate(buf, path)
+    if pos is None:
+        return default
+    if buf[pos] != 0x22:  # "
+        raise ValueError(f"{'.'.join(path)} 不是字符串")
+    pos += 1
+
+    pieces = []
+    with memoryview(buf) as view:
+        while True:
+            # 只在 '<' 之前切开，'<' 不会出现在转义序列或多字节字符中间
+            cut = buf.find(b'<', pos + _PIECE_SIZE)
+            cut = len(buf) if cut == -1 else cut
+            text = '"' + codecs.utf_8_decode(view[pos:cut], 'surrogatepass', True)[0] + '"'
+            value, index = scanstring(text, 1)
+            pieces.append(value)
+            # 停在补上的引号处说明字段在后面的片段中继续
+            if index < len(text):
+                break
+            if cut == len(buf):
+                raise ValueError(f"{'.'.join(path)} 字符串不完整")
+            pos = cut
+    buf.clear()
+    return pieces[0] if len(pieces) == 1 else ''.join(pieces)
@@ -0,0 +1,89 @@
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import sys
+
+import metrics
+from config import LOG_CONFIG
+
+_listener = None
+
+
+class TargetFilter(logging.Filter):
+    """给日志记录加上当前正在执行的监控目标"""
+
+    def filter(self, record):
+        if not hasattr(record, 'target'):
+            record.target = metrics.current_target() or '-'
+        return True
+
+
+def _handlers():
+    """按配置创建控制台和滚动日志文件输出"""
+    formatter = logging.Formatter(LOG_CONFIG['format'])
+    handlers = []
+
+    if LOG_CONFIG['console']:
+        handlers.append(logging.StreamHandler(sys.stdout))
+
+    path = LOG_CONFIG['file']
+    if path:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=LOG_CONFIG['max_bytes'],
+            backupCount=LOG_CONFIG['backup_count'],
+            encoding='utf-8'
+        ))
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.addFilter(TargetFilter())
+    return handlers
+
+
+def configure(log_queue=None):
+    """配置当前进程的日志
+
+    log_queue 为管理器创建的日志队列时（监控子进程），日志通过队列交给管理器统一写入，
+    避免多个进程同时滚动同一个日志文件；否则直接输出到控制台和滚动日志文件。
+    低于配置级别的日志在产生日志的进程中直接丢弃，不会格式化。
+    """
+    root = logging.getLogger()
+    # fork 出的子进程会继承管理器的输出，先全部移除
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    root.setLevel(LOG_CONFIG['level'])
+    for name, level in LOG_CONFIG['levels'].items():
+        logging.getLogger(name).setLevel(level)
+
+    if log_queue is not None:
+        handler = logging.handlers.QueueHandler(log_queue)
+        handler.addFilter(TargetFilter())
+        root.addHandler(handler)
+        return
+
+    for handler in _handlers():
+        root.addHandler(handler)
+
+
+def start_listener():
+    """在管理器中配置日志并启动汇总线程，返回传给子进程的日志队列"""
+    global _listener
+    configure()
+    log_queue = multiprocessing.Queue()
+    _listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers)
+    _listener.start()
+    return log_queue
+
+
+def stop_listener():
+    """写完队列中剩余的日志后停止汇总线程"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
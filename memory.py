@@ -0,0 +1,223 @@
+import contextlib
+import contextvars
+import gc
+import linecache
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import instrument
+import metrics
+from config import MEMORY_CONFIG
+from process_local import ProcessLocal
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# 当前检查的文档树登记处，asyncio 模式下各检查在各自的上下文中登记
+_arena = contextvars.ContextVar('memory_arena', default=None)
+
+
+class _State:
+    """当前进程的回收和追踪状态"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.warmed_up = False  # 第一次检查完成后冻结对象、开始追踪
+        self.baseline = None  # 开始追踪时的快照
+        self.previous = None  # 上一次报告时的快照
+        self.last_report = time.monotonic()
+
+
+# 子进程不沿用父进程的追踪状态
+_state = ProcessLocal(_State)
+
+# 报告中排除追踪本身、读取源码行和导入机制的分配
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>')
+)
+
+
+class Arena:
+    """一次检查中创建的文档树
+
+    bs4 的节点之间有大量循环引用（parent / next_element / previous_element），
+    文档树不再使用后仍要等到下一次完整回收才能释放。检查结束时逐个拆除，
+    断开节点之间的引用，内存由引用计数立即释放；剩下的只有解析器与 builder 之间
+    少量的循环引用，由之后的回收处理。
+    """
+
+    __slots__ = ('soups',)
+
+    def __init__(self):
+        self.soups = []
+
+    def track(self, soup):
+        """登记文档树，检查结束时拆除"""
+        self.soups.append(soup)
+        return soup
+
+    def release(self):
+        """拆除登记的所有文档树"""
+        from bs4 import Tag  # 登记过文档树时 bs4 已经导入
+
+        soups, self.soups = self.soups, []
+        for soup in soups:
+            # BeautifulSoup 对象的 next_element 为空，直接 decompose 不会遍历到子节点；
+            # 顶层的注释和文本没有 decompose，从文档树中取出即可
+            for element in list(soup.contents):
+                if isinstance(element, Tag):
+                    element.decompose()
+                else:
+                    element.extract()
+            soup.decompose()
+
+
+def track(soup):
+    """在当前检查中登记文档树，不在检查中或关闭拆除时原样返回"""
+    arena = _arena.get()
+    if arena is not None and MEMORY_CONFIG['decompose']:
+        arena.track(soup)
+    return soup
+
+
+@contextlib.contextmanager
+def cycle(target=None):
+    """一次检查的内存周期
+
+    期间通过 parsing.make_soup 创建的文档树在结束时拆除，然后按配置主动回收，
+    并定期对比内存分配快照。解析结果中只能保存字符串等普通对象，不能保存 bs4 节点。
+    target 用于标注回收耗时，省略时使用当前绑定的监控目标。
+    """
+    arena = Arena()
+    token = _arena.set(arena)
+    try:
+        yield arena
+    finally:
+        _arena.reset(token)
+        with instrument.stage('release', target):
+            arena.release()
+            _collect()
+        maybe_report()
+
+
+def _collect():
+    """按配置回收垃圾；第一次检查完成后冻结已有对象并开始追踪内存分配
+
+    启动时创建的模块、配置和缓存会一直存在，冻结后不再参与之后的回收扫描。
+    """
+    state = _state.get()
+    generation = MEMORY_CONFIG['gc_generation']
+    if not state.warmed_up:
+        with state.lock:
+            if not state.warmed_up:
+                state.warmed_up = True
+                if MEMORY_CONFIG['freeze']:
+                    # 冻结前做一次完整回收，本次不再按 gc_generation 重复回收
+                    gc.collect()
+                    gc.freeze()
+                    generation = None
+                if MEMORY_CONFIG['tracemalloc']:
+                    start_tracing()
+    if generation is not None:
+        gc.collect(generation)
+
+
+def rss_bytes():
+    """当前进程的常驻内存（字节）
+
+    不能读取 /proc 的平台返回进程的常驻内存峰值，都不支持时返回 None。
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _take_snapshot():
+    """记录内存分配快照"""
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def start_tracing():
+    """开始追踪内存分配，并记录对比用的初始快照"""
+    state = _state.get()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(MEMORY_CONFIG['frames'])
+    state.baseline = state.previous = _take_snapshot()
+    logger.info("开始追踪内存分配，每 %s 秒报告一次增长", MEMORY_CONFIG['report_interval'])
+
+
+def _format_site(traceback):
+    """分配位置，调用栈多于一层时从外到内列出"""
+    lines = []
+    for frame in reversed(traceback):
+        source = linecache.getline(frame.filename, frame.lineno).strip()
+        lines.append(f"{os.path.basename(frame.filename)}:{frame.lineno}  {source}")
+    return "\n        ".join(lines)
+
+
+def format_report(top=None):
+    """对比开始追踪时和上一次报告的快照，列出累计增长最多的分配位置"""
+    state = _state.get()
+    if state.baseline is None:
+        return "未开始追踪内存分配"
+    top = top or MEMORY_CONFIG['top']
+    key_type = 'lineno' if MEMORY_CONFIG['frames'] <= 1 else 'traceback'
+    snapshot = _take_snapshot()
+    since_start = snapshot.compare_to(state.baseline, key_type)
+    since_previous = {diff.traceback: diff for diff in snapshot.compare_to(state.previous, key_type)}
+    state.previous = snapshot
+
+    current, peak = tracemalloc.get_traced_memory()
+    rss = rss_bytes()
+    lines = [
+        f"常驻内存 {rss / 1048576:.1f} MB，已追踪 {current / 1048576:.1f} MB（峰值 {peak / 1048576:.1f} MB）"
+        if rss is not None else
+        f"已追踪 {current / 1048576:.1f} MB（峰值 {peak / 1048576:.1f} MB）",
+        f"{'累计增长(KB)':>14}{'近期增长(KB)':>14}{'累计对象':>10}  分配位置"
+    ]
+    growth = [diff for diff in since_start if diff.size_diff > 0]
+    for diff in growth[:top]:
+        recent = since_previous.get(diff.traceback)
+        recent_kb = recent.size_diff / 1024 if recent else 0.0
+        lines.append(
+            f"{diff.size_diff / 1024:>14.1f}{recent_kb:>14.1f}{diff.count_diff:>10}  {_format_site(diff.traceback)}"
+        )
+    return "\n".join(lines)
+
+
+def maybe_report():
+    """更新常驻内存指标；追踪开启且距上次报告超过 report_interval 秒时把分配增长写入日志"""
+    state = _state.get()
+    rss = rss_bytes()
+    if rss is not None:
+        metrics.set_gauge('memory_rss_bytes', multiprocessing.current_process().name, rss)
+    interval = MEMORY_CONFIG['report_interval']
+    if state.baseline is None:
+        return
+    now = time.monotonic()
+    if not interval or now - state.last_report < interval:
+        return
+    with state.lock:
+        if now - state.last_report < interval:
+            return
+        state.last_report = now
+        logger.info("内存分配增长:\n%s", format_report())
@@ -0,0 +1,347 @@
+import bisect
+import contextlib
+import contextvars
+import functools
+import inspect
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import METRICS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'quickapp_'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+NOTIFY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# {指标名: (类型, 说明, 直方图分桶)}
+METRICS = {
+    'fetch_seconds': ('histogram', "页面请求耗时（秒）", LATENCY_BUCKETS),
+    'response_bytes': ('histogram', "页面响应大小（字节）", SIZE_BUCKETS),
+    'parse_seconds': ('histogram', "解析耗时（秒）", LATENCY_BUCKETS),
+    'diff_seconds': ('histogram', "比较耗时（秒）", LATENCY_BUCKETS),
+    'stage_seconds': ('histogram', "检查中各阶段的耗时（秒），按阶段统计", LATENCY_BUCKETS),
+    'process_seconds': ('histogram', "一次检查中解析、比较和通知的总耗时（秒）", LATENCY_BUCKETS),
+    'notify_seconds': ('histogram', "通知从入队到发送成功的耗时（秒）", NOTIFY_BUCKETS),
+    'checks_total': ('counter', "完成的检查次数", None),
+    'changes_total': ('counter', "检测到更新的次数", None),
+    'errors_total': ('counter', "错误次数，按异常类型统计", None),
+    'restarts': ('gauge', "监控进程的重启次数", None),
+    'up': ('gauge', "监控进程是否在运行", None),
+    'last_success_timestamp_seconds': ('gauge', "最近一次成功检查的时间戳", None),
+    'memory_rss_bytes': ('gauge', "监控进程的常驻内存（字节），按进程名统计", None),
+}
+
+# 子进程通过队列把指标发送给管理器，未连接队列时在本进程内汇总
+_queue = None
+_current_target = contextvars.ContextVar('metrics_target', default=None)
+
+
+class Registry:
+    """在内存中汇总指标，按 Prometheus 文本格式输出"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}  # {(指标名, 标签): 计数器或仪表的值 / 直方图 [各分桶计数, 总和, 次数]}
+
+    def apply(self, kind, name, labels, value):
+        """记录一个数据点，kind 为 inc / set / observe"""
+        if name not in METRICS:
+            raise ValueError(f"未知的指标: {name}")
+        metric_type, _, buckets = METRICS[name]
+        key = (name, labels)
+        with self.lock:
+            if kind == 'observe' and metric_type == 'histogram':
+                histogram = self.values.get(key)
+                if histogram is None:
+                    histogram = self.values[key] = [[0] * len(buckets), 0.0, 0]
+                index = bisect.bisect_left(buckets, value)
+                if index < len(buckets):
+                    histogram[0][index] += 1
+                histogram[1] += value
+                histogram[2] += 1
+            elif kind == 'inc' and metric_type == 'counter':
+                self.values[key] = self.values.get(key, 0) + value
+            elif kind == 'set' and metric_type == 'gauge':
+                self.values[key] = value
+            else:
+                raise ValueError(f"指标 {name} 不支持 {kind}")
+
+    def render(self, now=None):
+        """输出 Prometheus 文本格式"""
+        now = time.time() if now is None else now
+        with self.lock:
+            items = sorted(self.values.items(), key=lambda item: item[0])
+            snapshot = [(name, labels, value if not isinstance(value, list) else
+                         [list(value[0]), value[1], value[2]]) for (name, labels), value in items]
+
+        lines = []
+        for name, (metric_type, help_text, buckets) in METRICS.items():
+            series = [(labels, value) for metric, labels, value in snapshot if metric == name]
+            if not series:
+                continue
+            full_name = PREFIX + name
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            for labels, value in series:
+                if metric_type != 'histogram':
+                    lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}")
+                lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {count}")
+
+        # 距最近一次成功检查的时间由抓取时计算，监控停止检测时持续增长
+        last_success = [(labels, value) for name, labels, value in snapshot
+                        if name == 'last_success_timestamp_seconds']
+        if last_success:
+            full_name = PREFIX + 'seconds_since_last_success'
+            lines.append(f"# HELP {full_name} 距最近一次成功检查的时间（秒）")
+            lines.append(f"# TYPE {full_name} gauge")
+            for labels, value in last_success:
+                lines.append(f"{full_name}{_format_labels(labels)} {_format_value(max(0.0, now - value))}")
+
+        return "\n".join(lines) + "\n"
+
+
+_registry = Registry()
+
+
+def _format_labels(labels):
+    """格式化标签，转义反斜杠、引号和换行"""
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    """格式化数值"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def is_enabled():
+    """是否启用指标"""
+    return METRICS_CONFIG['enabled']
+
+
+def _emit(kind, name, target, value, labels):
+    """记录一个数据点，子进程发送到管理器，否则写入本进程的汇总
+
+    target 为 None（不在监控目标中执行，如基准测试）时不记录。
+    """
+    if not is_enabled() or target is None:
+        return
+    labels = (('target', target),) + tuple(sorted(labels.items()))
+    if _queue is not None:
+        try:
+            _queue.put_nowait((kind, name, labels, value))
+        except queue.Full:
+            pass  # 管理器处理不过来时丢弃，不阻塞监控
+        return
+    _registry.apply(kind, name, labels, value)
+
+
+def inc(name, target, value=1, **labels):
+    """计数器加 value"""
+    _emit('inc', name, target, value, labels)
+
+
+def set_gauge(name, target, value, **labels):
+    """设置仪表的值"""
+    _emit('set', name, target, value, labels)
+
+
+def observe(name, target, value, **labels):
+    """记录直方图的一个观测值"""
+    _emit('observe', name, target, value, labels)
+
+
+@contextlib.contextmanager
+def timer(name, target, **labels):
+    """记录代码块的耗时"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, target, time.perf_counter() - start, **labels)
+
+
+def current_target():
+    """当前正在执行的监控目标，用于在不知道目标的底层代码中打标签"""
+    return _current_target.get()
+
+
+def bind_target(target):
+    """设置当前上下文的监控目标，监控子进程启动时设置后，整个进程默认属于该目标"""
+    _current_target.set(target)
+
+
+def record_error(error, target=None):
+    """记录一次检查中的错误，未指定目标时使用当前目标"""
+    target = target or current_target()
+    if target is None:
+        return
+    inc('errors_total', target, type=type(error).__name__, stage='check')
+
+
+def render():
+    """输出本进程汇总的指标"""
+    return _registry.render()
+
+
+def attach(metrics_queue):
+    """子进程连接到管理器的指标队列"""
+    global _queue
+    _queue = metrics_queue
+
+
+def _collect(metrics_queue):
+    """管理器中汇总子进程发送的指标"""
+    while True:
+        try:
+            _registry.apply(*metrics_queue.get())
+        except Exception as e:
+            logger.error("处理指标失败: %s", e)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """指标接口，GET /metrics 返回 Prometheus 文本格式"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 不输出每次抓取的访问日志
+
+
+def start_server():
+    """在管理器中启动指标汇总线程和 HTTP 接口，返回传给子进程的指标队列
+
+    未启用指标时返回 None。
+    """
+    if not is_enabled():
+        return None
+
+    metrics_queue = multiprocessing.Queue(METRICS_CONFIG['queue_size'])
+    threading.Thread(target=_collect, args=(metrics_queue,), name='metrics-collector', daemon=True).start()
+
+    server = ThreadingHTTPServer((METRICS_CONFIG['host'], METRICS_CONFIG['port']), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info("指标接口已启动: http://%s:%s/metrics", METRICS_CONFIG['host'], server.server_address[1])
+    return metrics_queue
+
+
+def _with_target(target, method, before=None, after=None):
+    """包装监控方法：执行期间设置当前目标，before / after 在调用前后记录指标"""
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            token = _current_target.set(target)
+            try:
+                if before:
+                    before()
+                start = time.perf_counter()
+                result = await method(*args, **kwargs)
+                if after:
+                    after(result, time.perf_counter() - start)
+                return result
+            finally:
+                _current_target.reset(token)
+        return wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        token = _current_target.set(target)
+        try:
+            if before:
+                before()
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            if after:
+                after(result, time.perf_counter() - start)
+            return result
+        finally:
+            _current_target.reset(token)
+    return wrapper
+
+
+def instrument_monitor(monitor, monitor_type, target):
+    """按监控类型声明的步骤给监控实例加上指标
+
+    fetcher 执行期间设置当前目标，请求耗时和响应大小由发出请求的代码按当前目标记录；
+    parser / differ 记录耗时，process / startup 记录检查次数、更新次数和最近一次成功检查的时间，
+    report_error 按异常类型计数。
+    未启用指标时只在执行期间设置当前目标，供日志标注目标。
+    """
+    def names(stage):
+        value = getattr(monitor_type, stage)
+        return value if isinstance(value, tuple) else (value,)
+
+    def wrap(name, before=None, after=None):
+        method = getattr(monitor, name, None)
+        if method is not None:
+            setattr(monitor, name, _with_target(target, method, before, after))
+
+    def timed(metric, stage):
+        return lambda result, seconds: observe(metric, target, seconds, stage=stage)
+
+    def checked(changed, seconds):
+        observe('process_seconds', target, seconds)
+        inc('checks_total', target)
+        if changed:
+            inc('changes_total', target)
+        set_gauge('last_success_timestamp_seconds', target, time.time())
+
+    def started(result, seconds):
+        set_gauge('last_success_timestamp_seconds', target, time.time())
+
+    for name in names('fetcher'):
+        wrap(name)
+        wrap(name + '_async')
+    for name in names('parser'):
+        wrap(name, after=timed('parse_seconds', name))
+    for name in names('differ'):
+        wrap(name, after=timed('diff_seconds', name))
+    wrap('process', after=checked)
+    wrap('startup', after=started)
+    wrap('shutdown')
+
+    report_error = monitor.report_error
+
+    @functools.wraps(report_error)
+    def reported(error):
+        record_error(error, target)
+        token = _current_target.set(target)
+        try:
+            return report_error(error)
+        finally:
+            _current_target.reset(token)
+
+    monitor.report_error = reported
+    return monitor
@@ -1,3 +1,4 @@
+import logging
 import os
 import time
 import signal
@@ -6,41 +7,52 @@ from datetime import datetime
 
 from config import MONITOR_CONFIG, PROCESS_CONFIG, STATUS_MONITOR_CONFIG
 from status_monitor import StatusMonitor
-from honorMonitor import HonorMonitor
-from huaweiJZQ import WebMonitor
-from huaweiSM import VersionMonitor
-
-def run_honor_monitor(config):
-    """运行荣耀快应用监控"""
-    monitor = HonorMonitor(
-        config['debugger_webhook'],
-        config['engine_webhook'],
-        config['check_interval']
-    )
-    monitor.monitor()
-
-def run_huawei_loader_monitor(config):
-    """运行华为加载器监控"""
-    monitor = WebMonitor(
-        config['url'],
-        config['webhook'],
-        config['check_interval']
-    )
-    monitor.monitor()
-
-def run_huawei_version_monitor(config):
-    """运行华为版本监控"""
-    monitor = VersionMonitor(
-        config['url'],
-        config['webhook'],
-        config['check_interval']
-    )
-    monitor.monitor()
+from monitor_registry import expand_targets, create_monitor
+import process_runner
+from scheduler import spread_phase
+import notifier
+import metrics
+import log_setup
+import profiler
+
+logger = logging.getLogger(__name__)
+
+def reset_child_signals():
+    """子进程恢复默认的信号处理，避免继承管理器的处理函数；SIGUSR1 开始采样分析"""
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    profiler.install()
+
+def run_monitor(name, config, metrics_queue=None, log_queue=None):
+    """在独立进程中运行单个监控目标，指标和日志分别通过 metrics_queue、log_queue 发送给管理器"""
+    reset_child_signals()
+    metrics.bind_target(name)
+    log_setup.configure(log_queue)
+    metrics.attach(metrics_queue)
+    process_runner.run_monitor(name, create_monitor(config, name), config['check_interval'], phase=config.get('phase', 0))
+
+def run_async_engine(name, instances, metrics_queue=None, log_queue=None):
+    """在单个进程中以 asyncio 协程方式运行所有监控目标，name 为进程名，各目标按实例名记录"""
+    reset_child_signals()
+    from async_engine import AsyncMonitorEngine  # 只在 asyncio 模式的子进程中导入
+
+    log_setup.configure(log_queue)
+    metrics.attach(metrics_queue)
+    engine = AsyncMonitorEngine()
+    for target, config in instances.items():
+        engine.add_monitor(target, create_monitor(config, target), config['check_interval'])
+    engine.run()
 
 class MonitorManager:
     def __init__(self):
         self.processes = {}
+        self.process_targets = {}  # {name: (target_func, config)}，用于重启进程
         self.restart_counts = {}
+        self.metrics_queue = None  # 子进程发送指标的队列，启动指标接口后创建
+        self.log_queue = None  # 子进程发送日志的队列，由管理器统一写入日志文件
+        
+        # 按配置展开所有监控目标
+        self.instances = expand_targets(MONITOR_CONFIG)
         self.running = True
         
         # 初始化状态监控
@@ -49,92 +61,100 @@ class MonitorManager:
         # 设置信号处理
         signal.signal(signal.SIGINT, self.handle_signal)
         signal.signal(signal.SIGTERM, self.handle_signal)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self.handle_profile_signal)
 
     def handle_signal(self, signum, frame):
         """处理进程信号"""
-        print(f"收到信号 {signum}，准备停止所有监控...")
+        logger.info("收到信号 %s，准备停止所有监控...", signum)
         self.running = False
         self.stop_all()
 
+    def handle_profile_signal(self, signum, frame):
+        """把采样分析信号转发给所有监控进程"""
+        for process in list(self.processes.values()):
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
     def start_process(self, name, target_func, config):
         """启动单个监控进程"""
         if name in self.processes and self.processes[name].is_alive():
-            print(f"{name} 已经在运行")
+            logger.info("%s 已经在运行", name)
             return
 
         process = multiprocessing.Process(
             target=target_func,
-            args=(config,),
+            args=(name, config, self.metrics_queue, self.log_queue),
             name=name,
             daemon=True
         )
         process.start()
         self.processes[name] = process
-        self.restart_counts[name] = 0
-        print(f"{name} 启动成功 (PID: {process.pid})")
+        self.process_targets[name] = (target_func, config)
+        # 重启时保留已有的重启次数，否则重启次数限制不会生效
+        self.restart_counts.setdefault(name, 0)
+        metrics.set_gauge('restarts', name, self.restart_counts[name])
+        metrics.set_gauge('up', name, 1)
+        logger.info("%s 启动成功 (PID: %s)", name, process.pid)
 
     def start_all(self):
         """启动所有监控进程"""
-        print("开始启动所有监控进程...")
+        logger.info("开始启动所有监控进程...")
         
         # 发送启动通知
         if STATUS_MONITOR_CONFIG['startup_notify']:
             self.status_monitor.send_startup_notification()
         
-        # 启动荣耀快应用监控
-        self.start_process(
-            'honor',
-            run_honor_monitor,
-            MONITOR_CONFIG['honor']
-        )
-        
-        # 启动华为加载器监控
-        self.start_process(
-            'huawei_loader',
-            run_huawei_loader_monitor,
-            MONITOR_CONFIG['huawei_loader']
-        )
+        # asyncio 模式下所有监控在同一个进程中运行
+        if PROCESS_CONFIG.get('mode') == 'asyncio':
+            self.start_process(
+                'async_engine',
+                run_async_engine,
+                self.instances
+            )
+            return
         
-        # 启动华为版本监控
-        self.start_process(
-            'huawei_version',
-            run_huawei_version_monitor,
-            MONITOR_CONFIG['huawei_version']
-        )
+        # 每个监控目标启动一个进程，各目标的轮询相位在一个间隔内均匀错开
+        count = len(self.instances)
+        for index, (name, config) in enumerate(self.instances.items()):
+            phase = spread_phase(index, count, config['check_interval'])
+            self.start_process(name, run_monitor, dict(config, phase=phase))
 
     def stop_process(self, name):
         """停止单个监控进程"""
         if name in self.processes:
             process = self.processes[name]
             if process.is_alive():
-                print(f"正在停止 {name}...")
+                logger.info("正在停止 %s...", name)
                 process.terminate()
                 process.join(timeout=5)
                 if process.is_alive():
-                    print(f"{name} 未响应，强制终止")
+                    logger.warning("%s 未响应，强制终止", name)
                     process.kill()
             del self.processes[name]
-            print(f"{name} 已停止")
+            logger.info("%s 已停止", name)
 
     def stop_all(self):
         """停止所有监控进程"""
-        print("正在停止所有监控进程...")
+        logger.info("正在停止所有监控进程...")
         for name in list(self.processes.keys()):
             self.stop_process(name)
         
         # 发送停止通知
         if STATUS_MONITOR_CONFIG['shutdown_notify']:
             self.status_monitor.send_shutdown_notification()
+        notifier.flush()
         
-        print("所有监控进程已停止")
+        logger.info("所有监控进程已停止")
 
     def check_process_health(self):
         """检查进程健康状态"""
         try:
             for name, process in list(self.processes.items()):
+                metrics.set_gauge('up', name, int(process.is_alive()))
                 if not process.is_alive():
                     error_msg = f"{name} 已停止运行"
-                    print(error_msg)
+                    logger.error(error_msg)
                     
                     # 发送错误通知
                     if STATUS_MONITOR_CONFIG['error_notify']:
@@ -142,27 +162,20 @@ class MonitorManager:
                     
                     if PROCESS_CONFIG['restart_on_crash']:
                         if self.restart_counts[name] < PROCESS_CONFIG['max_restarts']:
-                            print(f"正在重启 {name}...")
+                            logger.info("正在重启 %s...", name)
                             time.sleep(PROCESS_CONFIG['restart_delay'])
                             self.restart_counts[name] += 1
                             
-                            # 根据进程名获取对应的运行函数和配置
-                            if name == 'honor':
-                                target_func = run_honor_monitor
-                                config = MONITOR_CONFIG['honor']
-                            elif name == 'huawei_loader':
-                                target_func = run_huawei_loader_monitor
-                                config = MONITOR_CONFIG['huawei_loader']
-                            elif name == 'huawei_version':
-                                target_func = run_huawei_version_monitor
-                                config = MONITOR_CONFIG['huawei_version']
-                            
+                            # 使用启动时记录的运行函数和配置重启
+                            target_func, config = self.process_targets[name]
                             self.start_process(name, target_func, config)
                         else:
                             error_msg = f"{name} 重启次数超过限制，不再重试"
-                            print(error_msg)
+                            logger.error(error_msg)
                             if STATUS_MONITOR_CONFIG['error_notify']:
                                 self.status_monitor.send_error_notification(error_msg)
+                            # 不再检查该进程，避免每次健康检查重复通知
+                            del self.processes[name]
             
             # 检查是否需要发送心跳
             if STATUS_MONITOR_CONFIG['heartbeat_notify'] and self.status_monitor.should_send_heartbeat():
@@ -170,17 +183,27 @@ class MonitorManager:
                 
         except Exception as e:
             error_msg = f"健康检查出错: {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             if STATUS_MONITOR_CONFIG['error_notify']:
                 self.status_monitor.send_error_notification(error_msg)
 
     def run(self):
         """运行监控管理器"""
+        self.log_queue = log_setup.start_listener()
+        
+        # 先启动发送线程，补发上次退出时未发送的通知
+        notifier.start()
+        try:
+            self.metrics_queue = metrics.start_server()
+        except OSError as e:
+            logger.error("指标接口启动失败: %s", e)
         self.start_all()
         
         while self.running:
             self.check_process_health()
             time.sleep(PROCESS_CONFIG['health_check_interval'])
+        
+        log_setup.stop_listener()
 
 if __name__ == "__main__":
     manager = MonitorManager()
@@ -0,0 +1,146 @@
+import importlib
+
+import metrics
+
+# 已注册的监控类型 {type_name: MonitorType}
+MONITOR_TYPES = {}
+
+
+class MonitorType:
+    """监控类型声明
+
+    factory 根据单个目标的配置创建监控实例；fetcher / parser / differ / formatter
+    为监控类上对应步骤的方法名（一个类型有多个同类步骤时为方法名元组），
+    供调度器、基准测试等工具按类型统一调用。
+    """
+
+    def __init__(self, name, factory, fetcher, parser, differ, formatter):
+        self.name = name
+        self.factory = factory
+        self.fetcher = fetcher
+        self.parser = parser
+        self.differ = differ
+        self.formatter = formatter
+
+    def create(self, config):
+        """根据目标配置创建监控实例"""
+        return self.factory(config)
+
+    def step(self, monitor, stage):
+        """获取监控实例上某个步骤的方法（fetcher / parser / differ / formatter）
+
+        声明为方法名元组时返回方法元组。
+        """
+        names = getattr(self, stage)
+        if isinstance(names, tuple):
+            return tuple(getattr(monitor, name) for name in names)
+        return getattr(monitor, names)
+
+
+def load_class(path):
+    """按 "模块名.类名" 导入监控类
+
+    监控模块（以及 bs4 等解析依赖）在第一次创建该类型的监控时才导入，
+    只负责管理子进程的管理器不需要加载这些模块。
+    """
+    module_name, _, class_name = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def register_monitor_type(name, factory, fetcher='fetch_html', parser='parse_html',
+                          differ='calculate_hash', formatter='format_change_message'):
+    """注册监控类型"""
+    if name in MONITOR_TYPES:
+        raise ValueError(f"监控类型已注册: {name}")
+    MONITOR_TYPES[name] = MonitorType(name, factory, fetcher, parser, differ, formatter)
+    return MONITOR_TYPES[name]
+
+
+def get_monitor_type(name):
+    """获取监控类型"""
+    if name not in MONITOR_TYPES:
+        raise ValueError(f"未知的监控类型: {name}")
+    return MONITOR_TYPES[name]
+
+
+def expand_targets(monitor_config):
+    """将 MONITOR_CONFIG 展开为 {实例名: 目标配置}
+
+    配置项中的 targets 列表会逐个与外层配置合并，实例名为 "配置名:目标 id"；
+    没有 targets 的配置项作为单个目标，实例名即配置名。
+    """
+    instances = {}
+    for key, config in monitor_config.items():
+        base = {k: v for k, v in config.items() if k != 'targets'}
+        base.setdefault('type', key)
+        get_monitor_type(base['type'])
+
+        targets = config.get('targets')
+        if not targets:
+            instances[key] = base
+            continue
+
+        for target in targets:
+            if 'id' not in target:
+                raise ValueError(f"{key} 的目标缺少 id 配置")
+            instance = dict(base)
+            instance.update(target)
+            instances[f"{key}:{target['id']}"] = instance
+
+    return instances
+
+
+def create_monitor(config, name=None):
+    """根据目标配置创建监控实例
+
+    指定实例名时按实例名记录指标和耗时，并在日志中标注该目标。
+    """
+    monitor_type = get_monitor_type(config['type'])
+    monitor = monitor_type.create(config)
+    if name:
+        metrics.instrument_monitor(monitor, monitor_type, name)
+    return monitor
+
+
+register_monitor_type(
+    'honor',
+    lambda config: load_class('honorMonitor.HonorMonitor')(
+        config['debugger_webhook'],
+        config['engine_webhook'],
+        config['check_interval']
+    ),
+    fetcher='fetch_html',
+    parser=('parse_debugger_info', 'parse_engine_info'),
+    differ='diff_content',
+    formatter=('format_debugger_message', 'format_engine_message')
+)
+
+register_monitor_type(
+    'huawei_loader',
+    lambda config: load_class('huaweiJZQ.WebMonitor')(
+        config['url'],
+        config['webhook'],
+        config['check_interval'],
+        object_id=config.get('object_id'),
+        catalog_name=config.get('catalog_name')
+    ),
+    fetcher='fetch_html',
+    parser='parse_html',
+    differ='calculate_hash',
+    formatter='format_change_message'
+)
+
+register_monitor_type(
+    'huawei_version',
+    lambda config: load_class('huaweiSM.VersionMonitor')(
+        config['url'],
+        config['webhook'],
+        config['check_interval'],
+        object_id=config.get('object_id'),
+        catalog_name=config.get('catalog_name')
+    ),
+    fetcher='fetch_html',
+    parser='parse_html',
+    differ='diff_versions',
+    formatter='_format_notification'
+)
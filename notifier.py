@@ -0,0 +1,251 @@
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+import instrument
+import metrics
+import sqlite_db
+from config import NOTIFY_CONFIG
+from process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _create_tables(connection):
+    """创建发件箱表"""
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS outbox ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "webhook_url TEXT NOT NULL, "
+        "payload TEXT NOT NULL, "
+        "status TEXT NOT NULL DEFAULT 'pending', "
+        "attempts INTEGER NOT NULL DEFAULT 0, "
+        "next_attempt_at REAL NOT NULL, "
+        "lease_until REAL NOT NULL DEFAULT 0, "
+        "last_error TEXT, "
+        "created_at REAL NOT NULL, "
+        "source TEXT)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, webhook_url, id)"
+    )
+
+
+# 自动提交模式，领取通知时手动开启事务
+_db = sqlite_db.Database(NOTIFY_CONFIG, _create_tables, isolation_level=None)
+
+
+class _Sender:
+    """当前进程的发送线程及其锁和唤醒事件"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.wakeup = threading.Event()
+        self.worker = None
+
+
+# 每个进程一个发送线程，fork 出的子进程不继承父进程发送线程持有的锁
+_sender = ProcessLocal(_Sender)
+
+
+def is_enabled():
+    """是否启用发件箱异步发送"""
+    return NOTIFY_CONFIG['enabled']
+
+
+def start():
+    """启动当前进程的发送线程，fork 出的子进程会重新启动"""
+    sender = _sender.get()
+    with sender.lock:
+        if sender.worker is not None and sender.worker.is_alive():
+            return
+        sender.worker = threading.Thread(target=_run_worker, name='notifier', daemon=True)
+        sender.worker.start()
+
+
+def enqueue(webhook_url, message, source=None):
+    """将渲染好的消息加入发件箱，由后台线程发送
+
+    source 为发出通知的监控目标，用于统计发送耗时，默认为当前正在执行的目标。
+    未启用发件箱时直接同步发送。
+    """
+    source = source or metrics.current_target()
+    with instrument.stage('serialize', source):
+        payload = json.dumps(message, ensure_ascii=False, separators=(',', ':'))
+    now = time.time()
+    if not is_enabled():
+        try:
+            _post(webhook_url, payload, source)
+            metrics.observe('notify_seconds', source, time.time() - now)
+            logger.info("通知发送成功")
+        except Exception as e:
+            metrics.inc('errors_total', source, type=type(e).__name__, stage='notify')
+            logger.error("发送通知失败: %s", e)
+        return
+
+    sender = _sender.get()
+    with sender.lock:
+        _db.connection().execute(
+            "INSERT INTO outbox (webhook_url, payload, next_attempt_at, created_at, source) VALUES (?, ?, ?, ?, ?)",
+            (webhook_url, payload, now, now, source)
+        )
+    start()
+    sender.wakeup.set()
+
+
+def pending_count(due_only=True):
+    """发件箱中待发送的通知数量，due_only 时不计算等待重试的通知"""
+    if not is_enabled():
+        return 0
+    with _sender.get().lock:
+        if due_only:
+            row = _db.connection().execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?",
+                (time.time(),)
+            ).fetchone()
+        else:
+            row = _db.connection().execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+    return row[0]
+
+
+def flush(timeout=None):
+    """等待发件箱中可以立即发送的通知发送完毕，用于退出前
+
+    等待重试的通知保留在发件箱中，下次启动后继续发送。
+    """
+    if not is_enabled():
+        return True
+    if timeout is None:
+        timeout = NOTIFY_CONFIG['flush_timeout']
+
+    start()
+    deadline = time.time() + timeout
+    while True:
+        try:
+            if pending_count() == 0:
+                return True
+        except Exception as e:
+            logger.error("读取通知队列失败: %s", e)
+            return False
+        if time.time() >= deadline:
+            logger.warning("等待通知发送超时，未发送的通知将在下次启动后继续发送")
+            return False
+        _sender.get().wakeup.set()
+        time.sleep(0.2)
+
+
+def _post(webhook_url, payload, source=None):
+    """发送一条通知，失败时抛出异常，source 为发出通知的监控目标"""
+    with instrument.stage('webhook_post', source):
+        response = http_client.post(
+            webhook_url,
+            data=payload.encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            timeout=NOTIFY_CONFIG['timeout']
+        )
+    response.raise_for_status()
+
+    # 飞书限流等错误返回 200，错误码在响应内容中
+    try:
+        result = response.json()
+    except ValueError:
+        return
+    if isinstance(result, dict) and result.get('code', 0) != 0:
+        raise ValueError(f"飞书返回错误: {result.get('code')} {result.get('msg')}")
+
+
+def _claim(limit):
+    """领取一批可以发送的通知
+
+    每个 webhook 只领取最早的一条，保证同一个群收到的通知顺序不变；
+    领取的通知在租约时间内不会被其他进程重复发送。
+    """
+    now = time.time()
+    with _sender.get().lock:
+        connection = _db.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT id, webhook_url, payload, attempts, created_at, source FROM outbox "
+                "WHERE id IN (SELECT MIN(id) FROM outbox WHERE status = 'pending' GROUP BY webhook_url) "
+                "AND next_attempt_at <= ? AND lease_until <= ? "
+                "ORDER BY id LIMIT ?",
+                (now, now, limit)
+            ).fetchall()
+            connection.executemany(
+                "UPDATE outbox SET lease_until = ? WHERE id = ?",
+                [(now + NOTIFY_CONFIG['lease'], row[0]) for row in rows]
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+    return rows
+
+
+def _complete(row_id):
+    """删除已发送的通知"""
+    with _sender.get().lock:
+        _db.connection().execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+
+
+def _retry(row_id, attempts, error):
+    """记录发送失败，按指数退避安排重试，超过次数后标记为失败"""
+    if attempts >= NOTIFY_CONFIG['max_attempts']:
+        logger.error("通知发送失败 %s 次，不再重试: %s", attempts, error)
+        with _sender.get().lock:
+            _db.connection().execute(
+                "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                (attempts, str(error), row_id)
+            )
+        return
+
+    delay = min(NOTIFY_CONFIG['backoff_max'], NOTIFY_CONFIG['backoff_base'] * 2 ** (attempts - 1))
+    delay *= random.uniform(0.8, 1.2)
+    logger.warning("发送通知失败: %s，%.0f秒后重试", error, delay)
+    with _sender.get().lock:
+        _db.connection().execute(
+            "UPDATE outbox SET attempts = ?, next_attempt_at = ?, lease_until = 0, last_error = ? WHERE id = ?",
+            (attempts, time.time() + delay, str(error), row_id)
+        )
+
+
+def _run_worker():
+    """发送线程：循环领取通知并通过连接池并发发送"""
+    max_concurrency = NOTIFY_CONFIG['max_concurrency']
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='notifier')
+    wakeup = _sender.get().wakeup
+    while True:
+        wakeup.clear()
+        try:
+            rows = _claim(max_concurrency)
+        except Exception as e:
+            logger.error("读取通知队列失败: %s", e)
+            rows = []
+
+        if not rows:
+            wakeup.wait(NOTIFY_CONFIG['poll_interval'])
+            continue
+
+        futures = [
+            (executor.submit(_post, webhook_url, payload, source), row_id, attempts, created_at, source)
+            for row_id, webhook_url, payload, attempts, created_at, source in rows
+        ]
+        for future, row_id, attempts, created_at, source in futures:
+            error = future.exception()
+            try:
+                if error is None:
+                    _complete(row_id)
+                    metrics.observe('notify_seconds', source, time.time() - created_at)
+                    logger.info("通知发送成功")
+                else:
+                    metrics.inc('errors_total', source, type=type(error).__name__, stage='notify')
+                    _retry(row_id, attempts + 1, error)
+            except Exception as e:
+                logger.error("更新通知队列失败: %s", e)
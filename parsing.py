@@ -0,0 +1,159 @@
+from bisect import bisect_left
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, Tag
+
+import instrument
+import memory
+from config import PARSER_CONFIG
+
+try:
+    import lxml  # noqa: F401
+    _lxml_available = True
+except ImportError:
+    _lxml_available = False
+
+
+def get_backend():
+    """当前使用的解析器，配置为 lxml 但未安装时回退到 html.parser"""
+    backend = PARSER_CONFIG['backend']
+    if backend == 'lxml' and not _lxml_available:
+        return 'html.parser'
+    return backend
+
+
+def make_soup(html_content, parse_only=None):
+    """构建 BeautifulSoup 文档树
+
+    parse_only 为 SoupStrainer 时只构建匹配的元素及其子树，
+    其余内容在解析时直接丢弃，不占用构建时间和内存。
+    在检查中创建的文档树会登记到当前的内存周期，检查结束时拆除。
+    """
+    with instrument.stage('soup'):
+        return memory.track(BeautifulSoup(html_content, get_backend(), parse_only=parse_only))
+
+
+class TextIndex:
+    """文档树的线性文本索引
+
+    对容器做一次深度优先遍历，把所有可见文本（与 get_text(strip=True) 的规则一致）
+    依次拼接成一个字符串，并记录每个后代节点的文本在其中的 [start, end) 区间。
+    任意节点的 get_text(strip=True) 都等于拼接串的一个切片，
+    不必再为每个节点重新序列化整棵子树。
+    """
+
+    def __init__(self, container):
+        self.spans = []  # [(element, start, end)]，按 descendants 的先序顺序
+        self._direct_texts = {}  # 文本规则特殊的节点（script / style 等）直接取文本
+        pieces = []
+        offset = 0
+        open_tags = []  # [(children 迭代器, 在 spans 中的位置)]
+
+        open_tags.append((iter(container.contents), None))
+        while open_tags:
+            children, span_index = open_tags[-1]
+            child = next(children, None)
+            if child is None:
+                open_tags.pop()
+                if span_index is not None:
+                    element, start, _ = self.spans[span_index]
+                    self.spans[span_index] = (element, start, offset)
+                continue
+
+            if isinstance(child, NavigableString):
+                start = offset
+                if type(child) in Tag.DEFAULT_INTERESTING_STRING_TYPES:
+                    text = child.strip()
+                    if text:
+                        pieces.append(text)
+                        offset += len(text)
+                self.spans.append((child, start, offset))
+            else:
+                if child.interesting_string_types != Tag.DEFAULT_INTERESTING_STRING_TYPES:
+                    self._direct_texts[len(self.spans)] = child.get_text(strip=True)
+                self.spans.append((child, offset, None))
+                open_tags.append((iter(child.contents), len(self.spans) - 1))
+
+        self.text = ''.join(pieces)
+
+    def __iter__(self):
+        """按先序顺序遍历 (节点, 文本区间)，与 descendants 的顺序一致"""
+        for index, (element, start, end) in enumerate(self.spans):
+            if index in self._direct_texts:
+                yield element, TextSpan(self._direct_texts[index], 0, len(self._direct_texts[index]))
+            else:
+                yield element, TextSpan(self.text, start, end)
+
+    def find_all(self, needles):
+        """预先定位一组子串在拼接文本中的所有出现位置"""
+        return Occurrences(self.text, needles)
+
+
+class TextSpan:
+    """拼接文本中的一个区间，按需才生成字符串"""
+
+    __slots__ = ('source', 'start', 'end')
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __str__(self):
+        return self.source[self.start:self.end]
+
+    def equals(self, value):
+        """区间文本是否等于 value"""
+        return len(self) == len(value) and self.source.startswith(value, self.start)
+
+    def startswith(self, prefix):
+        """区间文本是否以 prefix 开头"""
+        return self.source.startswith(prefix, self.start, self.end)
+
+
+class Occurrences:
+    """一组子串在文本中的出现位置，支持 O(log n) 判断某个区间是否包含其中任意一个"""
+
+    def __init__(self, text, needles):
+        self.source = text
+        self.needles = set(needles)
+        self.matches_empty = '' in self.needles
+        # 按首字符和长度分组，每个首字符只扫描一遍文本，
+        # 总耗时与文本长度成正比，不随子串数量增长
+        groups = {}  # {首字符: {长度: set(子串)}}
+        for needle in self.needles:
+            if needle:
+                groups.setdefault(needle[0], {}).setdefault(len(needle), set()).add(needle)
+
+        found = []
+        for first_char, by_length in groups.items():
+            position = text.find(first_char)
+            while position != -1:
+                for length, candidates in by_length.items():
+                    if text[position:position + length] in candidates:
+                        found.append((position, position + length))
+                position = text.find(first_char, position + 1)
+        found.sort()
+
+        self.starts = [start for start, _ in found]
+        # suffix_min_end[i] 为第 i 个及之后的出现位置中最小的结束位置
+        self.suffix_min_end = [0] * len(found)
+        min_end = None
+        for i in range(len(found) - 1, -1, -1):
+            end = found[i][1]
+            min_end = end if min_end is None else min(min_end, end)
+            self.suffix_min_end[i] = min_end
+
+    def within(self, span):
+        """区间内是否包含任意一个子串"""
+        if self.matches_empty:
+            return True
+        if span.source is not self.source:
+            # 特殊节点的文本不在拼接串中，直接查找
+            text = str(span)
+            return any(needle in text for needle in self.needles)
+        index = bisect_left(self.starts, span.start)
+        return index < len(self.starts) and self.suffix_min_end[index] <= span.end
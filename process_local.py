@@ -0,0 +1,41 @@
+import os
+import threading
+
+# 创建各进程对象时使用的锁
+_lock = threading.Lock()
+
+
+def _reset_lock():
+    """子进程重新创建锁，fork 时其他线程可能正持有父进程的锁"""
+    global _lock
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_lock)
+
+
+class ProcessLocal:
+    """每个进程各自持有一份的对象（连接、线程池、锁等），fork 后的子进程第一次使用时重新创建"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._value = None
+        self._pid = None
+
+    def get(self):
+        """当前进程的对象"""
+        pid = os.getpid()
+        if self._pid != pid:
+            with _lock:
+                if self._pid != pid:
+                    self._value = self.factory()
+                    self._pid = pid
+        return self._value
+
+    def pop(self):
+        """取出当前进程已创建的对象，下次使用时重新创建；没有时返回 None"""
+        with _lock:
+            value = self._value if self._pid == os.getpid() else None
+            self._value = None
+            self._pid = None
+        return value
@@ -0,0 +1,71 @@
+import logging
+import time
+
+import instrument
+import memory
+import notifier
+import profiler
+from scheduler import Ticker
+
+logger = logging.getLogger(__name__)
+
+
+def _start(name, monitor, retry_interval):
+    """优先从状态存储恢复，否则获取初始内容并发送启动通知，失败时等待后重试"""
+    if monitor.restore_state():
+        logger.info("%s 已从状态存储恢复", name)
+        return
+
+    while True:
+        try:
+            with instrument.check(name), memory.cycle(name):
+                monitor.startup(monitor.fetch_html())
+            logger.info("%s 启动成功", name)
+            return
+        except Exception as e:
+            logger.error("%s 启动失败: %s", name, e)
+            logger.info("%s秒后重试...", retry_interval)
+            time.sleep(retry_interval)
+
+
+def run_monitor(name, monitor, interval, retry_interval=60, phase=0):
+    """在当前进程中阻塞运行单个监控，直到收到退出信号
+
+    监控需要提供与 AsyncMonitorEngine 相同的 restore_state / fetch_html / startup / process /
+    report_error / shutdown 方法。phase 为轮询相位（秒），用于与其他目标错开请求时间。
+    """
+    logger.info("开始运行 %s 监控...", name)
+    try:
+        _start(name, monitor, retry_interval)
+        # 监控提供 schedule（AdaptiveSchedule）时按其计算的间隔轮询，否则使用固定间隔
+        schedule = getattr(monitor, 'schedule', None)
+
+        ticker = Ticker(phase)
+        delay = schedule.next_interval() if schedule else interval
+        while True:
+            logger.info("等待 %.0f 秒后进行下一次检查...", delay)
+            ticker.sleep(delay)
+            try:
+                logger.info("[%s] 开始新一轮检查...", name)
+                with instrument.check(name), memory.cycle(name):
+                    changed = monitor.process(monitor.fetch_html(conditional=True))
+                profiler.cycle_done()
+                if schedule:
+                    schedule.record(changed)
+                    delay = schedule.next_interval()
+                else:
+                    delay = interval
+            except Exception as e:
+                monitor.report_error(e)
+                if schedule:
+                    schedule.record_error()
+                    delay = schedule.next_interval()
+                else:
+                    delay = retry_interval
+                logger.info("[%s] %.0f秒后重试...", name, delay)
+
+    except KeyboardInterrupt:
+        logger.info("收到退出信号，正在停止监控...")
+        monitor.shutdown()
+        # 等待停止通知发出后再退出
+        notifier.flush()
@@ -0,0 +1,152 @@
+import collections
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+
+from config import PROFILE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_profiler = None  # 正在运行的采样分析
+
+
+class SamplingProfiler:
+    """按固定间隔采样进程内所有线程的调用栈
+
+    采样在独立线程中进行，被采样的代码不需要任何修改；结果按调用栈汇总，
+    输出 collapsed stack 格式（每行 "线程;帧;帧;... 次数"），可以直接用
+    flamegraph.pl 或 speedscope 生成火焰图。统计的是墙钟时间，等待网络和休眠的线程也会出现在结果中。
+    """
+
+    def __init__(self, cycles, interval, max_seconds):
+        self.cycles = cycles
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.counts = collections.Counter()  # {折叠后的调用栈: 采样次数}
+        self.frame_names = {}  # {(code, 行号): 帧名}，同一位置只格式化一次
+        self.completed = 0
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self):
+        """开始采样"""
+        self.thread.start()
+
+    def stop(self):
+        """停止采样并等待采样线程结束"""
+        self.stopped.set()
+        if threading.current_thread() is not self.thread:
+            self.thread.join()
+
+    def _frame_name(self, frame):
+        """帧名，格式为 "函数名 (文件名:行号)" """
+        key = (frame.f_code, frame.f_lineno)
+        name = self.frame_names.get(key)
+        if name is None:
+            code = frame.f_code
+            name = self.frame_names[key] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        return name
+
+    def _sample(self, own_ident):
+        """记录一次所有线程的调用栈"""
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            stack.append(thread_names.get(ident, str(ident)))
+            self.counts[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        """采样线程：采样到停止或超过最长时间"""
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + self.max_seconds
+        while not self.stopped.wait(self.interval):
+            self._sample(own_ident)
+            if time.monotonic() >= deadline:
+                logger.warning("采样超过 %s 秒，提前结束", self.max_seconds)
+                _finish(self)
+                return
+
+    def write(self, path):
+        """按采样次数从多到少写入 collapsed stack 文件"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _output_path():
+    """输出文件路径，文件名包含进程名、进程号和开始时间"""
+    name = multiprocessing.current_process().name.replace(os.sep, '_').replace(':', '_')
+    timestamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(PROFILE_CONFIG['path'], f"{name}-{os.getpid()}-{timestamp}.collapsed")
+
+
+def _finish(profiler):
+    """结束采样并写入结果，同一次采样只写入一次"""
+    global _profiler
+    with _lock:
+        if _profiler is not profiler:
+            return
+        _profiler = None
+    profiler.stop()
+    path = _output_path()
+    try:
+        profiler.write(path)
+        logger.info("采样分析完成: %s 次检查，%s 次采样，已写入 %s", profiler.completed, profiler.samples, path)
+    except OSError as e:
+        logger.error("写入采样结果失败: %s", e)
+
+
+def start(cycles=None):
+    """开始采样，在之后的 cycles 次检查完成后写入结果；已经在采样时不重复开始"""
+    global _profiler
+    with _lock:
+        if _profiler is not None:
+            logger.info("采样分析已在进行中")
+            return False
+        profiler = _profiler = SamplingProfiler(
+            cycles or PROFILE_CONFIG['cycles'],
+            PROFILE_CONFIG['interval'],
+            PROFILE_CONFIG['max_seconds']
+        )
+        profiler.start()
+    logger.info("开始采样分析，持续 %s 次检查", profiler.cycles)
+    return True
+
+
+def cycle_done():
+    """一次检查完成，达到设定的次数后结束采样"""
+    profiler = _profiler
+    if profiler is None:
+        return
+    profiler.completed += 1
+    if profiler.completed >= profiler.cycles:
+        _finish(profiler)
+
+
+def _handle_signal(signum, frame):
+    """收到 SIGUSR1 时开始采样
+
+    信号处理函数可能打断正在持有锁或写日志的主线程，在新线程中开始采样，避免死锁。
+    """
+    threading.Thread(target=start, name='profiler-start', daemon=True).start()
+
+
+def install():
+    """注册 SIGUSR1 的处理函数，不支持该信号的平台上不做任何事"""
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, _handle_signal)
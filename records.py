@@ -0,0 +1,177 @@
+import hashlib
+import json
+from operator import attrgetter
+
+from version import parse as parse_version
+
+
+class Record:
+    """不可变的解析结果记录
+
+    子类在 FIELDS 中按顺序声明 (属性名, 字典键, 类型)，字典键用于归档和逐字段比较；
+    VERSION_FIELDS 为参与版本比较的字段。哈希和版本键在创建时计算一次。
+    """
+
+    __slots__ = ('_hash', '_key', '_digest')
+
+    FIELDS = ()
+    VERSION_FIELDS = ('version',)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = [name for name, _, _ in cls.FIELDS]
+        # 一次取出全部字段值（C 实现），比较和计算哈希时不再逐个 getattr
+        cls._values = staticmethod(attrgetter(*names) if len(names) > 1 else lambda record: (getattr(record, names[0]),))
+
+    def __init__(self, **values):
+        for name, key, kind in self.FIELDS:
+            value = values.get(name)
+            if kind is tuple:
+                value = tuple(value or ())
+            elif kind is dict:
+                value = tuple(value.items()) if isinstance(value, dict) else tuple(map(tuple, value or ()))
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_hash', hash((type(self).__name__,) + self.values()))
+        object.__setattr__(self, '_key', tuple(parse_version(getattr(self, name)) for name in self.VERSION_FIELDS))
+        object.__setattr__(self, '_digest', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} 不可修改")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} 不可修改")
+
+    def values(self):
+        """按 FIELDS 顺序排列的字段值"""
+        return self._values(self)
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._hash == other._hash and self._values(self) == other._values(other)
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name, _, _ in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        return (type(self).load, (self.dump(),))
+
+    @classmethod
+    def label(cls, name):
+        """字段的字典键（原来解析结果中的名称）"""
+        for field, key, _ in cls.FIELDS:
+            if field == name:
+                return key
+        raise KeyError(name)
+
+    @property
+    def key(self):
+        """版本元组（Version），按 VERSION_FIELDS 的顺序"""
+        return self._key
+
+    @property
+    def digest(self):
+        """紧凑序列化后的 md5"""
+        if self._digest is None:
+            data = json.dumps(self.dump(), ensure_ascii=False, separators=(',', ':'))
+            object.__setattr__(self, '_digest', hashlib.md5(data.encode('utf-8')).hexdigest())
+        return self._digest
+
+    def dump(self):
+        """紧凑序列化：按 FIELDS 顺序排列的字段值列表，可直接 JSON 序列化"""
+        data = []
+        for name, _, kind in self.FIELDS:
+            value = getattr(self, name)
+            if kind is tuple:
+                value = list(value)
+            elif kind is dict:
+                value = [list(pair) for pair in value]
+            data.append(value)
+        return data
+
+    def to_dict(self):
+        """转为原来的解析结果字典，用于归档和逐字段比较"""
+        data = {}
+        for name, key, kind in self.FIELDS:
+            value = getattr(self, name)
+            if kind is tuple:
+                value = list(value)
+            elif kind is dict:
+                value = dict(value)
+            data[key] = value
+        return data
+
+    @classmethod
+    def load(cls, data):
+        """从 dump() 的列表恢复记录"""
+        return cls(**{name: value for (name, _, _), value in zip(cls.FIELDS, data)})
+
+
+class DebuggerInfo(Record):
+    """荣耀调试器下载表格中的最新一行"""
+
+    __slots__ = ('engine_version', 'honor_engine_version', 'alliance_version',
+                 'download_url', 'version', 'features')
+
+    FIELDS = (
+        ('engine_version', '快应用引擎版本号', str),
+        ('honor_engine_version', '荣耀引擎版本号', str),
+        ('alliance_version', '快应用联盟平台版本号', str),
+        ('download_url', '下载地址', str),
+        ('version', '调试器版本号', str),
+        ('features', '功能', tuple)
+    )
+    # 依次比较调试器版本号和引擎版本号
+    VERSION_FIELDS = ('version', 'engine_version')
+
+
+class EngineRelease(Record):
+    """荣耀快应用引擎的最新版本更新日志"""
+
+    __slots__ = ('version', 'release_date', 'download_url', 'engine_versions', 'features')
+
+    FIELDS = (
+        ('version', '版本号', str),
+        ('release_date', '上线时间', str),
+        ('download_url', '下载地址', str),
+        ('engine_versions', '引擎版本', dict),
+        ('features', '功能', tuple)
+    )
+
+    def engine_version(self, platform, default=''):
+        """某个平台的引擎版本"""
+        for name, value in self.engine_versions:
+            if name == platform:
+                return value
+        return default
+
+
+class LoaderBuild(Record):
+    """华为手机加载器的一个版本"""
+
+    __slots__ = ('text', 'url', 'version', 'spec')
+
+    FIELDS = (
+        ('text', 'text', str),
+        ('url', 'url', str),
+        ('version', 'version', str),
+        ('spec', 'spec', str)
+    )
+
+
+class VersionNote(Record):
+    """华为快应用版本说明中的一个版本"""
+
+    __slots__ = ('version', 'updates', 'date')
+
+    FIELDS = (
+        ('version', 'version', str),
+        ('updates', 'updates', tuple),
+        ('date', 'date', str)
+    )
@@ -0,0 +1,173 @@
+import heapq
+import itertools
+import math
+import random
+import time
+from datetime import datetime
+
+import state_store
+from config import SCHEDULE_CONFIG
+
+HOURS_PER_WEEK = 7 * 24
+
+
+def _hour_of_week(timestamp):
+    """时间戳在一周中的小时序号（周一 0 点为 0）"""
+    moment = datetime.fromtimestamp(timestamp)
+    return moment.weekday() * 24 + moment.hour
+
+
+def _week_distance(a, b):
+    """两个周内小时序号之间的距离，跨周首尾连续计算"""
+    distance = abs(a - b) % HOURS_PER_WEEK
+    return min(distance, HOURS_PER_WEEK - distance)
+
+
+class AdaptiveSchedule:
+    """根据历史变化调整单个监控目标的轮询间隔
+
+    记录每次检测到变化的时间，按"周几 + 小时"统计变化频率：历史上经常更新的
+    时间段缩短间隔，很少更新的时间段以及长时间没有变化时延长间隔，结果限制在
+    SCHEDULE_CONFIG 的 min_interval 和 max_interval 之间。连续出错时重试间隔按指数退避。
+    """
+
+    def __init__(self, monitor, target, base_interval, retry_interval=60):
+        self.monitor = monitor
+        self.target = target
+        self.base_interval = base_interval
+        self.retry_interval = retry_interval
+        self.changes = None  # 历史变化时间（从早到晚），首次使用时从状态存储读取
+        self.errors = 0
+
+    def _history(self):
+        """获取历史变化时间"""
+        if self.changes is None:
+            self.changes = state_store.load_changes(
+                self.monitor, self.target, SCHEDULE_CONFIG['history_size']
+            )
+        return self.changes
+
+    def record(self, changed, now=None):
+        """记录一次成功的检查，changed 表示检测到了更新"""
+        self.errors = 0
+        if not changed:
+            return
+
+        now = time.time() if now is None else now
+        history = self._history()
+        history.append(now)
+        del history[:-SCHEDULE_CONFIG['history_size']]
+        state_store.record_change(self.monitor, self.target, now)
+
+    def record_error(self):
+        """记录一次失败的检查"""
+        self.errors += 1
+
+    def next_interval(self, now=None):
+        """下一次检查前等待的秒数"""
+        min_interval = SCHEDULE_CONFIG['min_interval']
+        max_interval = SCHEDULE_CONFIG['max_interval']
+
+        if self.errors:
+            return min(max_interval, self.retry_interval * 2 ** (self.errors - 1))
+
+        if not SCHEDULE_CONFIG['adaptive']:
+            return self.base_interval
+
+        history = self._history()
+        if len(history) < SCHEDULE_CONFIG['min_changes']:
+            return self.base_interval
+
+        now = time.time() if now is None else now
+
+        # 当前时间段前后 window_hours 内的历史变化次数，与均匀分布时的期望次数相比
+        window = SCHEDULE_CONFIG['window_hours']
+        current = _hour_of_week(now)
+        nearby = sum(
+            1 for changed_at in history
+            if _week_distance(_hour_of_week(changed_at), current) <= window
+        )
+        expected = len(history) * (2 * window + 1) / HOURS_PER_WEEK
+        ratio = (nearby + 1) / (expected + 1)
+
+        # 请求总数一定时，间隔与变化频率的平方根成反比可以使平均发现延迟最小
+        interval = self.base_interval / math.sqrt(ratio)
+
+        # 距上次变化已超过平均变化间隔时逐步放慢
+        mean_gap = (history[-1] - history[0]) / (len(history) - 1)
+        quiet = now - history[-1]
+        if mean_gap > 0 and quiet > mean_gap:
+            interval *= math.sqrt(quiet / mean_gap)
+
+        return max(min_interval, min(max_interval, interval))
+
+
+def spread_phase(index, count, interval):
+    """第 index 个目标（共 count 个）的轮询相位，使各目标均匀分布在一个间隔内"""
+    if not SCHEDULE_CONFIG['spread'] or count <= 1:
+        return 0
+    return interval * index / count
+
+
+class Ticker:
+    """按绝对截止时间安排单个目标的检查
+
+    下一次检查的计划时间以上一次的计划时间为基准推进，检查本身的耗时不会累积到
+    周期中；实际触发时间在计划时间前后按 SCHEDULE_CONFIG['jitter'] 随机抖动，
+    避免同时启动的目标一直在同一时刻请求。
+    """
+
+    def __init__(self, phase=0, now=None):
+        now = time.time() if now is None else now
+        self.nominal = now + phase
+
+    def next_deadline(self, interval, now=None):
+        """推进到下一次计划时间，返回加上抖动后的触发时间"""
+        now = time.time() if now is None else now
+        self.nominal += interval
+        if self.nominal < now:
+            # 检查耗时超过间隔时不补做错过的检查，从当前时间重新计时
+            self.nominal = now
+        jitter = SCHEDULE_CONFIG['jitter']
+        return self.nominal + random.uniform(-jitter, jitter) * interval
+
+    def sleep(self, interval):
+        """等待到下一次检查的触发时间"""
+        delay = self.next_deadline(interval) - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TickScheduler:
+    """多个目标共用的定时器
+
+    各目标的触发时间保存在最小堆中，调用方等待到堆顶的截止时间后取出所有到期目标，
+    检查完成后再按新的间隔重新加入。
+    """
+
+    def __init__(self):
+        self.tickers = {}
+        self.heap = []  # [(触发时间, 序号, 目标)]
+        self.counter = itertools.count()
+
+    def add(self, key, interval, phase=0, now=None):
+        """加入一个目标，第一次在 phase + interval 秒后触发"""
+        self.tickers[key] = Ticker(phase, now)
+        self.reschedule(key, interval, now)
+
+    def reschedule(self, key, interval, now=None):
+        """按新的间隔安排目标的下一次触发"""
+        deadline = self.tickers[key].next_deadline(interval, now)
+        heapq.heappush(self.heap, (deadline, next(self.counter), key))
+
+    def next_deadline(self):
+        """最近的触发时间，没有目标时返回 None"""
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now=None):
+        """取出所有已到期的目标"""
+        now = time.time() if now is None else now
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap)[2])
+        return due
@@ -0,0 +1,37 @@
+import os
+import sqlite3
+
+from process_local import ProcessLocal
+
+
+class Database:
+    """每个进程持有一个连接的 SQLite 数据库
+
+    config 为包含 path 的配置字典，第一次使用时才读取路径；setup(connection) 负责建表，
+    options 为传给 sqlite3.connect 的其他参数。
+    """
+
+    def __init__(self, config, setup, **options):
+        self.config = config
+        self.setup = setup
+        self.options = options
+        self._connection = ProcessLocal(self._connect)
+
+    def _connect(self):
+        """打开数据库并建表"""
+        path = self.config['path']
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(path, timeout=10, check_same_thread=False, **self.options)
+        # WAL 模式下多个监控进程可以同时读写
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        self.setup(connection)
+        connection.commit()
+        return connection
+
+    def connection(self):
+        """获取当前进程的数据库连接"""
+        return self._connection.get()
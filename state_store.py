@@ -0,0 +1,120 @@
+import json
+import logging
+import threading
+import time
+
+import sqlite_db
+from config import STATE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+def _create_tables(connection):
+    """创建状态表和变化历史表"""
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS monitor_state ("
+        "monitor TEXT NOT NULL, "
+        "target TEXT NOT NULL, "
+        "fingerprint TEXT, "
+        "content TEXT, "
+        "updated_at REAL NOT NULL, "
+        "PRIMARY KEY (monitor, target))"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS change_history ("
+        "monitor TEXT NOT NULL, "
+        "target TEXT NOT NULL, "
+        "changed_at REAL NOT NULL)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS change_history_target ON change_history (monitor, target, changed_at)"
+    )
+
+
+# 每个进程持有一个数据库连接
+_db = sqlite_db.Database(STATE_CONFIG, _create_tables)
+
+
+def is_enabled():
+    """是否启用状态持久化"""
+    return STATE_CONFIG['enabled']
+
+
+def load(monitor, target):
+    """读取监控目标的状态
+
+    返回 {'fingerprint': ..., 'content': ..., 'updated_at': ...}，没有记录时返回 None。
+    """
+    if not is_enabled():
+        return None
+    try:
+        with _lock:
+            row = _db.connection().execute(
+                "SELECT fingerprint, content, updated_at FROM monitor_state WHERE monitor = ? AND target = ?",
+                (monitor, target)
+            ).fetchone()
+    except Exception as e:
+        logger.error("读取监控状态失败: %s", e)
+        return None
+
+    if row is None:
+        return None
+    fingerprint, content, updated_at = row
+    return {
+        'fingerprint': fingerprint,
+        'content': json.loads(content) if content else None,
+        'updated_at': updated_at
+    }
+
+
+def save(monitor, target, fingerprint, content):
+    """保存监控目标的最新指纹和解析结果"""
+    if not is_enabled():
+        return
+    try:
+        data = json.dumps(content, ensure_ascii=False, separators=(',', ':'))
+        with _lock:
+            connection = _db.connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO monitor_state (monitor, target, fingerprint, content, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (monitor, target, fingerprint, data, time.time())
+            )
+            connection.commit()
+    except Exception as e:
+        logger.error("保存监控状态失败: %s", e)
+
+
+def load_changes(monitor, target, limit):
+    """读取监控目标最近 limit 次检测到更新的时间，按时间从早到晚排列"""
+    if not is_enabled():
+        return []
+    try:
+        with _lock:
+            rows = _db.connection().execute(
+                "SELECT changed_at FROM change_history WHERE monitor = ? AND target = ? "
+                "ORDER BY changed_at DESC LIMIT ?",
+                (monitor, target, limit)
+            ).fetchall()
+    except Exception as e:
+        logger.error("读取变化记录失败: %s", e)
+        return []
+    return [row[0] for row in reversed(rows)]
+
+
+def record_change(monitor, target, changed_at):
+    """记录监控目标检测到更新的时间"""
+    if not is_enabled():
+        return
+    try:
+        with _lock:
+            connection = _db.connection()
+            connection.execute(
+                "INSERT INTO change_history (monitor, target, changed_at) VALUES (?, ?, ?)",
+                (monitor, target, changed_at)
+            )
+            connection.commit()
+    except Exception as e:
+        logger.error("保存变化记录失败: %s", e)
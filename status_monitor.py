@@ -1,7 +1,11 @@
+import logging
 import time
-import requests
 from datetime import datetime, timedelta
 
+import notifier
+
+logger = logging.getLogger(__name__)
+
 class StatusMonitor:
     def __init__(self, webhook_url):
         self.webhook_url = webhook_url
@@ -11,11 +15,9 @@ class StatusMonitor:
     def send_notification(self, message):
         """发送通知到飞书"""
         try:
-            response = requests.post(self.webhook_url, json=message)
-            response.raise_for_status()
-            print("状态通知发送成功")
+            notifier.enqueue(self.webhook_url, message)
         except Exception as e:
-            print(f"状态通知发送失败: {str(e)}")
+            logger.error("状态通知发送失败: %s", e)
     
     def send_startup_notification(self):
         """发送服务启动通知"""
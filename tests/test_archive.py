@@ -0,0 +1,59 @@
+import pytest
+
+import archive
+import sqlite_db
+from config import ARCHIVE_CONFIG
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """使用临时归档数据库"""
+    db = sqlite_db.Database({'path': str(tmp_path / 'archive.db')}, archive._create_tables)
+    monkeypatch.setattr(archive, '_db', db)
+    monkeypatch.setitem(ARCHIVE_CONFIG, 'enabled', True)
+    return db
+
+
+def _count(db, table):
+    return db.connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_unchanged_document_is_not_archived_again(db):
+    archive.record('m', 't', '<p>a</p>', {'v': 1}, captured_at=1)
+    archive.record('m', 't', '<p>a</p>', {'v': 1}, captured_at=2)
+    assert [s['captured_at'] for s in archive.snapshots('m', 't')] == [1]
+
+
+def test_reappearing_document_reuses_stored_blob(db):
+    archive.record('m', 't', '<p>a</p>', {'v': 1}, captured_at=1)
+    archive.record('m', 't', '<p>b</p>', {'v': 2}, captured_at=2)
+    archive.record('m', 't', '<p>a</p>', {'v': 1}, captured_at=3)
+    assert len(archive.snapshots('m', 't')) == 3
+    assert _count(db, 'blobs') == 2
+    assert _count(db, 'contents') == 2
+
+
+def test_monitors_sharing_a_document_keep_their_own_results(db):
+    archive.record('loader', 'doc', '<p>a</p>', {'loader': 1}, captured_at=1)
+    archive.record('notes', 'doc', '<p>a</p>', {'notes': 2}, captured_at=1)
+    assert _count(db, 'blobs') == 1
+    assert archive.load(archive.snapshots('loader')[0]['id'])['content'] == {'loader': 1}
+    notes = archive.load(archive.snapshots('notes')[0]['id'], raw=True)
+    assert notes['content'] == {'notes': 2}
+    assert notes['raw'] == '<p>a</p>'
+
+
+def test_query_by_time_and_version(db):
+    archive.record('m', 't', '<p>1</p>', {'v': '1'}, version='1', captured_at=10)
+    archive.record('m', 't', '<p>2</p>', {'v': '2'}, version='2', captured_at=20)
+    assert [s['version'] for s in archive.snapshots('m', version='2')] == ['2']
+    assert archive.snapshot_at('m', 't', 15)['version'] == '1'
+    assert archive.snapshot_at('m', 't', 5) is None
+
+
+def test_changes_follow_extracted_value(db):
+    archive.record('m', 't', '<p>1</p>', {'a': 1, 'b': 1}, captured_at=1)
+    archive.record('m', 't', '<p>2</p>', {'a': 1, 'b': 2}, captured_at=2)
+    archive.record('m', 't', '<p>3</p>', {'a': 2, 'b': 2}, captured_at=3)
+    history = archive.changes('m', 't', lambda content: content['a'])
+    assert [(s['captured_at'], old, new) for s, old, new in history] == [(1, None, 1), (3, 1, 2)]
@@ -0,0 +1,78 @@
+import pytest
+
+import state_store
+from config import MONITOR_CONFIG
+from differ import Delta, diff_lists, diff_maps, diff_record, describe_record_changes
+from huaweiSM import VersionMonitor
+from records import VersionNote
+
+
+@pytest.fixture(autouse=True)
+def no_state(monkeypatch):
+    """不读写状态存储"""
+    monkeypatch.setattr(state_store, 'is_enabled', lambda: False)
+
+
+def test_diff_maps_reports_added_removed_and_modified():
+    delta = diff_maps({'a': 1, 'b': 2, 'c': 3}, {'b': 2, 'c': 4, 'd': 5})
+    assert delta.added == {'d': 5}
+    assert delta.removed == {'a': 1}
+    assert delta.modified == {'c': (3, 4)}
+    assert delta
+
+
+def test_diff_lists_ignores_order_and_duplicates():
+    assert not diff_lists(['a', 'b', 'b'], ['b', 'a'])
+    delta = diff_lists(['a', 'b'], ['b', 'c'])
+    assert delta.added == {'c': 'c'}
+    assert delta.removed == {'a': 'a'}
+
+
+def test_diff_lists_by_key():
+    old = [{'id': 1, 'v': 'x'}, {'id': 2, 'v': 'y'}]
+    new = [{'id': 2, 'v': 'z'}, {'id': 1, 'v': 'x'}]
+    delta = diff_lists(old, new, key=lambda item: item['id'])
+    assert delta.modified == {2: ({'id': 2, 'v': 'y'}, {'id': 2, 'v': 'z'})}
+    assert not delta.added and not delta.removed
+
+
+def test_diff_record_only_changed_fields():
+    old = {'版本号': '1.0', '功能': ['a', 'b'], '日期': '2024-01-01'}
+    new = {'版本号': '1.0', '功能': ['a', 'c'], '日期': '2024-01-02'}
+    changes = diff_record(old, new)
+    assert set(changes) == {'功能', '日期'}
+    assert isinstance(changes['功能'], Delta)
+    assert changes['日期'] == ('2024-01-01', '2024-01-02')
+    lines = describe_record_changes(changes)
+    assert "➕ 功能：c" in lines
+    assert "➖ 功能：b" in lines
+
+
+def test_diff_record_reorder_or_dropped_duplicate_is_not_a_change():
+    # 回归：只有顺序变化或去掉重复项时曾返回空的 Delta，发出没有内容的通知
+    old = {'功能': ['a', 'b', 'b'], '平台': {'x': 1, 'y': 2}}
+    new = {'功能': ['b', 'a'], '平台': {'y': 2, 'x': 1}}
+    assert diff_record(old, new) == {}
+
+
+def _version(version, updates):
+    return VersionNote(version=version, date='2024-01-01', updates=updates)
+
+
+def test_diff_versions_skips_reordered_rows():
+    monitor = VersionMonitor(MONITOR_CONFIG['huawei_version']['url'], '')
+    old = _version('2.0.0', ['【组件更新】', 'a\n说明a', 'b\n说明b'])
+    new = _version('2.0.0', ['【组件更新】', 'b\n说明b', 'a\n说明a'])
+    monitor.last_content = old
+    changes = monitor.diff_versions({'2.0.0': new}, {'2.0.0': old}, new)
+    assert changes == {'modified': {}, 'retracted': []}
+
+
+def test_diff_versions_reports_changed_rows():
+    monitor = VersionMonitor(MONITOR_CONFIG['huawei_version']['url'], '')
+    old = _version('2.0.0', ['【组件更新】', 'a\n说明a', 'b\n说明b'])
+    new = _version('2.0.0', ['【组件更新】', 'a\n说明a', 'b\n说明b（修订）', 'c\n说明c'])
+    monitor.last_content = old
+    rows = monitor.diff_versions({'2.0.0': new}, {'2.0.0': old}, new)['modified']['2.0.0']
+    assert list(rows.added) == [('【组件更新】', 'c')]
+    assert list(rows.modified) == [('【组件更新】', 'b')]
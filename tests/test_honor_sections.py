@@ -0,0 +1,45 @@
+import synthetic
+from fingerprint import raw_fingerprint
+from honorMonitor import HonorMonitor
+from parsing import make_soup
+
+# 正文前的目录引用了两个段落的标题
+TOC = '<div class="toc"><h1 id="toc">目录</h1><p><a href="#h1-1717124946965">调试器</a> 见 快应用引擎版本更新日志</p></div>'
+
+
+def parse_both(monitor, html_content):
+    sections = monitor.split_sections(html_content)
+    debugger, _ = monitor.parse_section(sections, 'debugger', monitor.parse_debugger_info, html_content)
+    engine, _ = monitor.parse_section(sections, 'engine', monitor.parse_engine_info, html_content)
+    return sections, debugger, engine
+
+
+def test_sections_match_whole_document_parse():
+    monitor = HonorMonitor('', '')
+    page = synthetic.honor_page()
+    sections, debugger, engine = parse_both(monitor, page)
+    assert sections['debugger'][1] is not page
+    assert sections['engine'][1] is not page
+    assert debugger == monitor.parse_debugger_info(make_soup(page))
+    assert engine == monitor.parse_engine_info(make_soup(page))
+
+
+def test_table_of_contents_does_not_select_wrong_section():
+    monitor = HonorMonitor('', '')
+    page = synthetic.honor_page()
+    index = page.find('<h1')
+    page = page[:index] + TOC + page[index:]
+    sections, debugger, engine = parse_both(monitor, page)
+    assert sections['debugger'][1].startswith('<h1 id="h1-1717124946965">')
+    assert debugger == monitor.parse_debugger_info(make_soup(page))
+    assert engine == monitor.parse_engine_info(make_soup(page))
+
+
+def test_failed_section_parse_falls_back_to_whole_document():
+    monitor = HonorMonitor('', '')
+    page = synthetic.honor_page()
+    sections = monitor.split_sections(page)
+    sections['engine'] = (sections['engine'][0], '<h1>快应用引擎版本更新日志</h1>')
+    engine, digest = monitor.parse_section(sections, 'engine', monitor.parse_engine_info, page)
+    assert engine == monitor.parse_engine_info(make_soup(page))
+    assert digest == raw_fingerprint(page)
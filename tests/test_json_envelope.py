@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+import json_envelope
+
+
+def _envelope(text, code=0):
+    return bytearray(json.dumps({
+        'code': code,
+        'message': 'ok "quoted" {braces} [brackets]',
+        'value': {'title': 'doc', 'content': {'content': text, 'size': len(text)}},
+    }, ensure_ascii=False).encode('utf-8'))
+
+
+def test_load_reads_small_values():
+    buf = _envelope('<p>x</p>', code=200)
+    assert json_envelope.load(buf, ('code',)) == 200
+    assert json_envelope.load(buf, ('value', 'title')) == 'doc'
+    assert json_envelope.load(buf, ('value', 'missing'), 'default') == 'default'
+    assert json_envelope.load(buf, ('code', 'nested')) is None
+
+
+def test_find_returns_value_span():
+    buf = _envelope('<p>x</p>')
+    start, end = json_envelope.find(buf, ('value', 'content'))
+    assert json.loads(bytes(buf[start:end])) == {'content': '<p>x</p>', 'size': 8}
+
+
+def test_pop_string_matches_json_loads():
+    text = '<h1 id="a">标题</h1><p>转义 \\ "引号" \t 换行\n</p>' + ''.join(
+        f'<p>第{i}段 ü 😀  </p>' for i in range(20000)
+    )
+    buf = _envelope(text)
+    expected = json.loads(bytes(buf))['value']['content']['content']
+    assert len(buf) > 2 * json_envelope._PIECE_SIZE
+    assert json_envelope.pop_string(buf, ('value', 'content', 'content')) == expected
+    assert len(buf) == 0
+
+
+def test_pop_string_with_ascii_escapes():
+    buf = bytearray(json.dumps({'value': {'content': {'content': '<p>中文</p>' * 30000}}}).encode('ascii'))
+    assert json_envelope.pop_string(buf, ('value', 'content', 'content')) == '<p>中文</p>' * 30000
+
+
+def test_pop_string_missing_or_not_string():
+    buf = _envelope('<p>x</p>')
+    assert json_envelope.pop_string(buf, ('value', 'nothing'), '') == ''
+    with pytest.raises(ValueError):
+        json_envelope.pop_string(buf, ('value', 'content', 'size'))
@@ -0,0 +1,41 @@
+import pytest
+from bs4 import BeautifulSoup
+
+import memory
+from config import MEMORY_CONFIG
+
+
+@pytest.fixture(autouse=True)
+def no_collection(monkeypatch):
+    """不冻结对象、不追踪分配，只测试文档树的拆除"""
+    monkeypatch.setitem(MEMORY_CONFIG, 'decompose', True)
+    monkeypatch.setitem(MEMORY_CONFIG, 'freeze', False)
+    monkeypatch.setitem(MEMORY_CONFIG, 'tracemalloc', False)
+    monkeypatch.setitem(MEMORY_CONFIG, 'gc_generation', None)
+
+
+@pytest.mark.parametrize('backend', ['html.parser', 'lxml'])
+def test_release_handles_top_level_comment_and_text(backend):
+    # 回归：顶层的注释和文本没有 decompose，拆除文档树时曾抛出 AttributeError
+    with memory.cycle():
+        soup = memory.track(BeautifulSoup('<!-- lead -->text<p>x<b>y</b></p>tail', backend))
+        paragraph = soup.find('p')
+    assert soup.contents == []
+    assert paragraph.decomposed
+
+
+def test_soups_outside_a_cycle_are_not_tracked():
+    soup = memory.track(BeautifulSoup('<p>x</p>', 'html.parser'))
+    with memory.cycle():
+        pass
+    assert soup.find('p').get_text() == 'x'
+
+
+def test_nested_cycles_release_their_own_soups():
+    with memory.cycle():
+        outer = memory.track(BeautifulSoup('<p>outer</p>', 'html.parser'))
+        with memory.cycle():
+            inner = memory.track(BeautifulSoup('<p>inner</p>', 'html.parser'))
+        assert inner.contents == []
+        assert outer.find('p').get_text() == 'outer'
+    assert outer.contents == []
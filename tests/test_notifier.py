@@ -0,0 +1,67 @@
+import pytest
+
+import notifier
+import sqlite_db
+from config import NOTIFY_CONFIG
+
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    """使用临时发件箱，不启动发送线程"""
+    db = sqlite_db.Database({'path': str(tmp_path / 'outbox.db')}, notifier._create_tables, isolation_level=None)
+    monkeypatch.setattr(notifier, '_db', db)
+    monkeypatch.setattr(notifier, 'start', lambda: None)
+    monkeypatch.setitem(NOTIFY_CONFIG, 'enabled', True)
+    return db
+
+
+def test_claim_takes_oldest_message_per_webhook(outbox):
+    notifier.enqueue('https://a', {'n': 1})
+    notifier.enqueue('https://a', {'n': 2})
+    notifier.enqueue('https://b', {'n': 3})
+
+    rows = notifier._claim(10)
+    assert [(url, payload) for _, url, payload, *_ in rows] == [
+        ('https://a', '{"n":1}'),
+        ('https://b', '{"n":3}'),
+    ]
+
+
+def test_claimed_messages_are_leased(outbox):
+    notifier.enqueue('https://a', {'n': 1})
+    assert len(notifier._claim(10)) == 1
+    # 租约期内其他发送线程领取不到，同一 webhook 的后续消息也要等待
+    notifier.enqueue('https://a', {'n': 2})
+    assert notifier._claim(10) == []
+
+
+def test_expired_lease_is_claimed_again(outbox, monkeypatch):
+    monkeypatch.setitem(NOTIFY_CONFIG, 'lease', 0)
+    notifier.enqueue('https://a', {'n': 1})
+    first = notifier._claim(10)
+    assert notifier._claim(10) == first
+
+
+def test_complete_releases_next_message(outbox):
+    notifier.enqueue('https://a', {'n': 1})
+    notifier.enqueue('https://a', {'n': 2})
+    row_id = notifier._claim(10)[0][0]
+    notifier._complete(row_id)
+
+    rows = notifier._claim(10)
+    assert [payload for _, _, payload, *_ in rows] == ['{"n":2}']
+
+
+def test_retry_backs_off_then_marks_failed(outbox, monkeypatch):
+    monkeypatch.setitem(NOTIFY_CONFIG, 'max_attempts', 2)
+    notifier.enqueue('https://a', {'n': 1})
+    row_id, _, _, attempts, *_ = notifier._claim(10)[0]
+
+    notifier._retry(row_id, attempts + 1, ValueError('busy'))
+    assert notifier._claim(10) == []
+    assert notifier.pending_count(due_only=False) == 1
+
+    notifier._retry(row_id, attempts + 2, ValueError('busy'))
+    assert notifier.pending_count(due_only=False) == 0
+    status, error = outbox.connection().execute("SELECT status, last_error FROM outbox").fetchone()
+    assert (status, error) == ('failed', 'busy')
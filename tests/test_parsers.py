@@ -0,0 +1,43 @@
+import synthetic
+from config import MONITOR_CONFIG
+from honorMonitor import HonorMonitor
+from monitor_registry import create_monitor
+from parsing import make_soup
+
+
+def test_honor_debugger_latest_row():
+    info = HonorMonitor('', '').parse_debugger_info(make_soup(synthetic.honor_page(debugger_rows=3)))
+    assert info.version == 'V14.3.0.300'
+    assert info.download_url == 'https://example.com/debugger_3.apk'
+
+
+def test_honor_engine_latest_release():
+    info = HonorMonitor('', '').parse_engine_info(make_soup(synthetic.honor_page(releases=5)))
+    assert info.version == 'V15.5.0.301'
+    assert dict(info.engine_versions) == {'荣耀快应用引擎平台': '15.5.0', '快应用联盟平台': '1150'}
+    assert info.features[0] == '新增：引擎能力5-0，支持组件0'
+
+
+def test_honor_engine_unchanged_by_enlarged_changelog():
+    monitor = HonorMonitor('', '')
+    html = synthetic.honor_page()
+    expected = monitor.parse_engine_info(make_soup(html))
+    assert monitor.parse_engine_info(make_soup(synthetic.enlarge_honor_page(html, 10))) == expected
+
+
+def test_huawei_loader_picks_newest_phone_build():
+    monitor = create_monitor(MONITOR_CONFIG['huawei_loader'])
+    info = monitor.parse_html(synthetic.huawei_loader_page(builds=3))
+    assert info.version == '14.4.1.302'
+    assert info.spec == '1102'
+    assert info.text.startswith('HwQuickApp_Loader_Phone')
+
+
+def test_huawei_version_latest_release():
+    monitor = create_monitor(MONITOR_CONFIG['huawei_version'])
+    html = synthetic.huawei_version_page(releases=3, rows=2)
+    info = monitor.parse_html(html)
+    assert info.version == '3.0.0'
+    assert info.date == '2024-04-01'
+    assert info.updates[0] == '【组件更新】'
+    assert monitor.parse_html(synthetic.enlarge_huawei_version_page(html, 10)) == info
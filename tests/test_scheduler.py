@@ -0,0 +1,59 @@
+import pytest
+
+import state_store
+from config import SCHEDULE_CONFIG
+from scheduler import AdaptiveSchedule
+
+HOUR = 3600
+
+
+@pytest.fixture(autouse=True)
+def no_state(monkeypatch):
+    """不读写状态存储，历史变化只保存在内存中"""
+    monkeypatch.setattr(state_store, 'is_enabled', lambda: False)
+
+
+def test_errors_back_off_exponentially_up_to_max():
+    schedule = AdaptiveSchedule('m', 't', 300, retry_interval=60)
+    delays = []
+    for _ in range(7):
+        schedule.record_error()
+        delays.append(schedule.next_interval())
+    assert delays == [60, 120, 240, 480, 960, SCHEDULE_CONFIG['max_interval'], SCHEDULE_CONFIG['max_interval']]
+
+
+def test_successful_check_resets_backoff():
+    schedule = AdaptiveSchedule('m', 't', 300)
+    schedule.record_error()
+    schedule.record_error()
+    schedule.record(False)
+    assert schedule.next_interval() == 300
+
+
+def test_base_interval_until_enough_history():
+    schedule = AdaptiveSchedule('m', 't', 300)
+    now = 1_700_000_000
+    for i in range(SCHEDULE_CONFIG['min_changes'] - 1):
+        schedule.record(True, now=now + i * HOUR)
+    assert schedule.next_interval(now=now + 10 * HOUR) == 300
+
+
+def test_fixed_interval_when_not_adaptive(monkeypatch):
+    monkeypatch.setitem(SCHEDULE_CONFIG, 'adaptive', False)
+    schedule = AdaptiveSchedule('m', 't', 300)
+    now = 1_700_000_000
+    for i in range(10):
+        schedule.record(True, now=now + i * HOUR)
+    assert schedule.next_interval(now=now + 100 * HOUR) == 300
+
+
+def test_slows_down_after_long_quiet_period():
+    schedule = AdaptiveSchedule('m', 't', 300)
+    now = 1_700_000_000
+    for i in range(5):
+        schedule.record(True, now=now + i * 24 * HOUR)
+    last = now + 4 * 24 * HOUR
+    soon = schedule.next_interval(now=last + HOUR)
+    later = schedule.next_interval(now=last + 20 * 24 * HOUR)
+    assert later > soon
+    assert SCHEDULE_CONFIG['min_interval'] <= soon <= later <= SCHEDULE_CONFIG['max_interval']
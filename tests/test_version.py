@@ -0,0 +1,73 @@
+import pytest
+
+import version
+from version import Version, VersionIndex
+
+
+def test_prefix_and_segment_counts():
+    assert version.parse('V14.5.0.300') == version.parse('14.5.0.300')
+    assert version.parse('1.5.0').numbers == (1, 5, 0)
+    assert version.parse('1100').numbers == (1100,)
+    assert version.parse('1.10') > version.parse('1.9')
+    # 前面的段相同时段数多的更新
+    assert version.parse('1.2.0.1') > version.parse('1.2.0')
+
+
+def test_prerelease_sorts_before_release():
+    assert version.parse('1.2.0-beta') < version.parse('1.2.0')
+    assert version.parse('1.2.0（Beta）').suffix == 'Beta'
+    assert version.parse('1.2.0-alpha') < version.parse('1.2.0-beta')
+    assert version.parse('1.2.0-beta') > version.parse('1.1.9')
+
+
+def test_compare_and_string_operands():
+    assert version.parse('2.0.0').compare('1.9.9') == 1
+    assert version.parse('2.0.0').compare('V2.0.0') == 0
+    assert version.parse('2.0.0').compare('2.0.1') == -1
+    assert version.parse('2.0.0') == '2.0.0'
+    assert version.parse('2.0.0') < '10.0.0'
+
+
+def test_invalid_versions_sort_lowest():
+    invalid = Version('未知版本')
+    assert not invalid.valid
+    assert invalid < version.parse('0.0.1')
+    assert sorted([version.parse('1.0'), invalid]) == [invalid, version.parse('1.0')]
+
+
+def test_parse_is_cached_and_immutable():
+    assert version.parse('3.1.4') is version.parse('3.1.4')
+    with pytest.raises(AttributeError):
+        version.parse('3.1.4').text = '3.1.5'
+
+
+def test_index_keeps_versions_sorted():
+    index = VersionIndex([('2.0.0', 'b'), ('1.0.0', 'a'), ('10.0.0', 'd'), ('2.0.0-beta', 'c')])
+    assert [str(v) for v in index.versions()] == ['1.0.0', '2.0.0-beta', '2.0.0', '10.0.0']
+    assert index.latest() == (version.parse('10.0.0'), 'd')
+    assert index.oldest() == (version.parse('1.0.0'), 'a')
+    assert len(index) == 4
+
+
+def test_index_add_replace_remove():
+    index = VersionIndex()
+    assert index.latest() is None
+    assert index.add('1.0.0', 'a')
+    assert not index.add('V1.0.0', 'a2')
+    assert len(index) == 1
+    assert index.get('1.0.0') == 'a2'
+    assert 'V1.0.0' in index
+    assert index.remove('1.0.0') == 'a2'
+    assert '1.0.0' not in index
+    assert index.get('1.0.0', 'missing') == 'missing'
+    with pytest.raises(KeyError):
+        index.remove('1.0.0')
+
+
+def test_index_range_queries():
+    index = VersionIndex((v, v) for v in ['1.0', '1.5', '2.0', '2.5', '3.0'])
+    assert [value for _, value in index.range('1.5', '2.5')] == ['1.5', '2.0', '2.5']
+    assert [value for _, value in index.range(high='1.5')] == ['1.0', '1.5']
+    assert [value for _, value in index.range(low='2.6')] == ['3.0']
+    assert [value for _, value in index.newer_than('2.0')] == ['2.5', '3.0']
+    assert index.newer_than('3.0') == []
@@ -0,0 +1,175 @@
+import functools
+import logging
+import re
+from bisect import bisect_left, bisect_right
+
+logger = logging.getLogger(__name__)
+
+# 第一段数字版本号及其后缀，数字之前的 "V" 前缀或其他文字不参与比较
+_VERSION = re.compile(r'(\d+(?:\.\d+)*)(.*)', re.S)
+
+# 后缀两端的分隔符，如 "1.2.0-beta"、"1.2.0（Beta）"
+_SUFFIX_STRIP = ' -_.+()（）'
+
+
+@functools.total_ordering
+class Version:
+    """版本号
+
+    支持 "V" 前缀（"V14.5.0.300"）、任意段数（"1.5.0"、"14.4.1.307"、"1100"）和后缀
+    （"1.2.0-beta"）。比较键在创建时计算一次：先按数字段比较，前面的段相同时段数多的更新；
+    数字相同时带后缀的视为预发布版本，排在不带后缀的版本之前，后缀之间按文本比较。
+    没有数字的版本号 valid 为 False，排在所有有效版本之前。
+    """
+
+    __slots__ = ('text', 'numbers', 'suffix', 'key')
+
+    def __init__(self, text):
+        text = (text or '').strip()
+        match = _VERSION.search(text)
+        numbers = tuple(int(part) for part in match.group(1).split('.')) if match else ()
+        suffix = match.group(2).strip(_SUFFIX_STRIP) if match else text
+        object.__setattr__(self, 'text', text)
+        object.__setattr__(self, 'numbers', numbers)
+        object.__setattr__(self, 'suffix', suffix)
+        object.__setattr__(self, 'key', (numbers, not suffix, suffix))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Version 不可修改")
+
+    @property
+    def valid(self):
+        """是否包含数字版本号"""
+        return bool(self.numbers)
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            other = parse(other)
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.key == other.key
+
+    def __lt__(self, other):
+        if isinstance(other, str):
+            other = parse(other)
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.key < other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Version({self.text!r})"
+
+    def __reduce__(self):
+        return (parse, (self.text,))
+
+    def compare(self, other):
+        """与 other 比较：更新返回 1，相同返回 0，更旧返回 -1"""
+        other = parse(other) if isinstance(other, str) else other
+        return (self.key > other.key) - (self.key < other.key)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse(text):
+    """解析版本号，相同文本返回同一个对象，无法解析时记录一次警告"""
+    version = Version(text)
+    if not version.valid:
+        logger.warning("无法解析的版本号: %r", text)
+    return version
+
+
+class VersionIndex:
+    """按版本号排序的索引
+
+    保存 {版本: 值}，按版本从旧到新排列。查找、添加和删除用二分定位（O(log n) 次比较），
+    latest / oldest 为 O(1)，range 按闭区间返回一段版本。同一版本只保存一份，
+    再次添加时替换原来的值。
+    """
+
+    __slots__ = ('_keys', '_versions', '_values')
+
+    def __init__(self, items=()):
+        self._keys = []
+        self._versions = []
+        self._values = []
+        for version, value in items:
+            self.add(version, value)
+
+    def _locate(self, version):
+        """版本在索引中的位置和是否已存在"""
+        version = parse(version) if isinstance(version, str) else version
+        index = bisect_left(self._keys, version.key)
+        return version, index, index < len(self._keys) and self._keys[index] == version.key
+
+    def add(self, version, value=None):
+        """添加或替换一个版本，返回是否为新增的版本"""
+        version, index, found = self._locate(version)
+        if found:
+            self._versions[index] = version
+            self._values[index] = value
+            return False
+        self._keys.insert(index, version.key)
+        self._versions.insert(index, version)
+        self._values.insert(index, value)
+        return True
+
+    def remove(self, version):
+        """删除一个版本并返回它的值，不存在时抛出 KeyError"""
+        _, index, found = self._locate(version)
+        if not found:
+            raise KeyError(version)
+        del self._keys[index]
+        del self._versions[index]
+        return self._values.pop(index)
+
+    def get(self, version, default=None):
+        """某个版本的值"""
+        _, index, found = self._locate(version)
+        return self._values[index] if found else default
+
+    def __contains__(self, version):
+        return self._locate(version)[2]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        """按版本从旧到新遍历 (版本, 值)"""
+        return iter(list(zip(self._versions, self._values)))
+
+    def versions(self):
+        """全部版本，从旧到新"""
+        return list(self._versions)
+
+    def latest(self):
+        """最新的 (版本, 值)，索引为空时返回 None"""
+        if not self._keys:
+            return None
+        return self._versions[-1], self._values[-1]
+
+    def oldest(self):
+        """最旧的 (版本, 值)，索引为空时返回 None"""
+        if not self._keys:
+            return None
+        return self._versions[0], self._values[0]
+
+    def range(self, low=None, high=None):
+        """low 到 high（含两端）之间的 [(版本, 值)]，从旧到新；省略的一端不限"""
+        start = 0 if low is None else bisect_left(self._keys, self._key(low))
+        end = len(self._keys) if high is None else bisect_right(self._keys, self._key(high))
+        return list(zip(self._versions[start:end], self._values[start:end]))
+
+    def newer_than(self, version):
+        """比 version 新的 [(版本, 值)]，从旧到新"""
+        start = bisect_right(self._keys, self._key(version))
+        return list(zip(self._versions[start:], self._values[start:]))
+
+    @staticmethod
+    def _key(version):
+        """版本或版本号文本的比较键"""
+        return (parse(version) if isinstance(version, str) else version).key